@@ -1,8 +1,10 @@
+from functools import lru_cache
 from inspect import signature
 from typing import Union, List, Dict
 from pprint import pprint
 from ipaddress import IPv4Address
-from numpy import invert
+
+import numpy as np
 
 from CybORG.Agents.SimpleAgents.BaseAgent import BaseAgent
 from CybORG.Simulator.Actions.AbstractActions import DiscoverRemoteSystems, PrivilegeEscalate, Impact, DegradeServices, AggressiveServiceDiscovery, StealthServiceDiscovery, DiscoverDeception
@@ -11,6 +13,54 @@ from CybORG.Simulator.Actions.ConcreteActions.RedSessionCheck import RedSessionC
 from CybORG.Simulator.Actions.ConcreteActions.Withdraw import Withdraw
 from CybORG.Simulator.Actions import Sleep, Action, InvalidAction
 
+# Host states, in the order of the rows of the compiled state transition tables
+HOST_STATES = ('K', 'KD', 'S', 'SD', 'U', 'UD', 'R', 'RD', 'F')
+STATE_INDEX = {state: index for index, state in enumerate(HOST_STATES)}
+K, KD, S, SD, U, UD, R, RD, F = range(len(HOST_STATES))
+
+# Entry of the compiled success and failure tables where an action has no transition
+NO_TRANSITION = -1
+
+# Whether the agent holds a session on a host in each state
+_SESSION_STATES = np.isin(np.arange(len(HOST_STATES)), (U, UD, R, RD))
+
+# Tolerance on the sum of probabilities, as used by numpy's Generator.choice
+_PROBABILITY_ATOL = np.sqrt(np.finfo(np.float64).eps)
+
+# The same addresses are observed every step, and formatting them is slow
+_ip_string = lru_cache(maxsize=4096)(str)
+
+
+def _compile_matrix(matrix: dict, columns: int, fill, dtype, convert=None) -> np.ndarray:
+    """Compiles a state transition matrix into an array indexed by (state, action).
+
+    Parameters
+    ----------
+    matrix : Dict[str, list]
+        row of each host state, with None where the action does not apply
+    columns : int
+        number of actions
+    fill : Any
+        value of the entries that are None or whose state has no row
+    dtype : type
+        dtype of the array
+    convert : Callable, optional
+        applied to each entry that is not None
+
+    Returns
+    -------
+    table : np.ndarray
+        shape (len(HOST_STATES), columns)
+    """
+    table = np.full((len(HOST_STATES), columns), fill, dtype=dtype)
+    for state, row in matrix.items():
+        if state not in STATE_INDEX:
+            raise ValueError(f'Unknown host state {state!r}, expected one of {HOST_STATES}')
+        for column, entry in enumerate(row):
+            if entry is not None:
+                table[STATE_INDEX[state], column] = entry if convert is None else convert(entry)
+    return table
+
 
 class FiniteStateRedAgent(BaseAgent):
     """
@@ -20,6 +70,31 @@ class FiniteStateRedAgent(BaseAgent):
     This will mainly occur via the state transition matrices, depending on action success or failure.
     However, other external factors may affect the state, such as Blue removing a session from a host or the host being outside the agent's area of influence (their assigned subnets).
 
+    The matrices are written as dictionaries by `state_transitions_success`, `state_transitions_failure`,
+    `state_transitions_probability` and `set_host_state_priority_list`, which variants override. They are compiled
+    into numpy arrays when the agent is created, and the state of each known host is kept as an index of HOST_STATES
+    in an int array, so each step looks transitions and probabilities up by (state, action).
+
+    `host_states` is a read-only snapshot of the host arrays, rebuilt on each access, so writing to it has no effect.
+    Host states must be changed through `host_state_codes`.
+
+    Attributes
+    ----------
+    host_ips : List[str]
+        IP address of each known host, in the order they were found
+    host_hostnames : List[str]
+        hostname of each known host, None while it is unknown
+    host_state_codes : np.ndarray
+        state of each known host as an index of HOST_STATES
+    success_table : np.ndarray
+        next state of a host after a successful action, indexed by (state, action), NO_TRANSITION where the action
+        does not apply
+    failure_table : np.ndarray
+        next state of a host after a failed action, indexed by (state, action)
+    probability_table : np.ndarray
+        probability of choosing each action for a host, indexed by (state, action), NaN where the action does not apply
+    state_priorities : np.ndarray
+        percentage chance of choosing a host of each state, indexed by state, None when hosts are chosen uniformly
     """
 
     def __init__(self, name=None, np_random=None, agent_subnets=None):
@@ -41,11 +116,19 @@ class FiniteStateRedAgent(BaseAgent):
         self.step = 0
         self.action_params = None
         self.last_action = None
-        self.host_states = {}
         self.host_service_decoy_status = {}
         self.agent_subnets = agent_subnets
         self.action_list = self.action_list()
 
+        self.host_ips = []
+        self.host_hostnames = []
+        self.host_state_codes = np.zeros(0, dtype=np.intp)
+        # integer value of each host's IP address, -1 if it is unknown
+        self._host_addresses = np.zeros(0, dtype=np.int64)
+        self._host_is_server = np.zeros(0, dtype=bool)
+        self._host_index = {}
+        self._hostname_index = {}
+
         self.print_action_output = False
         self.print_obs_output = False
         self.prioritise_servers = False
@@ -53,7 +136,47 @@ class FiniteStateRedAgent(BaseAgent):
         self.host_states_priority_list = self.set_host_state_priority_list()
         self.state_transitions_success = self.state_transitions_success()
         self.state_transitions_failure = self.state_transitions_failure()
-        self.state_transitions_probability = self.state_transitions_probability()    
+        self.state_transitions_probability = self.state_transitions_probability()
+        self._compile_tables()
+
+    def _compile_tables(self):
+        """Compiles the state transition matrices and host state priorities into numpy arrays."""
+        columns = len(self.action_list)
+        self.success_table = _compile_matrix(
+            self.state_transitions_success, columns, NO_TRANSITION, np.intp, STATE_INDEX.__getitem__)
+        self.failure_table = _compile_matrix(
+            self.state_transitions_failure, columns, NO_TRANSITION, np.intp, STATE_INDEX.__getitem__)
+        self.probability_table = _compile_matrix(self.state_transitions_probability, columns, np.nan, np.float64)
+        if (self.probability_table < 0).any():
+            raise ValueError('State transition probabilities must not be negative')
+
+        if self.host_states_priority_list is None:
+            self.state_priorities = None
+        else:
+            self.state_priorities = np.array(
+                [self.host_states_priority_list.get(state, 0) for state in HOST_STATES], dtype=np.float64)
+
+        self._action_columns = {action_class: column for column, action_class in enumerate(self.action_list)}
+        # the host an action acts on comes from the first of these parameters that it has
+        self._action_targets = []
+        for action_class in self.action_list:
+            parameters = signature(action_class).parameters
+            self._action_targets.append(
+                next((name for name in ('ip_address', 'hostname', 'subnet') if name in parameters), None))
+        # column of each type of action observed, None if it is not exactly one of the action_list classes
+        self._observed_action_columns = {}
+
+    @property
+    def host_states(self) -> Dict[str, dict]:
+        """The 'state' and 'hostname' of each known host by IP address.
+
+        This is a read-only snapshot built from the host arrays on each access. Changes to it are not kept, so host
+        states must be changed through `host_state_codes`.
+        """
+        return {
+            ip: {'state': HOST_STATES[code], 'hostname': hostname}
+            for ip, hostname, code in zip(self.host_ips, self.host_hostnames, self.host_state_codes.tolist())
+        }
 
     def get_action(self, observation: dict, action_space):
         """The choosing and returning of the action to be used for the current step.
@@ -111,7 +234,7 @@ class FiniteStateRedAgent(BaseAgent):
             self.step += 1
             return Sleep()
         else:
-            known_hosts = [h for h in self.host_states.keys() if not self.host_states[h]['state'] == 'F']
+            known_hosts = np.flatnonzero(self.host_state_codes != F)
             chosen_host, action = self._choose_host_and_action(action_space, known_hosts)
 
             if isinstance(action, ExploitRemoteService) and chosen_host in list(self.host_service_decoy_status.keys()):
@@ -121,71 +244,91 @@ class FiniteStateRedAgent(BaseAgent):
             self.last_action = action
             return action
 
+    def _observed_action_column(self, action: Action):
+        """The column of the action_list class of an action, or None if it is not exactly one of them."""
+        action_type = type(action)
+        if action_type not in self._observed_action_columns:
+            columns = [column for column, A in enumerate(self.action_list) if isinstance(action, A)]
+            self._observed_action_columns[action_type] = columns[0] if len(columns) == 1 else None
+        return self._observed_action_columns[action_type]
+
     def _host_state_transition(self, action: Action, success):
         """State transition depending on the last action and its success."""
-        if not action == None and not success.name == 'IN_PROGRESS':
-            action_index = None
-            action_type = [A for A in self.action_list if isinstance(action, A)]
-
-            if len(action_type) == 1:
-                action_index = self.action_list.index(action_type[0])
-                action_params = signature(action_type[0]).parameters
-                
-                host_ips = []
-                if 'ip_address' in action_params:
-                    host_ips.append(str(action.ip_address))
-                elif 'hostname' in action_params:
-                    for ip, host_dict in self.host_states.items():
-                        if host_dict['hostname'] == action.hostname:
-                            host_ips.append(ip)
-                            break
-                elif 'subnet' in action_params:
-                    for ip in self.host_states.keys():
-                        if IPv4Address(ip) in action.subnet:
-                            host_ips.append(ip)
-            
-                for host_ip in host_ips:
-                    if host_ip in self.host_states.keys():
-                        curr_state = self.host_states[host_ip]['state']
-                        next_state = None
-                        if success.value == 1:
-                            next_state = self.state_transitions_success[curr_state][action_index]
-                        else:
-                            next_state = self.state_transitions_failure[curr_state][action_index]
-
-                        if next_state == 'U':
-                            next_state = 'F'
-                            for a_subnet in self.agent_subnets:
-                                if IPv4Address(host_ip) in a_subnet:
-                                    next_state = 'U'
-
-                        if next_state == None:
-                            # i.e. if something happens that causes the host to be in a state where they cannot perform that action 
-                            # (e.g. session removed during action duration, or error), then just use their previous state. 
-                            next_state = curr_state
-                            
-                        self.host_states[host_ip]['state'] = next_state
+        if action is None or success.name == 'IN_PROGRESS':
+            return
+        action_index = self._observed_action_column(action)
+        if action_index is None:
+            return
+
+        target = self._action_targets[action_index]
+        if target == 'ip_address':
+            hosts = [self._host_index.get(str(action.ip_address))]
+        elif target == 'hostname':
+            hosts = [self._hostname_index.get(action.hostname)]
+        elif target == 'subnet':
+            subnet = action.subnet
+            addresses = self._host_addresses
+            hosts = np.flatnonzero(
+                (addresses >= 0) & (addresses & int(subnet.netmask) == int(subnet.network_address)))
+        else:
+            return
+        hosts = np.array([h for h in hosts if h is not None], dtype=np.intp)
+        if len(hosts) == 0:
+            return
+
+        table = self.success_table if success.value == 1 else self.failure_table
+        current_states = self.host_state_codes[hosts]
+        next_states = table[current_states, action_index]
+        for i in np.flatnonzero(next_states == U):
+            # hosts outside the agent's subnets cannot be acted on any further
+            address = IPv4Address(self.host_ips[hosts[i]])
+            if not any(address in a_subnet for a_subnet in self.agent_subnets):
+                next_states[i] = F
+        # i.e. if something happens that causes the host to be in a state where they cannot perform that action
+        # (e.g. session removed during action duration, or error), then just use their previous state.
+        no_transition = next_states == NO_TRANSITION
+        next_states[no_transition] = current_states[no_transition]
+        self.host_state_codes[hosts] = next_states
 
     def _session_removal_state_change(self, observation):
         """The changing of state of hosts, where its session has been removed (by Blue)."""
-        removed_hosts = []
-
-        for ip, hs in self.host_states.items():
-            if 'U' in hs['state'] or 'R' in hs['state']:
-                removed_hosts.append(ip)
+        removed_hosts = _SESSION_STATES[self.host_state_codes]
+        if not removed_hosts.any():
+            return
 
         for host, obs in observation.items():
             if host == 'message':
                 continue
 
-            if 'Sessions' in obs.keys():
-                for i, sess in enumerate(obs['Sessions']):
-                    host_ip = str(obs['Interface'][0]['ip_address'])
-                    if host_ip in removed_hosts:
-                        removed_hosts.remove(host_ip)
-        
-        for ip in removed_hosts:
-            self.host_states[ip]['state'] = 'KD'
+            if obs.get('Sessions'):
+                index = self._host_index.get(_ip_string(obs['Interface'][0]['ip_address']))
+                if index is not None:
+                    removed_hosts[index] = False
+
+        self.host_state_codes[removed_hosts] = KD
+
+    def _add_host(self, ip: str, hostname: str, state: int) -> int:
+        """Adds a newly found host in a state, returning its index."""
+        index = len(self.host_ips)
+        self.host_ips.append(ip)
+        self.host_hostnames.append(None)
+        self.host_state_codes = np.append(self.host_state_codes, state)
+        self._host_addresses = np.append(self._host_addresses, -1 if ip is None else int(IPv4Address(ip)))
+        self._host_is_server = np.append(self._host_is_server, False)
+        self._host_index[ip] = index
+        self._set_hostname(index, hostname)
+        return index
+
+    def _set_hostname(self, index: int, hostname: str):
+        """Records the hostname of a known host."""
+        if hostname is None:
+            return
+        self.host_hostnames[index] = hostname
+        self._host_is_server[index] = 'server' in hostname
+        # hostnames are looked up as the first host found with that name
+        first = self._hostname_index.get(hostname)
+        if first is None or first > index:
+            self._hostname_index[hostname] = index
 
     def _process_new_observations(self, observation: dict):
         """The finding of new hosts in the past observation, and the discovery of any decoys."""
@@ -196,49 +339,45 @@ class FiniteStateRedAgent(BaseAgent):
 
             if host_id == 'message':
                 continue
-                
+
             # Identify hostname in obs
             if '_' in host_id:
                 hostname = host_id
             elif 'System info' in host_details:
                 if 'Hostname' in host_details['System info']:
                     hostname = host_details['System info']['Hostname']
-            
+
             # Identify ip in obs
             if '.' in host_id:
                 ip = host_id
             elif 'Interface' in host_details:
-                ip = str(host_details['Interface'][0]['ip_address'])
-            
+                ip = _ip_string(host_details['Interface'][0]['ip_address'])
+
             # If hostname already in host_states, identify ip
             if ip == None and not hostname == None:
-                for h_ip, h_details in self.host_states.items():
-                    if h_details['hostname'] == hostname:
-                        ip = h_ip
-                        break
+                index = self._hostname_index.get(hostname)
+                if index is not None:
+                    ip = self.host_ips[index]
 
             # set new host starting state
-            host_state = {}
             if self.step == 0:
-                host_state['state'] = 'U'
+                host_state = U
                 if self.agent_subnets == None:
                     for sub_dict in host_details['Interface']:
                         if 'Subnet' in sub_dict.keys():
                             self.agent_subnets = [sub_dict['Subnet']]
                             break
             else:
-                host_state['state'] = 'K'
+                host_state = K
 
+            index = self._host_index.get(ip)
             # if new ip info
-            if not ip in self.host_states.keys():
-                self.host_states[ip] = host_state
-                self.host_states[ip]['hostname'] = hostname
-
+            if index is None:
+                self._add_host(ip, hostname, host_state)
             # if new hostname info
-            if not ip == None and not hostname == None:
-                if self.host_states[ip]['hostname'] == None:
-                    self.host_states[ip]['hostname'] = hostname
-            
+            elif not ip == None and not hostname == None and self.host_hostnames[index] == None:
+                self._set_hostname(index, hostname)
+
             # if new decoy info
             if 'Processes' in host_details.keys():
                 for process in host_details['Processes']:
@@ -248,93 +387,100 @@ class FiniteStateRedAgent(BaseAgent):
                                 self.host_service_decoy_status[host_id].append(process['PID'])
                             else:
                                 self.host_service_decoy_status[host_id] = [process['PID']]
-                        
-    def _choose_host(self, host_options: List[str]):
-        """A valid host is selected and returned"""
-        if self.host_states_priority_list is None:
+
+    def _sample_index(self, probabilities: np.ndarray) -> int:
+        """Draws an index with the given probabilities.
+
+        Takes the single uniform draw that `np_random.choice(len(probabilities), p=probabilities)` would, and gives
+        the same index.
+        """
+        if abs(probabilities.sum() - 1.0) > _PROBABILITY_ATOL:
+            raise ValueError('probabilities do not sum to 1')
+        cdf = probabilities.cumsum()
+        cdf /= cdf[-1]
+        return int(cdf.searchsorted(self.np_random.random(), side='right'))
+
+    def _choose_host(self, host_options: np.ndarray) -> int:
+        """A valid host is selected from the indices of the host options, and its index returned."""
+        if self.state_priorities is None:
             state_host_options = host_options
         else:
             base = 100
-            available_states = {}
-            
-            for h_opt in host_options:
-                if not self.host_states[h_opt]['state'] in available_states.keys():
-                    available_states[self.host_states[h_opt]['state']] = self.host_states_priority_list[self.host_states[h_opt]['state']] 
-                if len(available_states) == len(self.host_states_priority_list):
-                    break
-
-            if sum(available_states.values()) > 0:
-                p_multiplier = 1/((sum(available_states.values()) / base))
-                probs = [(p/base)*p_multiplier for p in available_states.values()]
-                chosen_state = self.np_random.choice(list(available_states.keys()), p=probs)
+            states = self.host_state_codes[host_options]
+            # states of the options, in the order their first host was found
+            _, first_hosts = np.unique(states, return_index=True)
+            available_states = states[np.sort(first_hosts)]
+            priorities = self.state_priorities[available_states]
+            total = sum(priorities.tolist())
+
+            if total > 0:
+                p_multiplier = 1/((total / base))
+                probs = (priorities/base)*p_multiplier
+                chosen_state = available_states[self._sample_index(probs)]
             else:
-                chosen_state = self.np_random.choice(list(available_states.keys()))
+                chosen_state = available_states[self.np_random.integers(len(available_states))]
 
-            state_host_options = [h for h in host_options if self.host_states[h]['state'] == chosen_state]
+            state_host_options = host_options[states == chosen_state]
 
         if self.prioritise_servers and len(state_host_options) > 1:
-            server_state_host_options = [h for h in state_host_options if self.host_states[h]['hostname'] is not None and 'server' in self.host_states[h]['hostname']] 
+            server_state_host_options = state_host_options[self._host_is_server[state_host_options]]
             if len(server_state_host_options) > 0:
                 i = self.np_random.random()
-                if i <= 0.75:
-                    chosen_host = self.np_random.choice(server_state_host_options)
+                if i <= 0.75 or len(server_state_host_options) == len(state_host_options):
+                    state_host_options = server_state_host_options
                 else:
                     #pick other host type
-                    if not len(server_state_host_options) == len(state_host_options):
-                        non_server_state_host_options = [h for h in state_host_options if not h in server_state_host_options]
-                        chosen_host = self.np_random.choice(non_server_state_host_options)
-                    else:
-                        chosen_host = self.np_random.choice(server_state_host_options)
-            else:
-                chosen_host = self.np_random.choice(state_host_options)
-        else:
-            chosen_host = self.np_random.choice(state_host_options)
+                    state_host_options = state_host_options[~self._host_is_server[state_host_options]]
 
-        return chosen_host
-    
-    
-    def _choose_host_and_action(self, action_space: dict, host_options: List[str]):
-        """The selection of a valid host and action to execute this step."""
+        return state_host_options[self.np_random.integers(len(state_host_options))]
+
+    def _choose_host_and_action(self, action_space: dict, host_options: np.ndarray):
+        """The selection of a valid host and action to execute this step.
+
+        Returns the IP address of the chosen host with the action, or None and Sleep if there is no host to act on.
+        """
+        if len(host_options) == 0:
+            return None, Sleep()
         chosen_host = self._choose_host(host_options)
-        if chosen_host == None:
-            return Sleep()
 
-        host_action_options = {self.action_list[i]: prob for i, prob in enumerate(self.state_transitions_probability[self.host_states[chosen_host]['state']]) if not prob == None}
+        # actions in the order of the action space, with their probabilities for the state of the chosen host
+        probabilities = self.probability_table[self.host_state_codes[chosen_host], self._space_columns]
+        available = np.fromiter(
+            (action_space['action'][action_class] for action_class in self._space_actions),
+            dtype=bool, count=len(self._space_actions)
+        ) & ~np.isnan(probabilities)
 
-        invalid_actions = []
         while True:
-            options = [i for i, v in action_space['action'].items() if v and i not in invalid_actions and i in list(host_action_options.keys())]
+            options = np.flatnonzero(available)
             if len(options) > 0:
-                probabilities = []
-                for opt in options:
-                    probabilities.append(host_action_options[opt])
-                action_class = self.np_random.choice(options, p=probabilities)
+                option = options[self._sample_index(probabilities[options])]
+                action_class = self._space_actions[option]
             else:
-                new_options = host_options[:]
-                new_options.pop(chosen_host)
-                return self._choose_action(action_space, new_options)
+                return self._choose_host_and_action(action_space, host_options[host_options != chosen_host])
             # select random options
             action_params = {}
             for param_name in self.action_params[action_class]:
-                options = [i for i, v in action_space[param_name].items() if v]
                 if param_name == 'hostname':
-                    if not self.host_states[chosen_host]['hostname'] == None:
-                        action_params[param_name] = self.host_states[chosen_host]['hostname']
+                    if not self.host_hostnames[chosen_host] == None:
+                        action_params[param_name] = self.host_hostnames[chosen_host]
                     else:
-                        invalid_actions.append(action_class)
+                        available[option] = False
                         action_params = None
                         break
                 elif param_name == 'ip address' or param_name == "ip_address":
-                    action_params[param_name] = IPv4Address(chosen_host)
-                elif len(options) > 0:
-                    action_params[param_name] = self.np_random.choice(options)
+                    action_params[param_name] = IPv4Address(self.host_ips[chosen_host])
                 else:
-                    invalid_actions.append(action_class)
-                    action_params = None
-                    break
+                    # only gather the options of the parameters that are chosen at random
+                    options = [i for i, v in action_space[param_name].items() if v]
+                    if len(options) > 0:
+                        action_params[param_name] = options[self.np_random.integers(len(options))]
+                    else:
+                        available[option] = False
+                        action_params = None
+                        break
             if action_params is not None:
-                return chosen_host, action_class(**action_params)
-    
+                return self.host_ips[chosen_host], action_class(**action_params)
+
     def train(self, results):
         pass
 
@@ -351,6 +497,9 @@ class FiniteStateRedAgent(BaseAgent):
         """
         if type(action_space) is dict:
             self.action_params = {action_class: signature(action_class).parameters for action_class in action_space['action'].keys()}
+            # actions of the action_list in the order of the action space, which is the order they are sampled in
+            self._space_actions = [action_class for action_class in action_space['action'] if action_class in self._action_columns]
+            self._space_columns = np.array([self._action_columns[action_class] for action_class in self._space_actions], dtype=np.intp)
 
     def last_turn_summary(self, observation: dict, action: str, success):
         """Prints action name, parameters, success and sometimes observation and host states.
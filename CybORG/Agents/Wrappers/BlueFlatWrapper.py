@@ -57,6 +57,7 @@ class BlueFlatWrapper(BlueFixedActionWrapper):
         self._short_obs_space, self._long_obs_space = self._get_init_obs_spaces()
         self.comms_policies = self._build_comms_policy()
         self.policy = {}
+        self._layout_state = None
 
     def reset(self, *args, **kwargs) -> tuple[dict[str, Any], dict[str, Any]]:
         """Reset the environment and update the observation space.
@@ -157,8 +158,8 @@ class BlueFlatWrapper(BlueFixedActionWrapper):
             observation_head + (NUM_HQ_SUBNETS * observation_middle) + observation_tail
         )
 
-        short_observation_space = spaces.MultiDiscrete(short_observation_components)
-        long_observation_space = spaces.MultiDiscrete(long_observation_components)
+        short_observation_space = spaces.MultiDiscrete(short_observation_components, dtype=np.int8)
+        long_observation_space = spaces.MultiDiscrete(long_observation_components, dtype=np.int8)
 
         self._observation_space = {
             agent: long_observation_space
@@ -184,58 +185,30 @@ class BlueFlatWrapper(BlueFixedActionWrapper):
         output : np.ndarray
         """
         state = self.env.environment_controller.state
-
-        proto_observation = []
+        if state is not self._layout_state:
+            self._build_observation_layout(state)
+        layout = self._observation_layout[agent_name]
+        output = layout["buffer"]
 
         # Mission Phase
-        mission_phase = state.mission_phase
-        proto_observation.append(mission_phase)
-
-        # Useful (sorted) information
-        sorted_subnet_name_to_cidr = sorted(state.subnet_name_to_cidr.items())
-        subnet_names, subnet_cidrs = zip(*sorted_subnet_name_to_cidr)
-        subnet_names = [name.lower() for name in subnet_names]
-        hosts = self.hosts(agent_name)
-
-        for subnet in self.subnets(agent_name):
-            # One-hot encoded subnet vector
-            subnet_subvector = [subnet == name for name in subnet_names]
-
-            # Get blocklist
-            blocked_subnets = state.blocks.get(subnet, [])
-            blocked_subvector = [s in blocked_subnets for s in subnet_names]
-
-            # Comms
-            comms_policy = self.comms_policies[state.mission_phase]
-            comms_matrix = nx.to_numpy_array(comms_policy, nodelist=subnet_names)
-            comms_policy_subvector = comms_matrix[subnet_names.index(subnet)]
-            comms_policy_subvector = np.logical_not(comms_policy_subvector)
-            self.policy[agent_name] = comms_policy
-
-            # Process malware events for users, then servers
-            subnet_hosts = [h for h in hosts if subnet in h and "router" not in h]
-
-            process_subvector = [
-                h in state.hosts and 0 < len(self._get_procesess(state, h))
-                for h in subnet_hosts
-            ]
-
-            connection_subvector = [
-                h in state.hosts and 0 < len(self._get_connections(state, h))
-                for h in subnet_hosts
-            ]
-
-            proto_observation.extend(
-                itertools.chain(
-                    subnet_subvector,
-                    blocked_subvector,
-                    comms_policy_subvector,
-                    process_subvector,
-                    connection_subvector,
-                )
-            )
-
-        output = np.array(proto_observation, dtype=np.int64)
+        output[0] = state.mission_phase
+
+        # Blocked subnets and comms policy of each of the agent's subnets
+        view = state.get_view()
+        subnet_rows = layout["subnet_rows"]
+        output[layout["blocked_positions"]] = view.blocked[np.ix_(subnet_rows, self._view_subnet_columns)].ravel()
+        output[layout["comms_positions"]] = self._comms_matrices[state.mission_phase][layout["comms_rows"]].ravel()
+        self.policy[agent_name] = self.comms_policies[state.mission_phase]
+
+        # Process malware events for users, then servers
+        output[layout["event_positions"]] = 0
+        host_positions = layout["host_positions"]
+        for hostname in state.alerted_hosts:
+            positions = host_positions.get(hostname)
+            if positions is not None:
+                events = state.hosts[hostname].events
+                output[positions[0]] = events.process_alerts > 0
+                output[positions[1]] = events.connection_alerts > 0
 
         # Messages from other agents
         # This assumes CybORG provides a consistent ordering.
@@ -244,16 +217,77 @@ class BlueFlatWrapper(BlueFixedActionWrapper):
 
         message_subvector = np.concatenate(messages)
         assert len(message_subvector) == NUM_MESSAGES * MESSAGE_LENGTH
+        output[layout["message_slice"]] = message_subvector
 
-        output = np.concatenate([output, message_subvector])
+        # The buffer is reused, so callers get a copy they can keep
+        return output.copy()
 
-        # Apply padding as required
-        if self.is_padded:
-            output = np.pad(
-                output, (0, self._long_obs_space.shape[0] - output.shape[0])
-            )
+    def _build_observation_layout(self, state: State):
+        """Precomputes where each part of every agent's observation vector comes from.
 
-        return output
+        The layout depends on the hosts of the episode, so it is rebuilt whenever the
+        environment's state changes. Each agent gets a preallocated output buffer in
+        which the parts that stay constant for the episode are already filled in.
+        """
+        sorted_subnet_names = sorted(state.subnet_name_to_cidr)
+        subnet_names = [name.lower() for name in sorted_subnet_names]
+        subnet_index = {name: i for i, name in enumerate(subnet_names)}
+        num_subnets = len(subnet_names)
+
+        view = state.get_view()
+        self._view_subnet_columns = np.array(
+            [view.subnet_index[getattr(name, "value", name)] for name in sorted_subnet_names]
+        )
+        self._comms_matrices = np.stack([
+            np.logical_not(nx.to_numpy_array(self.comms_policies[phase], nodelist=subnet_names))
+            for phase in sorted(self.comms_policies)
+        ]).astype(np.int8)
+
+        self._observation_layout = {}
+        for agent_name in self.agents:
+            hosts = self.hosts(agent_name)
+            subnets = self.subnets(agent_name)
+            blocked_positions, comms_positions = [], []
+            host_positions = {}
+            subnet_rows = []
+
+            one_hot_positions = []
+            position = 1
+            for subnet in subnets:
+                subnet_hosts = [h for h in hosts if subnet in h and "router" not in h]
+                row = subnet_index[subnet]
+                # The one-hot encoded subnet vector is constant
+                one_hot_positions.append(position + row)
+                # Blocks are looked up in the view's subnet order
+                subnet_rows.append(self._view_subnet_columns[row])
+                position += num_subnets
+                blocked_positions.extend(range(position, position + num_subnets))
+                position += num_subnets
+                comms_positions.extend(range(position, position + num_subnets))
+                position += num_subnets
+                for i, hostname in enumerate(subnet_hosts):
+                    if hostname in state.hosts:
+                        host_positions[hostname] = (position + i, position + len(subnet_hosts) + i)
+                position += 2 * len(subnet_hosts)
+
+            message_slice = slice(position, position + NUM_MESSAGES * MESSAGE_LENGTH)
+            length = message_slice.stop
+            if self.is_padded:
+                length = max(length, self._long_obs_space.shape[0])
+            output = np.zeros(length, dtype=np.int8)
+            output[one_hot_positions] = 1
+
+            self._observation_layout[agent_name] = {
+                "buffer": output,
+                "subnet_rows": np.array(subnet_rows, dtype=np.int64),
+                "comms_rows": np.array([subnet_index[subnet] for subnet in subnets], dtype=np.int64),
+                "blocked_positions": np.array(blocked_positions, dtype=np.int64),
+                "comms_positions": np.array(comms_positions, dtype=np.int64),
+                "host_positions": host_positions,
+                "event_positions": np.array(list(itertools.chain(*host_positions.values())), dtype=np.int64),
+                "message_slice": message_slice,
+            }
+        self._layout_state = state
 
     def _build_comms_policy(self):
         policy_dict = {}
@@ -301,16 +335,6 @@ class BlueFlatWrapper(BlueFixedActionWrapper):
 
         return network
 
-    def _get_procesess(self, state: State, hostname: str):
-        observed_proc_events = state.hosts[hostname].events.old_process_creation
-        unobserved_proc_events = state.hosts[hostname].events.process_creation
-        return observed_proc_events + unobserved_proc_events
-
-    def _get_connections(self, state: State, hostname: str):
-        observed_conn_events = state.hosts[hostname].events.old_network_connections
-        unobserved_conn_events = state.hosts[hostname].events.network_connections
-        return observed_conn_events + unobserved_conn_events
-
     @functools.lru_cache(maxsize=None)
     def observation_space(self, agent_name: str) -> Space:
         """Returns the multi-discrete space corresponding to the given agent."""
@@ -0,0 +1,334 @@
+from __future__ import annotations
+from gymnasium import Space
+
+from CybORG.Agents.Wrappers.BlueFlatWrapper import BlueFlatWrapper
+from CybORG.Agents.Wrappers.BlueFixedActionWrapper import MESSAGE_LENGTH
+from CybORG.Agents.Wrappers.VectorBlueFlatWrapper import (
+    buffer_specs,
+    check_step_inputs,
+    make_indexed_blue_flat_env,
+    reset_env_into,
+    step_env_into,
+)
+
+from multiprocessing import shared_memory
+from typing import Any, Callable
+
+import functools
+import multiprocessing as mp
+import traceback
+
+import numpy as np
+
+# Offsets into the shared memory block are aligned to this many bytes.
+_ALIGNMENT = 8
+
+
+def _layout(specs: dict[str, tuple[tuple[int, ...], np.dtype]]) -> tuple[dict[str, int], int]:
+    """Computes the byte offset of each buffer inside one shared memory block."""
+    offsets = {}
+    size = 0
+    for name, (shape, dtype) in specs.items():
+        offsets[name] = size
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        size += -(-nbytes // _ALIGNMENT) * _ALIGNMENT
+    return offsets, max(size, 1)
+
+
+def _attach(shm: shared_memory.SharedMemory, specs: dict, offsets: dict) -> dict[str, np.ndarray]:
+    """Creates numpy views of every buffer inside the shared memory block."""
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offsets[name])
+        for name, (shape, dtype) in specs.items()
+    }
+
+
+def _worker(remote, parent_remote, env_fn: Callable[[int], BlueFlatWrapper], indices: list[int]) -> None:
+    """Runs a group of sub-environments, communicating through `remote`.
+
+    Commands are (name, data) tuples. Results are written directly into the
+    shared memory buffers, so replies only carry errors or small metadata.
+    """
+    parent_remote.close()
+    shm = None
+    buffers = None
+    agents = None
+    envs = {}
+    try:
+        envs = {i: env_fn(i) for i in indices}
+        while True:
+            cmd, data = remote.recv()
+            try:
+                if cmd == "step":
+                    for i, env in envs.items():
+                        step_env_into(
+                            env,
+                            agents,
+                            buffers,
+                            i,
+                            buffers["actions"][i],
+                            buffers["messages"][i] if data else None,
+                        )
+                    remote.send(("ok", None))
+                elif cmd == "reset":
+                    for i, env in envs.items():
+                        reset_env_into(env, agents, buffers, i, None if data is None else data + i)
+                        buffers["episode_ended"][i] = False
+                    remote.send(("ok", None))
+                elif cmd == "spaces":
+                    env = next(iter(envs.values()))
+                    possible_agents = sorted(env.possible_agents)
+                    remote.send((
+                        "ok",
+                        (
+                            possible_agents,
+                            env.observation_space(possible_agents[0]),
+                            env.action_space(possible_agents[0]),
+                            all(e.is_padded for e in envs.values()),
+                        ),
+                    ))
+                elif cmd == "attach":
+                    name, specs, offsets, agents = data
+                    shm = shared_memory.SharedMemory(name=name)
+                    buffers = _attach(shm, specs, offsets)
+                    remote.send(("ok", None))
+                elif cmd == "close":
+                    remote.send(("ok", None))
+                    break
+                else:
+                    raise ValueError(f"Unknown command {cmd}")
+            except Exception:
+                remote.send(("error", traceback.format_exc()))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    finally:
+        buffers = None
+        if shm is not None:
+            shm.close()
+        remote.close()
+
+
+class SubprocVectorBlueFlatWrapper:
+    """Runs padded BlueFlatWrapper (or EnterpriseMAE) environments in worker processes.
+
+    This is the multiprocess counterpart of VectorBlueFlatWrapper and returns
+    the same batched arrays. Observations, rewards, done flags and action
+    masks are written by the workers straight into a single
+    `multiprocessing.shared_memory` block, and the learner writes the batched
+    actions (and optional messages) into the same block. Pipes only carry
+    short command tuples, so no observation or info dictionaries are pickled.
+
+    `step_async` and `step_wait` allow the learner to overlap its own work with
+    the simulation. The shared buffers must not be read or written between the
+    two calls.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        env_fn: Callable[[int], BlueFlatWrapper] | None = None,
+        seed: int | None = None,
+        steps: int = 500,
+        num_workers: int | None = None,
+        start_method: str | None = None,
+        copy: bool = True,
+    ):
+        """Start the worker processes and allocate the shared buffers.
+
+        Parameters
+        ----------
+        num_envs : int
+            Number of sub-environments to create.
+        env_fn : Callable[[int], BlueFlatWrapper] | None
+            Picklable factory called inside a worker with the index of each
+            sub-environment. Defaults to `make_indexed_blue_flat_env`.
+        seed : int | None
+            Base seed for the default factory. Ignored if env_fn is provided.
+        steps : int
+            Episode length for the default factory. Ignored if env_fn is provided.
+        num_workers : int | None
+            Number of worker processes. Sub-environments are split into
+            contiguous groups, one per worker. Defaults to num_envs.
+        start_method : str | None
+            Multiprocessing start method ("fork", "spawn" or "forkserver").
+            Defaults to the platform default.
+        copy : bool
+            Return copies of the shared buffers. If False, the returned arrays
+            are overwritten by the next call to reset or step.
+        """
+        if num_envs < 1:
+            raise ValueError(f"num_envs must be positive, got {num_envs}")
+        num_workers = num_envs if num_workers is None else min(num_workers, num_envs)
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be positive, got {num_workers}")
+
+        if env_fn is None:
+            env_fn = functools.partial(make_indexed_blue_flat_env, seed=seed, steps=steps)
+
+        self.num_envs = num_envs
+        self.num_workers = num_workers
+        self.copy = copy
+        self.closed = False
+        self.waiting = False
+        self._shm = None
+        self._buffers = None
+
+        ctx = mp.get_context(start_method)
+        groups = np.array_split(np.arange(num_envs), num_workers)
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(num_workers)])
+        self.processes = []
+        for work_remote, remote, group in zip(self.work_remotes, self.remotes, groups):
+            process = ctx.Process(
+                target=_worker,
+                args=(work_remote, remote, env_fn, [int(i) for i in group]),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        try:
+            spaces = self._call_all("spaces", None)
+            self.possible_agents, self._obs_space, self._act_space, _ = spaces[0]
+            if not all(padded for *_, padded in spaces):
+                raise ValueError("SubprocVectorBlueFlatWrapper requires pad_spaces=True.")
+            self.num_agents = len(self.possible_agents)
+            self.obs_dim = self._obs_space.shape[0]
+            self.num_actions = int(self._act_space.n)
+
+            specs = buffer_specs(
+                num_envs, self.num_agents, self.obs_dim, self._obs_space.dtype, self.num_actions
+            )
+            specs["actions"] = ((num_envs, self.num_agents), np.dtype(np.int64))
+            specs["messages"] = ((num_envs, self.num_agents, MESSAGE_LENGTH), np.dtype(bool))
+            offsets, size = _layout(specs)
+
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._buffers = _attach(self._shm, specs, offsets)
+            self._call_all("attach", (self._shm.name, specs, offsets, self.possible_agents))
+        except Exception:
+            self.close()
+            raise
+
+    def reset(self, seed: int | None = None) -> tuple[np.ndarray, dict[str, Any]]:
+        """Reset every sub-environment.
+
+        Parameters
+        ----------
+        seed : int | None
+            If provided, sub-environment i is reset with seed `seed + i`.
+
+        Returns
+        -------
+        observations : np.ndarray
+            Array of shape (num_envs, num_agents, obs_dim).
+        info : dict[str, Any]
+            Contains "action_mask", an array of shape (num_envs, num_agents, num_actions).
+        """
+        self._call_all("reset", seed)
+        return self._output(self._buffers["observations"]), {
+            "action_mask": self._output(self._buffers["action_masks"])
+        }
+
+    def step_async(self, actions: np.ndarray, messages: np.ndarray | None = None) -> None:
+        """Send a batch of action indices to the workers without waiting for results.
+
+        Parameters
+        ----------
+        actions : np.ndarray
+            Integer array of shape (num_envs, num_agents).
+        messages : np.ndarray | None
+            Optional boolean array of shape (num_envs, num_agents, MESSAGE_LENGTH).
+        """
+        if self.waiting:
+            raise RuntimeError("step_async called while a previous step is still pending.")
+        actions, messages = check_step_inputs(actions, messages, self.num_envs, self.num_agents)
+        self._buffers["actions"][:] = actions
+        if messages is not None:
+            self._buffers["messages"][:] = messages
+        for remote in self.remotes:
+            remote.send(("step", messages is not None))
+        self.waiting = True
+
+    def step_wait(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        """Wait for the step started by `step_async` and return its results.
+
+        Returns
+        -------
+        The same tuple as VectorBlueFlatWrapper.step.
+        """
+        if not self.waiting:
+            raise RuntimeError("step_wait called without a pending step_async.")
+        self.waiting = False
+        self._check_replies([remote.recv() for remote in self.remotes])
+        buffers = self._buffers
+        return (
+            self._output(buffers["observations"]),
+            self._output(buffers["rewards"]),
+            self._output(buffers["terminated"]),
+            self._output(buffers["truncated"]),
+            {
+                "action_mask": self._output(buffers["action_masks"]),
+                "episode_ended": self._output(buffers["episode_ended"]),
+                "final_observation": self._output(buffers["final_observations"]),
+            },
+        )
+
+    def step(
+        self, actions: np.ndarray, messages: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        """Step every sub-environment and wait for the results.
+
+        See VectorBlueFlatWrapper.step for the parameters and return values.
+        """
+        self.step_async(actions, messages)
+        return self.step_wait()
+
+    def _call_all(self, cmd: str, data: Any) -> list[Any]:
+        for remote in self.remotes:
+            remote.send((cmd, data))
+        return self._check_replies([remote.recv() for remote in self.remotes])
+
+    @staticmethod
+    def _check_replies(replies: list[tuple[str, Any]]) -> list[Any]:
+        for status, payload in replies:
+            if status == "error":
+                raise RuntimeError(f"Error in vector environment worker:\n{payload}")
+        return [payload for _, payload in replies]
+
+    def _output(self, buffer: np.ndarray) -> np.ndarray:
+        return buffer.copy() if self.copy else buffer
+
+    def observation_space(self, agent_name: str) -> Space:
+        """Returns the (shared) observation space of a single agent in one sub-environment."""
+        return self._obs_space
+
+    def action_space(self, agent_name: str) -> Space:
+        """Returns the (shared) action space of a single agent in one sub-environment."""
+        return self._act_space
+
+    def close(self) -> None:
+        """Stops the workers and releases the shared memory."""
+        if self.closed:
+            return
+        self.closed = True
+        if self.waiting:
+            for remote in self.remotes:
+                try:
+                    remote.recv()
+                except EOFError:
+                    pass
+            self.waiting = False
+        for remote in self.remotes:
+            try:
+                remote.send(("close", None))
+                remote.recv()
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.processes:
+            process.join()
+        self._buffers = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
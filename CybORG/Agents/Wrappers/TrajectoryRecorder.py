@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+from typing import Any, Iterator
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+INDEX_FILE = "index.json"
+FORMAT_VERSION = 1
+
+
+def _column_specs(obs_width: int, obs_dtype: np.dtype, action_width: int) -> dict[str, tuple[tuple[int, ...], np.dtype]]:
+    """Returns the per-row shape and dtype of every column of a trajectory dataset."""
+    return {
+        "observations": ((obs_width,), np.dtype(obs_dtype)),
+        "next_observations": ((obs_width,), np.dtype(obs_dtype)),
+        "actions": ((), np.dtype(np.int64)),
+        "action_masks": ((action_width,), np.dtype(bool)),
+        "rewards": ((), np.dtype(np.float32)),
+        "terminated": ((), np.dtype(bool)),
+        "truncated": ((), np.dtype(bool)),
+        "agents": ((), np.dtype(np.int16)),
+        "episodes": ((), np.dtype(np.int64)),
+    }
+
+
+def _write_index(path: str, index: dict) -> None:
+    """Replaces the index of a dataset in one step, so readers never see a partial index."""
+    tmp = os.path.join(path, INDEX_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp, os.path.join(path, INDEX_FILE))
+
+
+def _read_index(path: str) -> dict:
+    with open(os.path.join(path, INDEX_FILE)) as f:
+        return json.load(f)
+
+
+class TrajectoryRecorder:
+    """Records the transitions of a BlueFlatWrapper or EnterpriseMAE into a memory-mapped dataset.
+
+    Every step adds one row per acting blue agent, in the order of `possible_agents`. A row holds the observation the
+    agent acted on, its action index and action mask, and the reward, termination flags and observation that followed.
+    Rows are written straight into fixed-size `.npy` chunk files opened with `np.lib.format.open_memmap`, one file per
+    column. When a chunk is full it is listed in `index.json`, so an interrupted recording keeps every completed chunk.
+    Recording into a directory that already holds a dataset appends new chunks to it.
+
+    Observations and action masks are stored with the width of the largest agent, zero padded for the others. The
+    index keeps each agent's true sizes. Actions that were not given as an index, or not given at all, are stored as
+    -1. Use TrajectoryDataset to read the dataset back.
+
+    All other attributes and methods are forwarded to the wrapped environment.
+    """
+
+    def __init__(self, env, path: str, chunk_size: int = 65536):
+        """Opens the dataset, creating it if needed.
+
+        Parameters
+        ----------
+        env : BlueFlatWrapper | EnterpriseMAE
+            Environment to record.
+        path : str
+            Directory of the dataset.
+        chunk_size : int
+            Number of rows in each chunk file.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+        self.env = env
+        self.path = path
+        self.chunk_size = chunk_size
+        self.possible_agents = list(env.possible_agents)
+        self._agent_ids = {agent: i for i, agent in enumerate(self.possible_agents)}
+        self._obs_sizes = {a: int(env.observation_space(a).shape[0]) for a in self.possible_agents}
+        self._action_sizes = {a: int(env.action_space(a).n) for a in self.possible_agents}
+        self._obs_width = max(self._obs_sizes.values())
+        self._action_width = max(self._action_sizes.values())
+        obs_dtype = np.dtype(env.observation_space(self.possible_agents[0]).dtype)
+        self._specs = _column_specs(self._obs_width, obs_dtype, self._action_width)
+
+        columns = {name: {"dtype": dtype.str, "shape": list(shape)} for name, (shape, dtype) in self._specs.items()}
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, INDEX_FILE)):
+            self._index = _read_index(path)
+            if self._index["columns"] != columns or self._index["agents"] != self.possible_agents:
+                raise ValueError(f"The dataset in {path} was recorded with a different layout.")
+        else:
+            self._index = {
+                "version": FORMAT_VERSION,
+                "agents": self.possible_agents,
+                "observation_sizes": self._obs_sizes,
+                "action_sizes": self._action_sizes,
+                "columns": columns,
+                "episodes": 0,
+                "chunks": [],
+            }
+            _write_index(path, self._index)
+
+        self._chunk = None
+        self._chunk_name = None
+        self._rows = 0
+        self._episode = None
+        self._observations = None
+        self._masks = None
+
+    def reset(self, *args, **kwargs) -> tuple[dict[str, Any], dict[str, Any]]:
+        """Resets the environment and starts a new episode in the dataset."""
+        observations, info = self.env.reset(*args, **kwargs)
+        self._episode = self._index["episodes"]
+        self._index["episodes"] += 1
+        self._observations = observations
+        self._masks = {agent: info[agent]["action_mask"] for agent in info if agent in self._agent_ids}
+        return observations, info
+
+    def step(self, actions: dict[str, Any] | None = None, messages: dict[str, Any] | None = None, **kwargs):
+        """Steps the environment and records a row for each agent that acted."""
+        if self._observations is None:
+            raise RuntimeError("reset must be called before step")
+        actions = {} if actions is None else actions
+        results = self.env.step(actions, messages, **kwargs)
+        observations, rewards, terminated, truncated, info = results
+
+        agents = [agent for agent in self.possible_agents if agent in self._observations]
+        block = {name: np.zeros((len(agents),) + shape, dtype) for name, (shape, dtype) in self._specs.items()}
+        for i, agent in enumerate(agents):
+            obs = self._observations[agent]
+            block["observations"][i, : len(obs)] = obs
+            next_obs = observations.get(agent)
+            if next_obs is not None:
+                block["next_observations"][i, : len(next_obs)] = next_obs
+            action = actions.get(agent)
+            block["actions"][i] = action if isinstance(action, (int, np.integer)) else -1
+            mask = self._masks.get(agent)
+            if mask is not None:
+                block["action_masks"][i, : len(mask)] = mask
+            block["rewards"][i] = rewards.get(agent, 0.0)
+            block["terminated"][i] = terminated.get(agent, False)
+            block["truncated"][i] = truncated.get(agent, False)
+            block["agents"][i] = self._agent_ids[agent]
+        block["episodes"][:] = self._episode
+        self._append(block)
+
+        self._observations = observations
+        self._masks = {agent: info[agent]["action_mask"] for agent in info if agent in self._agent_ids}
+        return results
+
+    def _append(self, block: dict[str, np.ndarray]) -> None:
+        """Writes rows into the open chunk, moving on to new chunks as they fill."""
+        count = len(block["actions"])
+        start = 0
+        while start < count:
+            if self._chunk is None:
+                self._open_chunk()
+            n = min(count - start, self.chunk_size - self._rows)
+            for name, column in self._chunk.items():
+                column[self._rows : self._rows + n] = block[name][start : start + n]
+            self._rows += n
+            start += n
+            if self._rows == self.chunk_size:
+                self._close_chunk()
+
+    def _open_chunk(self) -> None:
+        names = [chunk["name"] for chunk in self._index["chunks"]]
+        self._chunk_name = f"{len(names):06d}"
+        while self._chunk_name in names or os.path.exists(os.path.join(self.path, self._chunk_name)):
+            self._chunk_name = f"{int(self._chunk_name) + 1:06d}"
+        directory = os.path.join(self.path, self._chunk_name)
+        os.makedirs(directory)
+        self._chunk = {
+            name: np.lib.format.open_memmap(
+                os.path.join(directory, name + ".npy"), mode="w+", dtype=dtype, shape=(self.chunk_size,) + shape
+            )
+            for name, (shape, dtype) in self._specs.items()
+        }
+        self._rows = 0
+
+    def _close_chunk(self) -> None:
+        """Flushes the open chunk, trims it to the rows written and lists it in the index."""
+        directory = os.path.join(self.path, self._chunk_name)
+        rows = self._rows
+        for column in self._chunk.values():
+            column.flush()
+        self._chunk = None
+        if rows == 0:
+            shutil.rmtree(directory)
+            return
+        if rows < self.chunk_size:
+            for name in self._specs:
+                file = os.path.join(directory, name + ".npy")
+                np.save(file + ".tmp.npy", np.load(file, mmap_mode="r")[:rows])
+                os.replace(file + ".tmp.npy", file)
+        self._index["chunks"].append({"name": self._chunk_name, "rows": rows})
+        _write_index(self.path, self._index)
+
+    def flush(self) -> None:
+        """Closes the open chunk, so every row recorded so far is listed in the index."""
+        if self._chunk is not None:
+            self._close_chunk()
+        else:
+            _write_index(self.path, self._index)
+
+    def close(self) -> None:
+        """Flushes the dataset and closes the wrapped environment if it can be closed."""
+        self.flush()
+        close = getattr(self.env, "close", None)
+        if close is not None:
+            close()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "env":
+            raise AttributeError(name)
+        return getattr(self.env, name)
+
+
+class TrajectoryDataset:
+    """Reads a dataset written by TrajectoryRecorder without loading it into memory.
+
+    Chunk files are memory mapped when first needed, and minibatches only read the rows they contain.
+    """
+
+    def __init__(self, path: str):
+        """
+        Parameters
+        ----------
+        path : str
+            Directory of the dataset.
+        """
+        self.path = path
+        index = _read_index(path)
+        self.agents: list[str] = index["agents"]
+        self.observation_sizes: dict[str, int] = index["observation_sizes"]
+        self.action_sizes: dict[str, int] = index["action_sizes"]
+        self.num_episodes: int = index["episodes"]
+        self.columns: dict[str, tuple[tuple[int, ...], np.dtype]] = {
+            name: (tuple(spec["shape"]), np.dtype(spec["dtype"])) for name, spec in index["columns"].items()
+        }
+        self._chunk_names = [chunk["name"] for chunk in index["chunks"]]
+        rows = np.array([chunk["rows"] for chunk in index["chunks"]], dtype=np.int64)
+        self._starts = np.concatenate([[0], np.cumsum(rows)])
+        self._maps: dict[int, dict[str, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return int(self._starts[-1])
+
+    def _columns(self, chunk: int) -> dict[str, np.ndarray]:
+        columns = self._maps.get(chunk)
+        if columns is None:
+            directory = os.path.join(self.path, self._chunk_names[chunk])
+            columns = self._maps[chunk] = {
+                name: np.load(os.path.join(directory, name + ".npy"), mmap_mode="r") for name in self.columns
+            }
+        return columns
+
+    def get(self, indices: np.ndarray, columns: list[str] | None = None) -> dict[str, np.ndarray]:
+        """Gathers rows of the dataset.
+
+        Parameters
+        ----------
+        indices : np.ndarray
+            Row indices, in any order.
+        columns : list[str] | None
+            Columns to read, by default all of them.
+
+        Returns
+        -------
+        batch : dict[str, np.ndarray]
+            Each column's values at the rows, in the order of indices.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size and (indices.min() < 0 or indices.max() >= len(self)):
+            raise IndexError(f"Row indices must lie in [0, {len(self)})")
+        columns = list(self.columns) if columns is None else columns
+        batch = {
+            name: np.empty(indices.shape + self.columns[name][0], dtype=self.columns[name][1]) for name in columns
+        }
+        # read each chunk's rows in file order
+        order = np.argsort(indices, kind="stable")
+        sorted_indices = indices[order]
+        chunks = np.searchsorted(self._starts, sorted_indices, side="right") - 1
+        bounds = np.flatnonzero(np.diff(chunks)) + 1
+        for group in np.split(np.arange(len(sorted_indices)), bounds):
+            if not len(group):
+                continue
+            chunk = int(chunks[group[0]])
+            offsets = sorted_indices[group] - self._starts[chunk]
+            data = self._columns(chunk)
+            for name in columns:
+                batch[name][order[group]] = data[name][offsets]
+        return batch
+
+    def sample(
+        self, batch_size: int, rng: np.random.Generator | None = None, columns: list[str] | None = None
+    ) -> dict[str, np.ndarray]:
+        """Draws a minibatch of rows uniformly at random, with replacement."""
+        rng = np.random.default_rng() if rng is None else rng
+        return self.get(rng.integers(len(self), size=batch_size), columns)
+
+    def minibatches(
+        self,
+        batch_size: int,
+        shuffle: bool = True,
+        seed: int | None = None,
+        drop_last: bool = False,
+        columns: list[str] | None = None,
+    ) -> Iterator[dict[str, np.ndarray]]:
+        """Yields minibatches covering every row once.
+
+        Parameters
+        ----------
+        batch_size : int
+            Number of rows in each minibatch.
+        shuffle : bool
+            Visit the rows in a random order, otherwise in dataset order.
+        seed : int | None
+            Seed of the shuffle.
+        drop_last : bool
+            Skip the final minibatch if it is smaller than batch_size.
+        columns : list[str] | None
+            Columns to read, by default all of them.
+
+        Returns
+        -------
+        : Iterator[dict[str, np.ndarray]]
+            Minibatches as returned by `get`.
+        """
+        if shuffle:
+            indices = np.random.default_rng(seed).permutation(len(self))
+        else:
+            indices = np.arange(len(self))
+        for start in range(0, len(indices), batch_size):
+            batch = indices[start : start + batch_size]
+            if drop_last and len(batch) < batch_size:
+                break
+            yield self.get(batch, columns)
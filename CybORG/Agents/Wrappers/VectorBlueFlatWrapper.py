@@ -0,0 +1,305 @@
+from __future__ import annotations
+from gymnasium import Space
+
+from CybORG import CybORG
+from CybORG.Agents import SleepAgent, EnterpriseGreenAgent, FiniteStateRedAgent
+from CybORG.Agents.Wrappers.BlueFlatWrapper import BlueFlatWrapper
+from CybORG.Agents.Wrappers.BlueFixedActionWrapper import MESSAGE_LENGTH
+from CybORG.Simulator.Scenarios.EnterpriseScenarioGenerator import (
+    EnterpriseScenarioGenerator,
+)
+
+from typing import Any, Callable
+
+import functools
+import numpy as np
+
+
+def make_blue_flat_env(seed: int | None = None, steps: int = 500) -> BlueFlatWrapper:
+    """Creates the default padded CC4 BlueFlatWrapper used by vector environments.
+
+    Parameters
+    ----------
+    seed : int | None
+        Seed for the CybORG instance.
+    steps : int
+        Episode length passed to the EnterpriseScenarioGenerator.
+
+    Returns
+    -------
+    env : BlueFlatWrapper
+    """
+    sg = EnterpriseScenarioGenerator(
+        blue_agent_class=SleepAgent,
+        green_agent_class=EnterpriseGreenAgent,
+        red_agent_class=FiniteStateRedAgent,
+        steps=steps,
+    )
+    cyborg = CybORG(scenario_generator=sg, seed=seed)
+    return BlueFlatWrapper(cyborg, pad_spaces=True)
+
+
+def make_indexed_blue_flat_env(index: int, seed: int | None = None, steps: int = 500) -> BlueFlatWrapper:
+    """Default vector environment factory, seeding sub-environment `index` with `seed + index`."""
+    return make_blue_flat_env(seed=None if seed is None else seed + index, steps=steps)
+
+
+def buffer_specs(
+    num_envs: int, num_agents: int, obs_dim: int, obs_dtype: np.dtype, num_actions: int
+) -> dict[str, tuple[tuple[int, ...], np.dtype]]:
+    """Returns the shape and dtype of every batched output buffer.
+
+    Parameters
+    ----------
+    num_envs : int
+    num_agents : int
+    obs_dim : int
+    obs_dtype : np.dtype
+    num_actions : int
+
+    Returns
+    -------
+    specs : dict[str, tuple[tuple[int, ...], np.dtype]]
+        Buffer name mapped to (shape, dtype).
+    """
+    shape = (num_envs, num_agents)
+    return {
+        "observations": (shape + (obs_dim,), np.dtype(obs_dtype)),
+        "final_observations": (shape + (obs_dim,), np.dtype(obs_dtype)),
+        "action_masks": (shape + (num_actions,), np.dtype(bool)),
+        "rewards": (shape, np.dtype(np.float32)),
+        "terminated": (shape, np.dtype(bool)),
+        "truncated": (shape, np.dtype(bool)),
+        "episode_ended": ((num_envs,), np.dtype(bool)),
+    }
+
+
+def reset_env_into(
+    env: BlueFlatWrapper, agents: list[str], buffers: dict[str, np.ndarray], index: int, seed: int | None = None
+) -> None:
+    """Resets one sub-environment and writes its observations and masks into row `index`."""
+    if seed is None:
+        observations, info = env.reset()
+    else:
+        observations, info = env.reset(seed=seed)
+    for j, agent in enumerate(agents):
+        buffers["observations"][index, j] = observations[agent]
+        # Masks only change when an episode's hosts change, i.e. on reset.
+        buffers["action_masks"][index, j] = info[agent]["action_mask"]
+
+
+def step_env_into(
+    env: BlueFlatWrapper,
+    agents: list[str],
+    buffers: dict[str, np.ndarray],
+    index: int,
+    actions: np.ndarray,
+    messages: np.ndarray | None = None,
+) -> None:
+    """Steps one sub-environment and writes its results into row `index`.
+
+    If every agent is terminated or truncated, the final observation is moved to
+    the "final_observations" buffer and the sub-environment is reset.
+    """
+    action_dict = {agent: int(actions[j]) for j, agent in enumerate(agents)}
+    message_dict = None
+    if messages is not None:
+        message_dict = {agent: messages[j] for j, agent in enumerate(agents)}
+
+    observations, rewards, terminated, truncated, _ = env.step(action_dict, messages=message_dict)
+
+    for j, agent in enumerate(agents):
+        if agent in observations:
+            buffers["observations"][index, j] = observations[agent]
+        buffers["rewards"][index, j] = rewards.get(agent, 0.0)
+        buffers["terminated"][index, j] = terminated.get(agent, False)
+        buffers["truncated"][index, j] = truncated.get(agent, False)
+
+    ended = bool(np.all(buffers["terminated"][index] | buffers["truncated"][index]))
+    buffers["episode_ended"][index] = ended
+    if ended:
+        buffers["final_observations"][index] = buffers["observations"][index]
+        reset_env_into(env, agents, buffers, index)
+
+
+def check_step_inputs(
+    actions: np.ndarray, messages: np.ndarray | None, num_envs: int, num_agents: int
+) -> tuple[np.ndarray, np.ndarray | None]:
+    """Converts batched actions and messages to arrays and validates their shapes."""
+    actions = np.asarray(actions)
+    if actions.shape != (num_envs, num_agents):
+        raise ValueError(
+            f"Expected actions of shape {(num_envs, num_agents)}, got {actions.shape}"
+        )
+    if messages is not None:
+        messages = np.asarray(messages, dtype=bool)
+        expected = (num_envs, num_agents, MESSAGE_LENGTH)
+        if messages.shape != expected:
+            raise ValueError(f"Expected messages of shape {expected}, got {messages.shape}")
+    return actions, messages
+
+
+class VectorBlueFlatWrapper:
+    """Steps a batch of independent padded BlueFlatWrapper environments with one call.
+
+    Each sub-environment owns its own CybORG and EnterpriseScenarioGenerator
+    instance. Observations, rewards, done flags and action masks are written
+    into preallocated buffers indexed by [env, agent], where the agent axis
+    follows the sorted order of `possible_agents`. Sub-environments whose
+    episode ends during a step are reset immediately: the returned observation
+    and action mask belong to the new episode, while the last observation of
+    the finished episode is available through `info["final_observation"]`.
+
+    All sub-environments must use padded spaces (`pad_spaces=True`) so that
+    every agent shares the same observation and action dimensions.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        env_fn: Callable[[int], BlueFlatWrapper] | None = None,
+        seed: int | None = None,
+        steps: int = 500,
+        copy: bool = True,
+    ):
+        """Initialize the vector environment.
+
+        Parameters
+        ----------
+        num_envs : int
+            Number of sub-environments to create.
+        env_fn : Callable[[int], BlueFlatWrapper] | None
+            Factory called with the index of each sub-environment. Defaults to
+            `make_blue_flat_env` seeded with `seed + index`.
+        seed : int | None
+            Base seed for the default factory. Ignored if env_fn is provided.
+        steps : int
+            Episode length for the default factory. Ignored if env_fn is provided.
+        copy : bool
+            Return copies of the internal buffers. If False, the returned arrays
+            are overwritten by the next call to reset or step.
+        """
+        if num_envs < 1:
+            raise ValueError(f"num_envs must be positive, got {num_envs}")
+
+        if env_fn is None:
+            env_fn = functools.partial(make_indexed_blue_flat_env, seed=seed, steps=steps)
+
+        self.num_envs = num_envs
+        self.copy = copy
+        self.envs: list[BlueFlatWrapper] = [env_fn(i) for i in range(num_envs)]
+
+        for env in self.envs:
+            if not env.is_padded:
+                raise ValueError("VectorBlueFlatWrapper requires pad_spaces=True.")
+
+        self.possible_agents = sorted(self.envs[0].possible_agents)
+        self.num_agents = len(self.possible_agents)
+
+        obs_space = self.envs[0].observation_space(self.possible_agents[0])
+        act_space = self.envs[0].action_space(self.possible_agents[0])
+        self.obs_dim = obs_space.shape[0]
+        self.num_actions = int(act_space.n)
+
+        specs = buffer_specs(
+            num_envs, self.num_agents, self.obs_dim, obs_space.dtype, self.num_actions
+        )
+        self._buffers = {
+            name: np.zeros(shape, dtype=dtype) for name, (shape, dtype) in specs.items()
+        }
+
+    def reset(self, seed: int | None = None) -> tuple[np.ndarray, dict[str, Any]]:
+        """Reset every sub-environment.
+
+        Parameters
+        ----------
+        seed : int | None
+            If provided, sub-environment i is reset with seed `seed + i`.
+
+        Returns
+        -------
+        observations : np.ndarray
+            Array of shape (num_envs, num_agents, obs_dim).
+        info : dict[str, Any]
+            Contains "action_mask", an array of shape (num_envs, num_agents, num_actions).
+        """
+        for i, env in enumerate(self.envs):
+            reset_env_into(
+                env, self.possible_agents, self._buffers, i, None if seed is None else seed + i
+            )
+        self._buffers["episode_ended"][:] = False
+        return self._reset_output()
+
+    def step(
+        self, actions: np.ndarray, messages: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        """Step every sub-environment with a batch of action indices.
+
+        Parameters
+        ----------
+        actions : np.ndarray
+            Integer array of shape (num_envs, num_agents).
+        messages : np.ndarray | None
+            Optional boolean array of shape (num_envs, num_agents, MESSAGE_LENGTH).
+
+        Returns
+        -------
+        observations : np.ndarray
+            Array of shape (num_envs, num_agents, obs_dim).
+        rewards : np.ndarray
+            Array of shape (num_envs, num_agents).
+        terminated : np.ndarray
+            Array of shape (num_envs, num_agents).
+        truncated : np.ndarray
+            Array of shape (num_envs, num_agents).
+        info : dict[str, Any]
+            Contains "action_mask" (num_envs, num_agents, num_actions),
+            "episode_ended" (num_envs,) flagging sub-environments that were
+            reset because their episode ended on this step, and
+            "final_observation" holding the last observation of those episodes.
+        """
+        actions, messages = check_step_inputs(actions, messages, self.num_envs, self.num_agents)
+        for i, env in enumerate(self.envs):
+            step_env_into(
+                env,
+                self.possible_agents,
+                self._buffers,
+                i,
+                actions[i],
+                None if messages is None else messages[i],
+            )
+        return self._step_output()
+
+    def _reset_output(self) -> tuple[np.ndarray, dict[str, Any]]:
+        return self._output(self._buffers["observations"]), {
+            "action_mask": self._output(self._buffers["action_masks"])
+        }
+
+    def _step_output(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        buffers = self._buffers
+        return (
+            self._output(buffers["observations"]),
+            self._output(buffers["rewards"]),
+            self._output(buffers["terminated"]),
+            self._output(buffers["truncated"]),
+            {
+                "action_mask": self._output(buffers["action_masks"]),
+                "episode_ended": self._output(buffers["episode_ended"]),
+                "final_observation": self._output(buffers["final_observations"]),
+            },
+        )
+
+    def _output(self, buffer: np.ndarray) -> np.ndarray:
+        return buffer.copy() if self.copy else buffer
+
+    def observation_space(self, agent_name: str) -> Space:
+        """Returns the (shared) observation space of a single agent in one sub-environment."""
+        return self.envs[0].observation_space(agent_name)
+
+    def action_space(self, agent_name: str) -> Space:
+        """Returns the (shared) action space of a single agent in one sub-environment."""
+        return self.envs[0].action_space(agent_name)
+
+    def close(self) -> None:
+        """Releases the sub-environments."""
+        self.envs = []
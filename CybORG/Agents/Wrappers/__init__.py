@@ -5,3 +5,6 @@ from .BlueFlatWrapper import BlueFlatWrapper
 from .BlueEnterpriseWrapper import BlueEnterpriseWrapper
 from .EnterpriseMAE import EnterpriseMAE
 from .VisualiseRedExpansion import VisualiseRedExpansion
+from .VectorBlueFlatWrapper import VectorBlueFlatWrapper
+from .SubprocVectorBlueFlatWrapper import SubprocVectorBlueFlatWrapper
+from .TrajectoryRecorder import TrajectoryRecorder, TrajectoryDataset
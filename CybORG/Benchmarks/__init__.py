@@ -0,0 +1,10 @@
+from .benchmarks import (
+    EPISODE_LENGTH,
+    SCENARIOS,
+    THROUGHPUT_METRICS,
+    make_cyborg,
+    run_benchmarks,
+    compare_reports,
+    load_report,
+    save_report,
+)
@@ -0,0 +1,44 @@
+import json
+import sys
+
+from CybORG.Benchmarks import EPISODE_LENGTH, SCENARIOS, run_benchmarks, compare_reports, load_report, save_report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser("CybORG Benchmarks")
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=list(SCENARIOS), default=None, help="Scenarios to run, by default all"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the environments and blue actions")
+    parser.add_argument("--episodes", type=int, default=1, help="Episodes run by each stepping scenario")
+    parser.add_argument("--steps", type=int, default=EPISODE_LENGTH, help="Length of each episode")
+    parser.add_argument("--resets", type=int, default=20, help="Number of resets timed")
+    parser.add_argument("--envs", type=int, default=4, help="Number of environments whose memory is measured")
+    parser.add_argument("--output", type=str, default=None, help="Path to save the JSON report to")
+    parser.add_argument("--baseline", type=str, default=None, help="JSON report to compare the throughput against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="Fraction of the baseline throughput that may be lost before the comparison fails",
+    )
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        args.scenarios, seed=args.seed, episodes=args.episodes, steps=args.steps, resets=args.resets, envs=args.envs
+    )
+    if args.output is not None:
+        save_report(report, args.output)
+    print(json.dumps(report["scenarios"], indent=2))
+
+    if args.baseline is not None:
+        comparisons = compare_reports(report, load_report(args.baseline), threshold=args.threshold)
+        for comparison in comparisons:
+            ratio = "not comparable" if comparison["ratio"] is None else f"{comparison['ratio']:.1%}"
+            print(
+                f"{comparison['scenario']}.{comparison['metric']}: {comparison['current']:.1f} vs "
+                f"{comparison['baseline']:.1f} baseline ({ratio})"
+                + (" REGRESSED" if comparison["regressed"] else "")
+            )
+        if any(comparison["regressed"] for comparison in comparisons):
+            sys.exit(1)
@@ -0,0 +1,270 @@
+import gc
+import json
+import platform
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from CybORG import CybORG, CYBORG_VERSION
+from CybORG.Agents import SleepAgent, EnterpriseGreenAgent, FiniteStateRedAgent
+from CybORG.Agents.Wrappers import BlueFlatWrapper, EnterpriseMAE
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
+
+EPISODE_LENGTH = 500
+
+# Metrics compared against a baseline, all of them rates where higher is better
+THROUGHPUT_METRICS = ('steps_per_sec', 'resets_per_sec')
+
+
+def make_cyborg(seed: int, steps: int = EPISODE_LENGTH) -> CybORG:
+    """Creates the CC4 environment used by the evaluation, with a sleeping blue team.
+
+    Parameters
+    ----------
+    seed : int
+        seed for the CybORG instance
+    steps : int
+        episode length
+
+    Returns
+    -------
+    cyborg : CybORG
+    """
+    sg = EnterpriseScenarioGenerator(
+        blue_agent_class=SleepAgent,
+        green_agent_class=EnterpriseGreenAgent,
+        red_agent_class=FiniteStateRedAgent,
+        steps=steps,
+    )
+    return CybORG(scenario_generator=sg, seed=seed)
+
+
+def _latency_stats(latencies: List[float], elapsed: float) -> dict:
+    """Summarises the durations of a run of steps."""
+    latencies = np.array(latencies)
+    return {
+        'steps': len(latencies),
+        'seconds': elapsed,
+        'steps_per_sec': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50)) * 1e3,
+        'p99_ms': float(np.percentile(latencies, 99)) * 1e3,
+    }
+
+
+def _run_episodes(reset: Callable[[], None], step: Callable[[], bool], episodes: int) -> dict:
+    """Times each step of a number of episodes, leaving the resets out of the timings.
+
+    Parameters
+    ----------
+    reset : Callable[[], None]
+        starts an episode
+    step : Callable[[], bool]
+        takes a step, returning True when the episode is over
+    episodes : int
+        number of episodes to run
+
+    Returns
+    -------
+    : dict
+        number of 'steps', 'seconds' spent stepping, 'steps_per_sec' and the 'p50_ms' and 'p99_ms' step latencies
+    """
+    latencies = []
+    for _ in range(episodes):
+        reset()
+        done = False
+        while not done:
+            start = perf_counter()
+            done = step()
+            latencies.append(perf_counter() - start)
+    return _latency_stats(latencies, sum(latencies))
+
+
+def bench_sleep_blue(seed: int = 0, episodes: int = 1, steps: int = EPISODE_LENGTH) -> dict:
+    """Steps the raw simulator with a sleeping blue team against the evaluation's green and red agents."""
+    cyborg = make_cyborg(seed, steps)
+
+    def step():
+        cyborg.step()
+        return cyborg.environment_controller.done
+
+    return _run_episodes(lambda: cyborg.reset(), step, episodes)
+
+
+def _random_wrapper_actions(env, rng: np.random.Generator) -> Dict[str, int]:
+    """Samples a valid action index for every blue agent of a wrapped environment."""
+    return {
+        agent: int(rng.choice(np.flatnonzero(env.action_mask(agent))))
+        for agent in env.agents
+    }
+
+
+def bench_blue_flat_wrapper(seed: int = 0, episodes: int = 1, steps: int = EPISODE_LENGTH) -> dict:
+    """Steps a BlueFlatWrapper, with every blue agent taking a random valid action."""
+    env = BlueFlatWrapper(make_cyborg(seed, steps), pad_spaces=True)
+    rng = np.random.default_rng(seed)
+
+    def step():
+        _, _, terminated, truncated, _ = env.step(_random_wrapper_actions(env, rng))
+        return all(terminated.values()) or all(truncated.values())
+
+    return _run_episodes(lambda: env.reset(), step, episodes)
+
+
+def bench_enterprise_mae(seed: int = 0, episodes: int = 1, steps: int = EPISODE_LENGTH) -> dict:
+    """Steps an EnterpriseMAE, with every blue agent taking a random valid action."""
+    env = EnterpriseMAE(make_cyborg(seed, steps))
+    rng = np.random.default_rng(seed)
+
+    def step():
+        _, _, _, truncated, _ = env.step(_random_wrapper_actions(env, rng))
+        return truncated['__all__']
+
+    return _run_episodes(lambda: env.reset(), step, episodes)
+
+
+def bench_resets(seed: int = 0, resets: int = 20) -> dict:
+    """Times resets of the raw simulator."""
+    cyborg = make_cyborg(seed)
+    start = perf_counter()
+    for _ in range(resets):
+        cyborg.reset()
+    elapsed = perf_counter() - start
+    return {'resets': resets, 'seconds': elapsed, 'resets_per_sec': resets / elapsed}
+
+
+def bench_memory(seed: int = 0, envs: int = 4) -> dict:
+    """Measures the memory allocated by each environment after a reset.
+
+    Allocations are traced with tracemalloc while the environments are created and reset, so the figure covers the
+    Python heap of the simulator but not the interpreter or imported modules.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        cyborgs = []
+        for index in range(envs):
+            cyborg = make_cyborg(seed + index)
+            cyborg.reset()
+            cyborgs.append(cyborg)
+        gc.collect()
+        allocated, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'envs': envs,
+        'bytes_per_env': (allocated - before) / envs,
+        'peak_bytes': peak - before,
+    }
+
+
+# Benchmark scenarios by name, in the order they run
+SCENARIOS = {
+    'sleep_blue': bench_sleep_blue,
+    'blue_flat_wrapper': bench_blue_flat_wrapper,
+    'enterprise_mae': bench_enterprise_mae,
+    'resets': bench_resets,
+    'memory': bench_memory,
+}
+
+
+def run_benchmarks(scenarios: List[str] = None, seed: int = 0, episodes: int = 1, steps: int = EPISODE_LENGTH,
+                   resets: int = 20, envs: int = 4) -> dict:
+    """Runs the benchmark scenarios and gathers their results in a report.
+
+    Parameters
+    ----------
+    scenarios : List[str], optional
+        names of the scenarios in SCENARIOS to run, by default all of them
+    seed : int
+        seed for the environments and the random blue actions
+    episodes : int
+        number of episodes run by each stepping scenario
+    steps : int
+        length of each episode
+    resets : int
+        number of resets timed
+    envs : int
+        number of environments whose memory is measured
+
+    Returns
+    -------
+    report : dict
+        the 'environment' the benchmarks ran in, their 'parameters' and the results of each of the 'scenarios'
+    """
+    scenarios = list(SCENARIOS) if scenarios is None else scenarios
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        raise ValueError(f'Unknown benchmark scenarios {unknown}, expected some of {list(SCENARIOS)}')
+
+    arguments = {
+        'sleep_blue': {'episodes': episodes, 'steps': steps},
+        'blue_flat_wrapper': {'episodes': episodes, 'steps': steps},
+        'enterprise_mae': {'episodes': episodes, 'steps': steps},
+        'resets': {'resets': resets},
+        'memory': {'envs': envs},
+    }
+    return {
+        'environment': {
+            'cyborg_version': CYBORG_VERSION,
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+        },
+        'parameters': {'seed': seed, 'episodes': episodes, 'steps': steps, 'resets': resets, 'envs': envs},
+        'scenarios': {name: SCENARIOS[name](seed=seed, **arguments[name]) for name in scenarios},
+    }
+
+
+def compare_reports(report: dict, baseline: dict, threshold: float = 0.1) -> List[dict]:
+    """Compares the throughput of a report against a baseline report.
+
+    Parameters
+    ----------
+    report : dict
+        report of the current benchmarks
+    baseline : dict
+        report to compare against
+    threshold : float
+        largest fraction of the baseline throughput that may be lost before it counts as a regression
+
+    Returns
+    -------
+    comparisons : List[dict]
+        for each throughput metric in both reports its 'scenario', 'metric', 'baseline' and 'current' values, their
+        'ratio' and whether it 'regressed'. The 'ratio' is None, and the metric never counts as regressed, when the
+        baseline value is zero
+    """
+    comparisons = []
+    for name, results in report['scenarios'].items():
+        baseline_results = baseline.get('scenarios', {}).get(name, {})
+        for metric in THROUGHPUT_METRICS:
+            if metric not in results or metric not in baseline_results:
+                continue
+            # a baseline that made no progress gives nothing to compare against
+            ratio = results[metric] / baseline_results[metric] if baseline_results[metric] else None
+            comparisons.append({
+                'scenario': name,
+                'metric': metric,
+                'baseline': baseline_results[metric],
+                'current': results[metric],
+                'ratio': ratio,
+                'regressed': ratio is not None and ratio < 1 - threshold,
+            })
+    return comparisons
+
+
+def load_report(path: str) -> dict:
+    """Loads a report saved as JSON."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_report(report: dict, path: str):
+    """Saves a report as JSON."""
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,156 @@
+"""Compressed JSONL logs of evaluation episodes.
+
+Each line of a log is the JSON record of one episode, written as soon as the episode finishes so that memory does not
+grow with the number of episodes. Values that JSON cannot hold are encoded as tagged objects:
+
+- numpy arrays as ``{"__ndarray__": <base64 of the raw bytes>, "dtype": <dtype>, "shape": <shape>}``
+- actions as ``{"__action__": <class name>, "params": <Action.get_params()>}``
+
+Numpy scalars become the matching Python numbers and any other value its string. `read_episode_log` decodes arrays
+back to numpy with their original dtype and shape, and leaves actions as their tagged objects.
+"""
+import base64
+import gzip
+import json
+from enum import Enum
+from typing import Iterator
+
+import numpy as np
+
+from CybORG.Simulator.Actions import Action
+
+
+def encode_value(value):
+    """Encodes a value from an observation or action as JSON compatible data.
+
+    Parameters
+    ----------
+    value : Any
+
+    Returns
+    -------
+    : Any
+        data made of dicts with string keys, lists, strings, numbers, booleans and None
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        return {
+            "__ndarray__": base64.b64encode(value.tobytes()).decode("ascii"),
+            "dtype": value.dtype.str,
+            "shape": list(value.shape),
+        }
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Action):
+        return encode_action(value)
+    if isinstance(value, Enum):
+        return str(value)
+    if isinstance(value, dict):
+        return {str(key): encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [encode_value(item) for item in value]
+    return str(value)
+
+
+def encode_action(action: Action) -> dict:
+    """Encodes an action as its class name and parameters."""
+    return {"__action__": type(action).__name__, "params": encode_value(action.get_params())}
+
+
+def decode_value(data):
+    """Decodes the numpy arrays of data encoded by `encode_value`."""
+    if isinstance(data, dict):
+        if "__ndarray__" in data:
+            array = np.frombuffer(base64.b64decode(data["__ndarray__"]), dtype=np.dtype(data["dtype"]))
+            return array.reshape(data["shape"]).copy()
+        return {key: decode_value(item) for key, item in data.items()}
+    if isinstance(data, list):
+        return [decode_value(item) for item in data]
+    return data
+
+
+def encode_episode(episode: int, seeds: tuple, total_reward: float, actions: list, observations: list) -> str:
+    """Encodes the record of an episode as a line of JSON.
+
+    Parameters
+    ----------
+    episode : int
+        index of the episode in the evaluation
+    seeds : Tuple[int, int]
+        CybORG and agent seed of the episode
+    total_reward : float
+        sum of the rewards of the episode
+    actions : List[Dict[str, Any]]
+        actions of each agent at each step, already encoded or as Action objects
+    observations : List[Dict[str, Any]]
+        observations of each agent at each step, already encoded or as given by the wrapper
+
+    Returns
+    -------
+    : str
+        the record, ending in a newline
+    """
+    record = {
+        "episode": episode,
+        "seeds": list(seeds),
+        "total_reward": total_reward,
+        "steps": [
+            {"actions": encode_value(step_actions), "observations": encode_value(step_observations)}
+            for step_actions, step_observations in zip(actions, observations)
+        ],
+    }
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+class EpisodeLogWriter:
+    """Appends episode records to a gzip compressed JSONL file.
+
+    Records are written as they arrive, so only the episode being written is held in memory. The gzip header carries
+    no timestamp, so the same records always give the same file. Use as a context manager, or call `close` when done.
+    """
+
+    def __init__(self, path: str, compresslevel: int = 6):
+        """
+        Parameters
+        ----------
+        path : str
+            path of the log, conventionally ending in .jsonl.gz
+        compresslevel : int
+            gzip compression level from 1 to 9
+        """
+        self.path = path
+        self._file = gzip.GzipFile(path, "wb", compresslevel=compresslevel, mtime=0)
+
+    def write(self, line: str):
+        """Writes an episode record encoded by `encode_episode`."""
+        self._file.write(line.encode("utf-8"))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_episode_log(path: str) -> Iterator[dict]:
+    """Reads the episode records of a log one at a time.
+
+    Parameters
+    ----------
+    path : str
+        path of a log written by EpisodeLogWriter
+
+    Returns
+    -------
+    : Iterator[dict]
+        the 'episode', 'seeds', 'total_reward' and 'steps' of each episode in order, where each step holds the
+        'actions' and 'observations' of each agent, with numpy arrays decoded
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            yield decode_value(json.loads(line))
@@ -4,6 +4,7 @@ from statistics import mean, stdev
 
 from CybORG import CybORG, CYBORG_VERSION
 from CybORG.Agents import SleepAgent, EnterpriseGreenAgent, FiniteStateRedAgent
+from CybORG.Evaluation.episode_log import EpisodeLogWriter, encode_episode, encode_value
 from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
 
 from datetime import datetime
@@ -12,6 +13,10 @@ import json
 
 import sys
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
 
 def rmkdir(path: str):
@@ -53,23 +58,169 @@ def load_submission(source: str):
     return Submission
 
 
-def run_evaluation(submission, log_path, max_eps=100, write_to_file=True, seed=None):
-    cyborg_version = CYBORG_VERSION
-    EPISODE_LENGTH = 500
-    scenario = "Scenario4"
+EPISODE_LENGTH = 500
 
-    version_header = f"CybORG v{cyborg_version}, {scenario}"
-    author_header = f"Author: {submission.NAME}, Team: {submission.TEAM}, Technique: {submission.TECHNIQUE}"
+# Environment of the episodes run by this process, set by `_init_episode_worker`
+_worker = None
+
+
+def episode_seeds(seed, max_eps: int) -> list:
+    """Derives independent seeds for each episode from the master seed.
+
+    Each episode gets a seed for CybORG and a seed for the submission's agents, so an episode plays out the same
+    whichever process runs it and whatever ran before it.
 
+    Parameters
+    ----------
+    seed : int or None
+        master seed, None for fresh entropy
+    max_eps : int
+        number of episodes
+
+    Returns
+    -------
+    : List[Tuple[int, int]]
+        the CybORG and agent seed of each episode
+    """
+    return [
+        tuple(int(s) for s in child.generate_state(2))
+        for child in np.random.SeedSequence(seed).spawn(max_eps)
+    ]
+
+
+def _init_episode_worker(submission, write_to_file: bool):
+    """Creates the environment that the episodes run by this process share."""
+    global _worker
     sg = EnterpriseScenarioGenerator(
         blue_agent_class=SleepAgent,
         green_agent_class=EnterpriseGreenAgent,
         red_agent_class=FiniteStateRedAgent,
         steps=EPISODE_LENGTH,
     )
-    cyborg = CybORG(sg, "sim", seed=seed)
-    wrapped_cyborg = submission.wrap(cyborg)
-    
+    cyborg = CybORG(sg, "sim")
+    _worker = (submission, cyborg, submission.wrap(cyborg), write_to_file)
+
+
+def _end_episode(agent):
+    """Calls the agent's end_episode, which agents without episode state may leave unimplemented."""
+    try:
+        agent.end_episode()
+    except NotImplementedError:
+        pass
+
+
+def _run_episode(episode: int, seeds: tuple):
+    """Runs one episode in the environment of this process.
+
+    Parameters
+    ----------
+    episode : int
+        index of the episode
+    seeds : Tuple[int, int]
+        the CybORG and agent seed of the episode, from `episode_seeds`
+
+    Returns
+    -------
+    total_reward : float
+    record : str or None
+        the episode's log record from `encode_episode`, None unless writing to file
+    """
+    submission, cyborg, wrapped_cyborg, write_to_file = _worker
+    cyborg_seed, agent_seed = seeds
+    # the wrapper's reset resets CybORG with its generator
+    cyborg.set_seed(cyborg_seed)
+    # episodes run in any order and process, so every agent starts each of them from the same state
+    for index, agent in enumerate(submission.AGENTS.values()):
+        _end_episode(agent)
+        if hasattr(agent, "np_random"):
+            agent.np_random = np.random.default_rng([agent_seed, index])
+
+    observations, _ = wrapped_cyborg.reset()
+    r = []
+    a = []
+    o = []
+    for j in range(EPISODE_LENGTH):
+        actions = {
+            agent_name: agent.get_action(
+                observations[agent_name], wrapped_cyborg.action_space(agent_name)
+            )
+            for agent_name, agent in submission.AGENTS.items()
+            if agent_name in wrapped_cyborg.agents
+        }
+        observations, rew, term, trunc, info = wrapped_cyborg.step(actions)
+        done = {
+            agent: term.get(agent, False) or trunc.get(agent, False)
+            for agent in wrapped_cyborg.agents
+        }
+        if all(done.values()):
+            break
+        r.append(mean(rew.values()))
+        if write_to_file:
+            a.append(
+                encode_value({
+                    agent_name: cyborg.get_last_action(agent_name)
+                    for agent_name in wrapped_cyborg.agents
+                })
+            )
+            o.append(
+                encode_value({
+                    agent_name: observations[agent_name]
+                    for agent_name in observations.keys()
+                })
+            )
+    total_reward = sum(r)
+    if not write_to_file:
+        return total_reward, None
+    return total_reward, encode_episode(episode, seeds, total_reward, a, o)
+
+
+def _run_episodes(submission, seeds: list, write_to_file: bool, workers: int):
+    """Runs the episodes of an evaluation, yielding their results in episode order."""
+    if workers <= 1:
+        _init_episode_worker(submission, write_to_file)
+        yield from map(_run_episode, range(len(seeds)), seeds)
+        return
+
+    # forked workers inherit the submission, which need not be importable by name
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_episode_worker,
+        initargs=(submission, write_to_file),
+    ) as executor:
+        yield from executor.map(_run_episode, range(len(seeds)), seeds)
+
+
+def run_evaluation(submission, log_path, max_eps=100, write_to_file=True, seed=None, workers=1):
+    """Evaluates a submission over a number of episodes.
+
+    Each episode is seeded from `seed` by `episode_seeds`, so the episodes can be shared between worker processes
+    and the rewards and logs, which are merged in episode order, do not depend on the number of workers.
+
+    Parameters
+    ----------
+    submission : type
+        the submission, providing its agents and wrapper
+    log_path : str
+        directory to write the results to
+    max_eps : int
+        number of episodes
+    write_to_file : bool
+        whether to write the results to log_path, with a record of each episode in episodes.jsonl.gz that can be
+        read with `read_episode_log`
+    seed : int, optional
+        master seed of the episodes
+    workers : int
+        number of processes to run the episodes in
+    """
+    cyborg_version = CYBORG_VERSION
+    scenario = "Scenario4"
+
+    version_header = f"CybORG v{cyborg_version}, {scenario}"
+    author_header = f"Author: {submission.NAME}, Team: {submission.TEAM}, Technique: {submission.TECHNIQUE}"
+
     print(version_header)
     print(author_header)
     print(
@@ -84,48 +235,17 @@ def run_evaluation(submission, log_path, max_eps=100, write_to_file=True, seed=N
     start = datetime.now()
 
     total_reward = []
-    actions_log = []
-    obs_log = []
-    for i in range(max_eps):
-        observations, _ = wrapped_cyborg.reset()
-        r = []
-        a = []
-        o = []
-        count = 0
-        for j in range(EPISODE_LENGTH):
-            actions = {
-                agent_name: agent.get_action(
-                    observations[agent_name], wrapped_cyborg.action_space(agent_name)
-                )
-                for agent_name, agent in submission.AGENTS.items()
-                if agent_name in wrapped_cyborg.agents
-            }
-            observations, rew, term, trunc, info = wrapped_cyborg.step(actions)
-            done = {
-                agent: term.get(agent, False) or trunc.get(agent, False)
-                for agent in wrapped_cyborg.agents
-            }
-            if all(done.values()):
-                break
-            r.append(mean(rew.values()))
-            if write_to_file:
-                a.append(
-                    {
-                        agent_name: cyborg.get_last_action(agent_name)
-                        for agent_name in wrapped_cyborg.agents
-                    }       
-                )
-                o.append(
-                    {
-                        agent_name: observations[agent_name]
-                        for agent_name in observations.keys()
-                    }
-                )
-        total_reward.append(sum(r))
-
-        if write_to_file:
-            actions_log.append(a)
-            obs_log.append(o)
+    seeds = episode_seeds(seed, max_eps)
+    # episodes are logged as they finish, so memory does not grow with the number of episodes
+    episode_log = EpisodeLogWriter(log_path + "episodes.jsonl.gz") if write_to_file else None
+    try:
+        for episode_reward, record in _run_episodes(submission, seeds, write_to_file, workers):
+            total_reward.append(episode_reward)
+            if episode_log is not None:
+                episode_log.write(record)
+    finally:
+        if episode_log is not None:
+            episode_log.close()
 
     end = datetime.now()
     difference = end - start
@@ -146,24 +266,6 @@ def run_evaluation(submission, log_path, max_eps=100, write_to_file=True, seed=N
             data.write(reward_string + "\n")
             data.write(f"Using agents {submission.AGENTS}")
 
-        with open(log_path + "full.txt", "w") as data:
-            data.write(version_header + "\n")
-            data.write(author_header + "\n")
-            data.write(reward_string + "\n")
-            for act, obs, sum_rew in zip(actions_log, obs_log, total_reward):
-                data.write(
-                    f"actions: {act},\n observations: {obs},\n total reward: {sum_rew}\n"
-                )
-        
-        with open(log_path + "actions.txt", "w") as data:
-            data.write(version_header + "\n")
-            data.write(author_header + "\n")
-            data.write(reward_string + "\n")
-            for act in zip(actions_log):
-                data.write(
-                    f"actions: {act}"
-                )
-
         with open(log_path + "summary.json", "w") as output:
             data = {
                 "submission": {
@@ -211,6 +313,9 @@ if __name__ == "__main__":
         "--seed", type=int, default=None, help="Set the seed for CybORG"
     )
     parser.add_argument("--max-eps", type=int, default=100, help="Max episodes to run")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of processes to run the episodes in"
+    )
     args = parser.parse_args()
     args.output_path = os.path.abspath(args.output_path)
     args.submission_path = os.path.abspath(args.submission_path)
@@ -225,5 +330,9 @@ if __name__ == "__main__":
 
     submission = load_submission(args.submission_path)
     run_evaluation(
-        submission, max_eps=args.max_eps, log_path=args.output_path, seed=args.seed
+        submission,
+        max_eps=args.max_eps,
+        log_path=args.output_path,
+        seed=args.seed,
+        workers=args.workers,
     )
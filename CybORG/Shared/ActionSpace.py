@@ -1,9 +1,13 @@
 # Copyright DST Group. Licensed under the MIT license.
 
 from inspect import signature
+from typing import Dict, List, Tuple
+
+import numpy as np
 
 from CybORG.Shared import CybORGLogger
 from CybORG.Shared.Enums import SessionType
+from CybORG.Simulator.Actions.Action import InvalidAction
 
 MAX_SUBNETS = 10
 MAX_ADDRESSES = 10
@@ -20,6 +24,74 @@ SESSION_TYPES = (
     SessionType.GREY_SESSION, SessionType.BLUE_DRONE_SESSION, SessionType.RED_DRONE_SESSION
 )
 
+# Number of observations whose updates ActionSpace queues before adding them to its index
+MAX_PENDING_UPDATES = 32
+
+# Parameters of the action space that are indexed by ActionSpace, mapped to the parameter table interning their values
+INDEXED_PARAMETERS = {
+    'hostname': 'hostname',
+    'subnet': 'subnet',
+    'ip_address': 'ip_address',
+    'process': 'process',
+    'port': 'port',
+    'username': 'username',
+    'password': 'password',
+    'session': 'session',
+    'target_session': 'session',
+    'agent': 'agent',
+}
+
+
+class ParameterTable:
+    """Interns the values of one type of action parameter, giving each value a fixed index.
+
+    The tables are shared by the action spaces of all agents in an episode, so an index means the same value for every
+    agent and masks of different agents line up.
+
+    Attributes
+    ----------
+    values : list
+        value of each index, in the order the values were first seen
+    index : dict
+        index of each value
+    """
+
+    def __init__(self):
+        self.values = []
+        self.index = {}
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, values) -> List[int]:
+        """Gets the indices of values, adding the values that are not in the table yet.
+
+        Parameters
+        ----------
+        values : Sequence
+            values to intern
+
+        Returns
+        -------
+        indices : List[int]
+        """
+        index = self.index
+        indices = [index.get(value) for value in values]
+        if None in indices:
+            for position, value in enumerate(values):
+                if indices[position] is None:
+                    i = index.get(value)
+                    if i is None:
+                        i = index[value] = len(self.values)
+                        self.values.append(value)
+                    indices[position] = i
+        return indices
+
+
+def create_parameter_tables() -> Dict[str, ParameterTable]:
+    """Creates an empty parameter table for each table named in INDEXED_PARAMETERS."""
+    return {table: ParameterTable() for table in INDEXED_PARAMETERS.values()}
+
 
 class ActionSpace(CybORGLogger):
     """Action Space of the agent
@@ -49,9 +121,18 @@ class ActionSpace(CybORGLogger):
         mapping of hostname to validity
     agent : Dict[str, bool]
         mapping of agent name to validity
+    parameter_tables : Dict[str, ParameterTable]
+        tables interning the values of the indexed parameters, shared by the agents of an episode
+
+    Besides the mappings, the values of the parameters in INDEXED_PARAMETERS are indexed in numpy arrays of flags
+    aligned with the parameter tables. `update` interns the values of its observations in the tables straight away, so
+    the index of a value does not depend on when masks are read, but only queues setting their flags. The queue is
+    applied when a mask or count is next requested, when it grows past MAX_PENDING_UPDATES observations, and before
+    the action space is pickled, so it stays small for agents that never read masks. The index follows `update` and
+    `reset`; changes made directly to the mappings are not seen by it.
     """
 
-    def __init__(self, actions, agent, allowed_subnets):
+    def __init__(self, actions, agent, allowed_subnets, parameter_tables: Dict[str, ParameterTable] = None):
         """Loads the inital information the agent knows about.
         
         Parameters
@@ -62,6 +143,8 @@ class ActionSpace(CybORGLogger):
             agent name
         allowed_subnets : dict
             subnets the agent is allowed to access
+        parameter_tables : Dict[str, ParameterTable], optional
+            tables to intern parameter values in, by default tables of the action space's own
         """
         self.actions = {i: True for i in actions}
         self.action_params = {}
@@ -78,6 +161,32 @@ class ActionSpace(CybORGLogger):
         self.port = {}
         self.hostname = {}
         self.agent = {agent: True}
+        self._validator = None
+        self.parameter_tables = parameter_tables if parameter_tables is not None else create_parameter_tables()
+        self._reset_index(agent, reset_hostnames=True)
+
+    @property
+    def allowed_subnets(self):
+        return self._allowed_subnets
+
+    @allowed_subnets.setter
+    def allowed_subnets(self, allowed_subnets):
+        self._allowed_subnets = allowed_subnets
+        self._validator = None
+
+    def get_validator(self) -> 'ActionValidator':
+        """Gets the validator checking actions against this action space.
+
+        The validator holds the mappings of the action space, so it stays current as `update` adds values to them. It is
+        only rebuilt after the mappings themselves are replaced, by `reset` or by setting the allowed subnets.
+
+        Returns
+        -------
+        validator : ActionValidator
+        """
+        if self._validator is None:
+            self._validator = ActionValidator(self)
+        return self._validator
 
     def get_name(self, action: int) -> str:
         pass
@@ -143,70 +252,335 @@ class ActionSpace(CybORGLogger):
         self.process = {}
         self.port = {}
         self.agent = {agent: True}
+        self._validator = None
+        self._reset_index(agent)
 
     def get_max_actions(self, action):
-        params = self.action_params[action]
+        """Gets the number of parameter combinations of an action, counting values whether or not they are valid.
+
+        Parameters
+        ----------
+        action : type
+            action class
+
+        Returns
+        -------
+        size : int
+        """
         size = 1
-        len_dict = {
-            "session": self.server_session,
-            "target_session": self.client_session,
-            "subnet": self.subnet,
-            "ip_address": self.ip_address,
-            "username": self.username,
-            "password": self.password,
-            "process":self.process,
-            "port": self.port,
-            "agent": self.agent
-        }
-        for param in params.keys():
-            if param not in len_dict:
+        for param in self._get_indexed_params(action):
+            size *= int(np.count_nonzero(self._get_flags(param)[0]))
+        return size
+
+    def get_parameter_mask(self, param: str) -> np.ndarray:
+        """Gets the mask of valid values of a parameter.
+
+        Parameters
+        ----------
+        param : str
+            name of the parameter, as in `get_action_space`
+
+        Returns
+        -------
+        mask : np.ndarray
+            whether each value of the parameter's table is valid for the agent, shape (len(table),)
+        """
+        return self._get_flags(param)[1].copy()
+
+    def get_parameter_values(self, param: str) -> list:
+        """Gets the valid values of a parameter, in the order of its table."""
+        values = self.parameter_tables[INDEXED_PARAMETERS[param]].values
+        return [values[i] for i in np.flatnonzero(self._get_flags(param)[1])]
+
+    def get_action_mask(self) -> np.ndarray:
+        """Gets the mask of valid actions, aligned with `actions`."""
+        return np.fromiter(self.actions.values(), dtype=bool, count=len(self.actions))
+
+    def get_valid_parameters(self, action) -> np.ndarray:
+        """Enumerates the combinations of valid parameter values of an action.
+
+        Parameters
+        ----------
+        action : type
+            action class
+
+        Returns
+        -------
+        combinations : np.ndarray
+            one row per combination, holding the table index of each parameter in the order of the action's signature,
+            shape (combinations, parameters)
+        """
+        params = self._get_indexed_params(action)
+        indices = [np.flatnonzero(self._get_flags(param)[1]) for param in params]
+        if not indices:
+            return np.zeros((1, 0), dtype=np.int64)
+        grid = np.meshgrid(*indices, indexing='ij')
+        return np.stack(grid, axis=-1).reshape(-1, len(params))
+
+    def _get_indexed_params(self, action) -> List[str]:
+        params = list(self.action_params[action])
+        for param in params:
+            if param not in INDEXED_PARAMETERS:
                 raise NotImplementedError(
                     f"Param '{param}' in action '{action.__name__}' has no"
                     " code to parse its size for action space"
                 )
-            size *= len(len_dict[param])
-        return size
+        return params
+
+    def _reset_index(self, agent: str, reset_hostnames: bool = False):
+        """Clears the index of the parameters that `reset` clears, matching their mappings."""
+        if reset_hostnames:
+            self._present: Dict[str, np.ndarray] = {}
+            self._valid: Dict[str, np.ndarray] = {}
+        else:
+            # hostnames are kept, so their queued updates still apply
+            self._flush()
+        for param in INDEXED_PARAMETERS:
+            if reset_hostnames or param != 'hostname':
+                self._present[param] = np.zeros(0, dtype=bool)
+                self._valid[param] = np.zeros(0, dtype=bool)
+        self._pending = []
+        self._set_flags('target_session', range(MAX_SESSIONS), False)
+        self._set_flags('agent', [agent], True)
+
+    def _get_flags(self, param: str):
+        """Gets the arrays of whether each value of a parameter's table is present and valid, after applying queued updates."""
+        self._flush()
+        table = self.parameter_tables[INDEXED_PARAMETERS[param]]
+        if len(self._present[param]) < len(table):
+            self._grow(param, len(table))
+        return self._present[param][:len(table)], self._valid[param][:len(table)]
+
+    def _flush(self):
+        """Adds the queued updates to the index."""
+        if self._pending:
+            pending, self._pending = self._pending, []
+            for updates, known in pending:
+                for param, indices in updates:
+                    self._set_indices(param, indices, known)
+
+    def _grow(self, param: str, size: int):
+        size = max(size, 2 * len(self._present[param]))
+        for flags in (self._present, self._valid):
+            grown = np.zeros(size, dtype=bool)
+            grown[:len(flags[param])] = flags[param]
+            flags[param] = grown
+
+    def _set_flags(self, param: str, values, known: bool):
+        self._set_indices(param, self.parameter_tables[INDEXED_PARAMETERS[param]].intern(values), known)
+
+    def _set_indices(self, param: str, indices: List[int], known: bool):
+        if not indices:
+            return
+        if len(self._present[param]) <= max(indices):
+            self._grow(param, max(indices) + 1)
+        self._present[param][indices] = True
+        self._valid[param][indices] = known
+
+    def _intern_observation(self, observation: 'ObservationValues') -> List[Tuple[str, List[int]]]:
+        """Interns the values of an observation, giving the table indices of each parameter that `update` sets."""
+        tables = self.parameter_tables
+        updates = []
+        for attribute in ObservationValues.ATTRIBUTES:
+            values = getattr(observation, attribute)
+            if len(values) > 0:
+                updates.append((attribute, tables[INDEXED_PARAMETERS[attribute]].intern(values)))
+
+        for agent, session_id, server in observation.sessions:
+            if agent in self.agent:
+                indices = tables['session'].intern([session_id])
+                if server:
+                    updates.append(('session', indices))
+                updates.append(('target_session', indices))
+        return updates
+
+    def __getstate__(self):
+        # snapshots and copies never carry queued updates
+        self._flush()
+        return self.__dict__
 
     def update(self, observation: dict, known: bool = True):
         """Updates the ActionSpace class attributes depending on the observation parameter and whether the attribute info is known.
         
         Parameters
         ----------
-        observation : dict
-            the current observation to update the action space with.
+        observation : Union[dict, ObservationValues]
+            the current observation to update the action space with, or its values if already parsed.
         known : bool
         """
         if observation is None:
             return
+        if not isinstance(observation, ObservationValues):
+            observation = ObservationValues(observation)
+
+        indexed = len(observation.sessions) > 0
+        for attribute in ObservationValues.ATTRIBUTES:
+            values = getattr(observation, attribute)
+            if len(values) > 0:
+                getattr(self, attribute).update(dict.fromkeys(values, known))
+                indexed = True
+
+        for agent, session_id, server in observation.sessions:
+            if agent in self.agent:
+                if server:
+                    self.server_session[session_id] = known
+                self.client_session[session_id] = known
+
+        if indexed:
+            self._pending.append((self._intern_observation(observation), known))
+            if len(self._pending) > MAX_PENDING_UPDATES:
+                self._flush()
+
+
+class ActionValidator:
+    """Checks actions against the mappings of an action space.
+
+    The mappings are gathered once rather than for every action, and the error message of an invalid action is only
+    formatted if it is read.
+
+    Attributes
+    ----------
+    actions : Dict[type, bool]
+        mapping of action types to their validity
+    parameters : Dict[str, Union[dict, list]]
+        mapping of parameter names to the values they can take, as returned by `ActionSpace.get_action_space`
+    """
+
+    def __init__(self, action_space: ActionSpace):
+        """
+        Parameters
+        ----------
+        action_space : ActionSpace
+            action space to check actions against
+        """
+        self.parameters = action_space.get_action_space()
+        self.actions = self.parameters['action']
+
+    def validate(self, action, agent_name: str):
+        """Returns the action if it and its parameters are valid in the action space, otherwise an InvalidAction.
+
+        Parameters
+        ----------
+        action : Action
+            action to check
+        agent_name : str
+            name of the agent performing the action, used in error messages
+
+        Returns
+        -------
+        action : Action
+            the action if valid, otherwise an InvalidAction describing why it is not
+        """
+        valid = self.actions.get(type(action))
+        if valid is None:
+            return InvalidAction(action, 'Action {0} not in action space for agent {1}.', (action, agent_name))
+        if not valid:
+            return InvalidAction(
+                action,
+                'Action {0} is not valid for agent {1} at the moment. This usually means it is trying to access a '
+                'host it has not discovered yet.',
+                (action, agent_name)
+            )
+
+        parameters = self.parameters
+        for parameter_name, parameter_value in action.__dict__.items():
+            values = parameters.get(parameter_name)
+            if values is None:
+                continue
+
+            if isinstance(parameter_value, list):
+                for value in parameter_value:
+                    if value not in values:
+                        return InvalidAction(
+                            action,
+                            'Action {0} has parameter {1} that contains {2}. However, {2} is not in the action space '
+                            'for agent {3}.',
+                            (action, parameter_name, value, agent_name)
+                        )
+            else:
+                if parameter_value not in values:
+                    return InvalidAction(
+                        action,
+                        'Action {0} has parameter {1} valued at {2}. However, {2} is not in the action space for '
+                        'agent {3}.',
+                        (action, parameter_name, parameter_value, agent_name)
+                    )
+
+                if not values[parameter_value]:
+                    return InvalidAction(
+                        action,
+                        'Action {0} has parameter {1} valued at the invalid value of {2}. This usually means an agent '
+                        'is trying to utilise information it has not discovered yet such as an ip_address or port '
+                        'number.',
+                        (action, parameter_name, parameter_value)
+                    )
+
+        return action
+
+
+class ObservationValues:
+    """Values in an observation that are added to an action space by `ActionSpace.update`.
+
+    An observation can be parsed once and then used to update many action spaces, such as the true state that is
+    added to the action space of every agent on reset.
+
+    Attributes
+    ----------
+    hostname : List[str]
+    subnet : List[IPv4Network]
+    ip_address : List[IPv4Address]
+    process : List[int]
+    port : List[int]
+    username : List[str]
+    password : List[str]
+    sessions : List[Tuple[str, int, bool]]
+        agent name, session id and whether the session is a server session for each observed session
+    """
+    ATTRIBUTES = ('hostname', 'subnet', 'ip_address', 'process', 'port', 'username', 'password')
+
+    def __init__(self, observation: dict):
+        """
+        Parameters
+        ----------
+        observation : dict
+            observation data to parse
+        """
+        self.hostname = []
+        self.subnet = []
+        self.ip_address = []
+        self.process = []
+        self.port = []
+        self.username = []
+        self.password = []
+        self.sessions = []
 
         for key, info in observation.items():
             if (key in ("success", 'Valid', 'action')) or (not isinstance(info, dict)):
                 continue
             if "System info" in info and "Hostname" in info["System info"]:
-                self.hostname[info["System info"]["Hostname"]] = known
+                self.hostname.append(info["System info"]["Hostname"])
             for interface in info.get("Interface", []):
                 if "Subnet" in interface:
-                    self.subnet[interface["Subnet"]] = known
+                    self.subnet.append(interface["Subnet"])
                 if "ip_address" in interface:
-                    self.ip_address[interface["ip_address"]] = known
+                    self.ip_address.append(interface["ip_address"])
 
             for process in info.get("Processes", []):
                 if "PID" in process:
-                    self.process[process["PID"]] = known
+                    self.process.append(process["PID"])
                 for connection in process.get("Connections", []):
                     if "local_port" in connection:
-                        self.port[connection["local_port"]] = known
+                        self.port.append(connection["local_port"])
                     if "remote_port" in connection:
-                        self.port[connection["remote_port"]] = known
+                        self.port.append(connection["remote_port"])
 
             for user in info.get("User Info", []):
                 if "username" in user:
-                    self.username[user["username"]] = known
+                    self.username.append(user["username"])
                 if "Password" in user:
-                    self.password[user["Password"]] = known
+                    self.password.append(user["Password"])
 
             for session in info.get("Sessions", []):
-                if "session_id" in session and session['agent'] in self.agent:
-                    if "Type" in session and (session["Type"] in SESSION_TYPES):
-                        self.server_session[session["session_id"]] = known
-                    self.client_session[session["session_id"]] = known
+                if "session_id" in session:
+                    server = "Type" in session and (session["Type"] in SESSION_TYPES)
+                    self.sessions.append((session['agent'], session["session_id"], server))
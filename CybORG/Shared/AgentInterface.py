@@ -1,10 +1,10 @@
 # Copyright DST Group. Licensed under the MIT license.
 
 import sys
-from typing import List
+from typing import Dict, List
 
 from CybORG.Shared import Scenario
-from CybORG.Shared.ActionSpace import ActionSpace
+from CybORG.Shared.ActionSpace import ActionSpace, ParameterTable
 from CybORG.Simulator.Actions import Action, Sleep
 from CybORG.Shared.Observation import Observation
 from CybORG.Shared.Results import Results
@@ -64,7 +64,8 @@ class AgentInterface:
                  allowed_subnets,
                  scenario,
                  active=True,
-                 internal_only=False):
+                 internal_only=False,
+                 parameter_tables: Dict[str, ParameterTable] = None):
         """ 
         Parameters
         ----------
@@ -75,6 +76,8 @@ class AgentInterface:
         scenario : Scenario
         active : bool
         internal_only : bool
+        parameter_tables : Dict[str, ParameterTable], optional
+            tables interning the action space's parameter values, shared by the agents of an episode
         """
         self.hostname = {}
         self.username = {}
@@ -93,7 +96,7 @@ class AgentInterface:
         self.internal_only = internal_only
 
         self.agent_name = agent_name
-        self.action_space = ActionSpace(self.actions, agent_name, allowed_subnets)
+        self.action_space = ActionSpace(self.actions, agent_name, allowed_subnets, parameter_tables)
         self.agent = agent_obj
         self.agent.set_initial_values(
             action_space=self.action_space.get_action_space(),
@@ -108,7 +111,10 @@ class AgentInterface:
         self.action_space.update(obs, known)
 
     def set_init_obs(self, init_obs, true_obs):
-        """set and update the true and initial observations"""
+        """set and update the true and initial observations
+
+        true_obs may also be an ObservationValues parsed from the true state, so that it can be shared between agents.
+        """
         if isinstance(init_obs, Observation):
             init_obs = init_obs.data
         if isinstance(true_obs, Observation):
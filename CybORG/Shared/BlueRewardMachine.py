@@ -1,3 +1,6 @@
+from typing import Callable, Dict, Tuple
+
+import numpy as np
 
 from CybORG.Shared.RewardCalculator import RewardCalculator
 from CybORG.Simulator.State import State
@@ -5,15 +8,126 @@ from CybORG.Simulator.Actions.GreenActions import GreenAccessService, GreenLocal
 from CybORG.Simulator.Actions.AbstractActions.Impact import Impact
 from CybORG.Simulator.Actions.Action import InvalidAction
 
+# Rewards Key:
+# - LWF = Local Work Fails
+# - ASF = Access Service Fails
+# - RIA = Red Impact/Access
+PHASE_REWARDS = {
+    0:{
+        "public_access_zone_subnet":    {"LWF": -1, "ASF": -1, "RIA": -3}, # Part of HQ Network in ReadMe
+        "admin_network_subnet":         {"LWF": -1, "ASF": -1, "RIA": -3}, # Part of HQ Network in ReadMe
+        "office_network_subnet":        {"LWF": -1, "ASF": -1, "RIA": -3}, # Part of HQ Network in ReadMe
+        "contractor_network_subnet":    {"LWF":  0, "ASF": -5, "RIA": -5},
+        "restricted_zone_a_subnet":     {"LWF": -1, "ASF": -3, "RIA": -1},
+        "operational_zone_a_subnet":    {"LWF": -1, "ASF": -1, "RIA": -1},
+        "restricted_zone_b_subnet":     {"LWF": -1, "ASF": -3, "RIA": -1},
+        "operational_zone_b_subnet":    {"LWF": -1, "ASF": -1, "RIA": -1},
+        "internet_subnet":              {"LWF":  0, "ASF":  0, "RIA": -1}},
+    1:{
+        "public_access_zone_subnet":    {"LWF": -1, "ASF": -1, "RIA": -3},
+        "admin_network_subnet":         {"LWF": -1, "ASF": -1, "RIA": -3},
+        "office_network_subnet":        {"LWF": -1, "ASF": -1, "RIA": -3},
+        "contractor_network_subnet":    {"LWF":  0, "ASF":  0, "RIA":  0},
+        "restricted_zone_a_subnet":     {"LWF": -2, "ASF": -1, "RIA": -3},
+        "operational_zone_a_subnet":    {"LWF":-10, "ASF":  0, "RIA":-10},
+        "restricted_zone_b_subnet":     {"LWF": -1, "ASF": -1, "RIA": -1},
+        "operational_zone_b_subnet":    {"LWF": -1, "ASF": -1, "RIA": -1},
+        "internet_subnet":              {"LWF":  0, "ASF":  0, "RIA": 0}},
+    2:{
+        "public_access_zone_subnet":    {"LWF": -1, "ASF": -1, "RIA": -3},
+        "admin_network_subnet":         {"LWF": -1, "ASF": -1, "RIA": -3},
+        "office_network_subnet":        {"LWF": -1, "ASF": -1, "RIA": -3},
+        "contractor_network_subnet":    {"LWF":  0, "ASF":  0, "RIA":  0},
+        "restricted_zone_a_subnet":     {"LWF": -1, "ASF": -3, "RIA": -3},
+        "operational_zone_a_subnet":    {"LWF": -1, "ASF": -1, "RIA": -1},
+        "restricted_zone_b_subnet":     {"LWF": -2, "ASF": -1, "RIA": -3},
+        "operational_zone_b_subnet":    {"LWF":-10, "ASF":  0, "RIA":-10},
+        "internet_subnet":              {"LWF":  0, "ASF":  0, "RIA":  0}}}
+
+# Event types, indexing the last axis of REWARD_TABLE. NO_EVENT is worth nothing and pads batches of events.
+EVENT_TYPES = ("LWF", "ASF", "RIA")
+LOCAL_WORK_FAILS, ACCESS_SERVICE_FAILS, RED_IMPACT_ACCESS = range(len(EVENT_TYPES))
+NO_EVENT = len(EVENT_TYPES)
+
+# Subnets, indexing the second axis of REWARD_TABLE
+SUBNETS = tuple(PHASE_REWARDS[0])
+SUBNET_INDEX = {subnet: index for index, subnet in enumerate(SUBNETS)}
+
+
+def compile_reward_table(phase_rewards: Callable[[int], Dict[str, Dict[str, int]]]) -> np.ndarray:
+    """Compiles the reward mappings of every mission phase into an array.
+
+    Parameters
+    ----------
+    phase_rewards : Callable[[int], Dict[str, Dict[str, int]]]
+        gives the reward mapping of a mission phase, such as `BlueRewardMachine.get_phase_rewards`
+
+    Returns
+    -------
+    table : np.ndarray
+        reward for an event in a subnet during a mission phase, indexed by (phase, subnet, event type), where the
+        NO_EVENT column is 0
+    """
+    tables = []
+    for phase in sorted(PHASE_REWARDS):
+        rewards = phase_rewards(phase)
+        tables.append([[rewards[subnet][event] for event in EVENT_TYPES] + [0] for subnet in SUBNETS])
+    return np.array(tables, dtype=np.int64)
+
+
+# REWARD_TABLE[phase, subnet, event type] is the reward for an event in a subnet during a mission phase
+REWARD_TABLE = compile_reward_table(PHASE_REWARDS.__getitem__)
+
+
+def team_reward(phase, subnet, event, table: np.ndarray = REWARD_TABLE) -> np.ndarray:
+    """Sums the rewards of a set of events.
+
+    The arguments are broadcast against each other, with `phase` given once per set of events, so one call can score
+    the events of a single environment or of a batch of environments. Sets with fewer events than others are padded
+    with NO_EVENT.
+
+    Parameters
+    ----------
+    phase : int or np.ndarray
+        mission phase of each set of events, shape (...)
+    subnet : np.ndarray
+        subnet index of each event, shape (..., events)
+    event : np.ndarray
+        event type of each event, shape (..., events)
+    table : np.ndarray
+        rewards indexed by (phase, subnet, event type), by default REWARD_TABLE
+
+    Returns
+    -------
+    : np.ndarray
+        the reward of each set of events, shape (...)
+    """
+    return table[np.expand_dims(phase, -1), subnet, event].sum(axis=-1)
+
+
 class BlueRewardMachine(RewardCalculator):
     """The reward calculator for CC4
-    
+
+    The reward mappings given by `get_phase_rewards` are compiled into a table indexed by mission phase, subnet and
+    event type the first time a reward is calculated, so subclasses can change the rewards by overriding it. Each step
+    the actions of the agents are turned into an array of events, which `team_reward` scores in a single lookup.
+
     Attributes
     ----------
     phase_rewards : Dict[str, Dict[str, int]]
         the reward mapping for the current mission phase
+    reward_table : np.ndarray
+        the compiled rewards, indexed by (phase, subnet, event type)
     """
 
+    def __init__(self, agent_name: str):
+        super().__init__(agent_name)
+        self.phase_rewards = None
+        self._reward_table = None
+        self._subnets_state = None
+        self._host_subnets: Dict[str, int] = {}
+        self._ip_subnets: Dict[object, int] = {}
+
     def get_phase_rewards(self, cur_mission_phase):
         """Gets the pre-set reward mapping for the current mission phase
 
@@ -21,7 +135,7 @@ class BlueRewardMachine(RewardCalculator):
         - LWF = Local Work Fails
         - ASF = Access Service Fails
         - RIA = Red Impact/Access
-        
+
         Parameters
         ----------
         cur_mission_phase : int
@@ -32,42 +146,28 @@ class BlueRewardMachine(RewardCalculator):
         : Dict[str, Dict[str, int]]
             the phase reward mapping for the current mission phase
         """
-        phase_rewards = {
-            0:{
-                "public_access_zone_subnet":    {"LWF": -1, "ASF": -1, "RIA": -3}, # Part of HQ Network in ReadMe
-                "admin_network_subnet":         {"LWF": -1, "ASF": -1, "RIA": -3}, # Part of HQ Network in ReadMe
-                "office_network_subnet":        {"LWF": -1, "ASF": -1, "RIA": -3}, # Part of HQ Network in ReadMe
-                "contractor_network_subnet":    {"LWF":  0, "ASF": -5, "RIA": -5},
-                "restricted_zone_a_subnet":     {"LWF": -1, "ASF": -3, "RIA": -1},
-                "operational_zone_a_subnet":    {"LWF": -1, "ASF": -1, "RIA": -1},
-                "restricted_zone_b_subnet":     {"LWF": -1, "ASF": -3, "RIA": -1},
-                "operational_zone_b_subnet":    {"LWF": -1, "ASF": -1, "RIA": -1},
-                "internet_subnet":              {"LWF":  0, "ASF":  0, "RIA": -1}}, 
-            1:{
-                "public_access_zone_subnet":    {"LWF": -1, "ASF": -1, "RIA": -3},
-                "admin_network_subnet":         {"LWF": -1, "ASF": -1, "RIA": -3},
-                "office_network_subnet":        {"LWF": -1, "ASF": -1, "RIA": -3},
-                "contractor_network_subnet":    {"LWF":  0, "ASF":  0, "RIA":  0},
-                "restricted_zone_a_subnet":     {"LWF": -2, "ASF": -1, "RIA": -3},
-                "operational_zone_a_subnet":    {"LWF":-10, "ASF":  0, "RIA":-10},
-                "restricted_zone_b_subnet":     {"LWF": -1, "ASF": -1, "RIA": -1},
-                "operational_zone_b_subnet":    {"LWF": -1, "ASF": -1, "RIA": -1},
-                "internet_subnet":              {"LWF":  0, "ASF":  0, "RIA": 0}}, 
-            2:{
-                "public_access_zone_subnet":    {"LWF": -1, "ASF": -1, "RIA": -3},
-                "admin_network_subnet":         {"LWF": -1, "ASF": -1, "RIA": -3},
-                "office_network_subnet":        {"LWF": -1, "ASF": -1, "RIA": -3},
-                "contractor_network_subnet":    {"LWF":  0, "ASF":  0, "RIA":  0},
-                "restricted_zone_a_subnet":     {"LWF": -1, "ASF": -3, "RIA": -3},
-                "operational_zone_a_subnet":    {"LWF": -1, "ASF": -1, "RIA": -1},
-                "restricted_zone_b_subnet":     {"LWF": -2, "ASF": -1, "RIA": -3},
-                "operational_zone_b_subnet":    {"LWF":-10, "ASF":  0, "RIA":-10},
-                "internet_subnet":              {"LWF":  0, "ASF":  0, "RIA":  0}}}
-        
-        return phase_rewards[cur_mission_phase]
-
-
-    def calculate_reward(self, current_state: dict, action_dict: dict, agent_observations: dict, done: bool, state: State):
+        return {subnet: dict(rewards) for subnet, rewards in PHASE_REWARDS[cur_mission_phase].items()}
+
+    @property
+    def reward_table(self) -> np.ndarray:
+        """The rewards of `get_phase_rewards` for every mission phase, indexed by (phase, subnet, event type)."""
+        if self._reward_table is None:
+            self._reward_table = compile_reward_table(self.get_phase_rewards)
+        return self._reward_table
+
+    def calculate_simulation_reward(self, env_controller):
+        """Calculates the reward from the environment controller.
+
+        The reward only depends on the actions and observations of the step, so the true state is not built. The
+        agent interfaces carry the controller's flag of whether each agent has an active session.
+        """
+        return self.calculate_reward(
+            None, env_controller.action, env_controller.observation, env_controller.done, env_controller.state,
+            agent_interfaces=env_controller.agent_interfaces
+        )
+
+    def calculate_reward(self, current_state: dict, action_dict: dict, agent_observations: dict, done: bool, state: State,
+                         agent_interfaces: dict = None):
         """Calculate the cumulative reward based on the phase mapping.
 
         Parameters
@@ -81,50 +181,88 @@ class BlueRewardMachine(RewardCalculator):
             has the episode ended
         state: State
             current State object
+        agent_interfaces : Dict[str, AgentInterface], optional
+            interfaces whose `active` flag tells if each agent has an active session, by default the sessions in the
+            state are checked
 
         Returns
         -------
         : int
             sum of the rewards collected
         """
-        reward_list = []
-        self.phase_rewards = self.get_phase_rewards(state.mission_phase)
+        subnets, events = self.get_events(action_dict, agent_observations, state, agent_interfaces)
+        if not events:
+            return 0
+        return int(team_reward(state.mission_phase, subnets, events, self.reward_table))
 
+    def get_events(self, action_dict: dict, agent_observations: dict, state: State,
+                   agent_interfaces: dict = None) -> Tuple[list, list]:
+        """Lists the rewarded events of a step.
+
+        Parameters
+        ----------
+        action_dict : dict
+            actions executed by each agent this step
+        agent_observations : Dict[str, ObservationSet]
+            current agent observations
+        state : State
+            current State object
+        agent_interfaces : Dict[str, AgentInterface], optional
+            interfaces whose `active` flag tells if each agent has an active session, by default the sessions in the
+            state are checked
+
+        Returns
+        -------
+        subnets : List[int]
+            index in SUBNETS of the subnet of each event
+        events : List[int]
+            event type of each event
+        """
+        if state is not self._subnets_state:
+            self._index_subnets(state)
+
+        subnets, events = [], []
         for agent_name, action in action_dict.items():
             if not action:
                 continue
-            
-            action = action[0]            
+
+            action = action[0]
             if isinstance(action, Impact):
-                hostname = action.hostname
-            elif isinstance(action, GreenAccessService) or isinstance(action, GreenLocalWork):
-                hostname = state.ip_addresses[action.ip_address]
+                subnet = self._host_subnets[action.hostname]
+            elif isinstance(action, (GreenAccessService, GreenLocalWork)):
+                subnet = self._ip_subnets[action.ip_address]
             else:
                 continue
 
-            subnet_name = state.hostname_subnet_map[hostname].value
-            sessions = state.sessions[agent_name].values()
-
-            if len([session.ident for session in sessions if session.active]) > 0:
-                success = agent_observations[agent_name].observations[0].data['success']
-                rewards_for_zone = self.phase_rewards[subnet_name]
-
-                if 'green' in agent_name and success == False:
-                    if isinstance(action, GreenLocalWork):
-                        reward_list.append(rewards_for_zone["LWF"])
-                    elif isinstance(action, GreenAccessService):
-                        reward_list.append(rewards_for_zone["ASF"])
-
-                elif 'red' in agent_name and success and isinstance(action, Impact):
-                    reward_list.append(rewards_for_zone["RIA"])
+            if agent_interfaces is not None:
+                active = agent_interfaces[agent_name].active
+            else:
+                active = any(session.active for session in state.sessions[agent_name].values())
+            if not active:
+                continue
 
-        return sum(reward_list)
+            success = agent_observations[agent_name].observations[0].data['success']
+            if 'green' in agent_name and success == False:
+                if isinstance(action, GreenLocalWork):
+                    event = LOCAL_WORK_FAILS
+                elif isinstance(action, GreenAccessService):
+                    event = ACCESS_SERVICE_FAILS
+                else:
+                    continue
+            elif 'red' in agent_name and success and isinstance(action, Impact):
+                event = RED_IMPACT_ACCESS
+            else:
+                continue
+            subnets.append(subnet)
+            events.append(event)
 
+        self.phase_rewards = self.get_phase_rewards(state.mission_phase)
+        return subnets, events
 
-  
-        
-        
- 
-     
-        
-    
\ No newline at end of file
+    def _index_subnets(self, state: State):
+        """Maps the hostnames and IP addresses of a state to the index of their subnet."""
+        self._host_subnets = {
+            hostname: SUBNET_INDEX[subnet.value] for hostname, subnet in state.hostname_subnet_map.items()
+        }
+        self._ip_subnets = {ip: self._host_subnets[hostname] for ip, hostname in state.ip_addresses.items()}
+        self._subnets_state = state
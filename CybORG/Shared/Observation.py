@@ -10,6 +10,74 @@ from ipaddress import IPv4Network, IPv4Address
 import CybORG.Shared.Enums as CyEnums
 
 BROADCAST_ADDRESS = IPv4Address('0.0.0.0')
+LOCALHOST_ADDRESS = IPv4Address('127.0.0.1')
+LOCALHOST_SUBNET = IPv4Network('127.0.0.0/8')
+
+
+class AddressFilter:
+    """Immutable sets of addresses kept by Observation.filter_addresses
+
+    Building the sets hashes every address, so filters that are applied
+    repeatedly should be created once and passed to
+    `Observation.filter_addresses_with`.
+
+    Attributes
+    ----------
+    ips : frozenset[IPv4Address]
+        ip addresses to keep
+    cidrs : frozenset[IPv4Network]
+        subnets to keep
+    """
+    __slots__ = ('ips', 'cidrs')
+
+    def __init__(self,
+                 ips: Union[list[str], list[IPv4Address]] = None,
+                 cidrs: Union[list[str], list[IPv4Network]] = None,
+                 include_localhost: bool = True):
+        """
+        Parameters
+        ----------
+        ips : list[str] or list[IPv4Address], optional
+            the ip addresses to keep (default=None)
+        cidrs : list[str] or list[IPv4Network], optional
+            the cidr addresses to keep (default=None)
+        include_localhost : bool, optional
+            If True, will include localhost addresses in the addresses to keep
+            (default=True)
+        """
+        if ips is None:
+            ip_set = set()
+        else:
+            ip_set = set(ips)
+            if include_localhost:
+                ip_set.add(LOCALHOST_ADDRESS)
+            ip_set.add(BROADCAST_ADDRESS)
+
+        if cidrs is None:
+            cidr_set = set()
+        else:
+            cidr_set = set(cidrs)
+            if include_localhost:
+                cidr_set.add(LOCALHOST_SUBNET)
+
+        self.ips = frozenset(ip_set)
+        self.cidrs = frozenset(cidr_set)
+
+    def allows_process(self, proc: dict) -> bool:
+        """Checks that every connection address of an observed process is kept"""
+        for conn in proc.get("Connections", ()):
+            if "local_address" in conn and conn["local_address"] not in self.ips:
+                return False
+            if "remote_address" in conn and conn["remote_address"] not in self.ips:
+                return False
+        return True
+
+    def allows_interface(self, interface: dict) -> bool:
+        """Checks that the address and subnet of an observed interface are kept"""
+        if "IP Address" in interface and interface["IP Address"] not in self.ips:
+            return False
+        return not ("Subnet" in interface and interface["Subnet"] not in self.cidrs)
+
 
 class Observation:
     """Class that holds the observation data for the environment at a step in the episode
@@ -785,56 +853,41 @@ class Observation:
             If True and ips is not None, will include localhost address
             ('127.0.0.1') in IP addresses to keep (default=True)
         """
-        # convert lists to set of str for fast lookup and consistent typing
-        if ips is None:
-            ip_set = set()
-        else:
-            ip_set = set(ips)
-            if include_localhost:
-                ip_set.add(IPv4Address('127.0.0.1'))
-            ip_set.add(IPv4Address('0.0.0.0'))
+        self.filter_addresses_with(AddressFilter(ips, cidrs, include_localhost))
 
-        if cidrs is None:
-            cidr_set = set()
-        else:
-            cidr_set = set(cidrs)
-            if include_localhost:
-                cidr_set.add(IPv4Network('127.0.0.0/8'))
+    def filter_addresses_with(self, address_filter: 'AddressFilter'):
+        """Filter observation, in place, using a precomputed AddressFilter
+
+        Equivalent to `filter_addresses` with the arguments used to create the
+        filter, but avoids rebuilding the address sets on every call.
 
+        Parameters
+        ----------
+        address_filter : AddressFilter
+            the addresses to keep
+        """
         filter_hosts = []
         for obs_k, obs_v in self.data.items():
             if isinstance(obs_v, Observation):
-                obs_v.filter_addresses(ips, cidrs, include_localhost)
+                obs_v.filter_addresses_with(address_filter)
             elif not isinstance(obs_v, dict):
                 continue
 
-            filter_procs = []
-            for i, proc in enumerate(obs_v.get("Processes", [])):
-                for conn in proc.get("Connections", []):
-                    for proc_k in ["local_address", "remote_address"]:
-                        if proc_k in conn and conn[proc_k] not in ip_set and i not in filter_procs:
-                            filter_procs.append(i)
-
-            # Must remove indices in reverse order, else risk incorrect proc
-            # being removed
-            for p_idx in sorted(filter_procs, reverse=True):
-                del obs_v["Processes"][p_idx]
-
-            if "Processes" in obs_v and len(obs_v["Processes"]) == 0:
-                del obs_v["Processes"]
-
-            filter_interfaces = []
-            for i, interface in enumerate(obs_v.get("Interface", [])):
-                check_ip = "IP Address" in interface and interface["IP Address"] not in ip_set
-                check_subnet = "Subnet" in interface and interface["Subnet"] not in cidr_set and i not in filter_interfaces
-                if check_ip or check_subnet:
-                    filter_interfaces.append(i)
-
-            for i_idx in sorted(filter_interfaces, reverse=True):
-                del obs_v["Interface"][i_idx]
-
-            if "Interface" in obs_v and len(obs_v["Interface"]) == 0:
-                del obs_v["Interface"]
+            # Hosts are only modified if they contain an address that is not
+            # allowed, which is rare, so check before rebuilding any lists
+            processes = obs_v.get("Processes")
+            if processes is not None:
+                if not all(address_filter.allows_process(proc) for proc in processes):
+                    processes[:] = [proc for proc in processes if address_filter.allows_process(proc)]
+                if len(processes) == 0:
+                    del obs_v["Processes"]
+
+            interfaces = obs_v.get("Interface")
+            if interfaces is not None:
+                if not all(address_filter.allows_interface(interface) for interface in interfaces):
+                    interfaces[:] = [interface for interface in interfaces if address_filter.allows_interface(interface)]
+                if len(interfaces) == 0:
+                    del obs_v["Interface"]
 
             if len(list(obs_v.values())) == 0:
                 filter_hosts.append(obs_k)
@@ -76,6 +76,7 @@ class DegradeServices(Action):
 
         for service in services:
             service.degrade_service_reliability()
+            state.mark_host_changed(self.hostname)
             process_state = state.hosts[self.hostname].get_process(service.process).get_state()
             obs.add_process(hostid=self.hostname, **process_state[0])
 
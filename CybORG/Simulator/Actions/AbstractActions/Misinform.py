@@ -206,6 +206,7 @@ class Misinform(Action):
             decoy_factory = self.__select_one_factory(host, state)
             decoy = decoy_factory.make_decoy(host)
             self.__create_process(obs_succeed, session, host, decoy)
+            state.mark_host_changed(self.hostname)
             #print ("Misinform Success. Result: {}".format(result))
             return obs_succeed
 
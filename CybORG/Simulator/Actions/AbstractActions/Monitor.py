@@ -1,5 +1,3 @@
-from copy import deepcopy
-
 from CybORG.Shared import Observation
 from CybORG.Simulator.Actions import Action
 from CybORG.Shared.Session import VelociraptorServer
@@ -52,25 +50,28 @@ class Monitor(Action):
 
         for child in blue_sessions:
             host = state.hosts[child.hostname]
-            network_connections = host.events.network_connections
+            events = host.events
+            if not (events.network_connections or events.process_creation
+                    or events.old_network_connections or events.old_process_creation):
+                continue
+            system_info = None
+            network_connections = events.network_connections
             if len(network_connections) > 0:
-                obs.add_system_info(hostid=child.hostname, **host.get_state())
+                system_info = host.get_state()
+                obs.add_system_info(hostid=child.hostname, **system_info)
             for event in network_connections:
                 if event.pid:
                     session.add_sus_pids(hostname=child.hostname, pid=event.pid)
                 obs.add_process(hostid=child.hostname, **vars(event))
-            host.events.old_network_connections = deepcopy(network_connections)
-            network_connections.clear()
 
-            processes = host.events.process_creation
+            processes = events.process_creation
             if len(processes) > 0:
-                obs.add_system_info(hostid=child.hostname, **state.hosts[child.hostname].get_state())
+                obs.add_system_info(hostid=child.hostname, **(system_info or host.get_state()))
             for event in processes:
                 if 'pid' in event:
                     session.add_sus_pids(hostname=child.hostname, pid=event['pid'])
                 obs.add_process(hostid=child.hostname, **event)
-            host.events.old_process_creation = deepcopy(processes)
-            processes.clear()
+            events.archive()
         return obs
 
     def __str__(self):
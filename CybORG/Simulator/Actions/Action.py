@@ -50,11 +50,28 @@ class Sleep(Action):
         return Observation()
 
 class InvalidAction(Action):
+    """Replaces an action that is not valid for the agent performing it.
 
-    def __init__(self, action: Action = None, error: str =None):
+    The error may be given as a format string and its arguments, in which case it is only formatted when read.
+    """
+
+    def __init__(self, action: Action = None, error: str =None, error_args: tuple = ()):
         super().__init__()
         self.action = action
-        self.error = error
+        self._error = error
+        self._error_args = error_args
+
+    @property
+    def error(self) -> Optional[str]:
+        if self._error_args:
+            self._error = self._error.format(*self._error_args)
+            self._error_args = ()
+        return self._error
+
+    @error.setter
+    def error(self, error: str):
+        self._error = error
+        self._error_args = ()
 
     def execute(self, state):
         return Observation(success=False)
@@ -97,9 +114,21 @@ class RemoteAction(Action):
         
         return induced_subgraph(state.link_diagram, non_blocking_nodes)
 
-    @staticmethod  
+    @staticmethod
     def get_route(state: State, target: str, source: str, routing: bool = False) -> list:
-        """finds the route from one ip_address to another and returns the hostname list along that route"""
+        """finds the route from one ip_address to another and returns the hostname list along that route
+
+        Routes are cached on the state until the link diagram or blocks change, so the returned list must not be modified.
+        """
+        key = (source, target, routing)
+        if key in state.route_cache:
+            return state.route_cache[key]
+        path = RemoteAction._find_route(state, target, source, routing)
+        state.route_cache[key] = path
+        return path
+
+    @staticmethod
+    def _find_route(state: State, target: str, source: str, routing: bool) -> list:
         try:
             path = shortest_path(state.link_diagram, source=source, target=target)
         except NetworkXNoPath:
@@ -139,9 +168,8 @@ class RemoteAction(Action):
         """
         Checks if data can be send from one address to another
         """
-        for connected_components in state.connected_components:
-            if source in connected_components:
-                return target in connected_components
+        component = state.component_index.get(source)
+        return component is not None and state.component_index.get(target) == component
 
     def _get_originating_ip(self, state: State, from_host: Host, target_ip_address) -> Optional[IPv4Address]:
         """
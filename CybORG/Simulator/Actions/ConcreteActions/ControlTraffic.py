@@ -57,6 +57,7 @@ class BlockTraffic(ControlTraffic):
             self.log(f"'{other_hostname}' is already blocked by '{hostname}'.")
             return Observation(False)
         state.blocks.setdefault(hostname, []).append(other_hostname)
+        state.invalidate_routes()
         return Observation(True)
 
 class BlockTrafficZone(ControlTraffic):
@@ -113,6 +114,7 @@ class BlockTrafficZone(ControlTraffic):
             return Observation(False)
 
         state.blocks.setdefault(self.to_subnet, []).append(self.from_subnet)
+        state.invalidate_routes()
         return Observation(True)
 
 class AllowTraffic(ControlTraffic):
@@ -125,6 +127,7 @@ class AllowTraffic(ControlTraffic):
         other_hostname = state.ip_addresses[self.ip_address]
         if hostname in state.blocks and other_hostname in state.blocks[hostname]:
             state.blocks[hostname].remove(other_hostname)
+            state.invalidate_routes()
             return Observation(True)
         self.log(f"'{other_hostname}' is not blocked by '{hostname}'.")
         return Observation(False)
@@ -180,6 +183,7 @@ class AllowTrafficZone(ControlTraffic):
         # Check not already blocked
         if self.to_subnet in state.blocks and self.from_subnet in state.blocks[self.to_subnet]:
             state.blocks[self.to_subnet].remove(self.from_subnet)
+            state.invalidate_routes()
             return Observation(True)
         self.log(f"'{self.to_subnet}' is not blocked by '{self.from_subnet}'.")
         return Observation(False)
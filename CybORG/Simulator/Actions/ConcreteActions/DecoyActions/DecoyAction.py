@@ -67,6 +67,7 @@ class DecoyAction(Action):
             decoy_factory = self.__select_one_factory(host, state)
             decoy = decoy_factory.make_decoy(host)
             self.__create_process(obs_succeed, session, host, decoy)
+            state.mark_host_changed(self.hostname)
             return obs_succeed
         except RuntimeError:
             return obs_fail
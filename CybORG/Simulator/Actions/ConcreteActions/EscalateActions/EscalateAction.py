@@ -40,6 +40,7 @@ class EscalateAction(TargetedLocalAction):
                 obs.add_process(hostid=target_host.hostname, process_name=proc.name)
                 return obs
         obs = self.__upgrade_session(target_host, target_session)
+        state.mark_host_changed(target_host.hostname)
         return obs
 
     def test_exploit_works(self, target_host: Host) ->\
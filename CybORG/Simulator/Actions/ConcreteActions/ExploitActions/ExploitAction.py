@@ -63,11 +63,11 @@ class ExploitAction(RemoteAction):
                 remote_address=remote_address
             )
             if other_hostname == self.blocked:
-                host.events.network_connections.append(event)
+                host.events.add_network_connection(event)
                 return obs
             # if 1 - self.detection_rate < state.np_random.random():
             #     # add even to hosts along the path if detection occurs
-            #     host.events.network_connections.append(event)
+            #     host.events.add_network_connection(event)
 
         exploit_data = self._get_exploit_data(state, process_type)
         vuln_proc = exploit_data.get('vuln_proc')
@@ -89,7 +89,7 @@ class ExploitAction(RemoteAction):
         local_port = target_host.get_ephemeral_port()
         is_exploit_decoy = bool(vuln_proc.decoy_type & DecoyType.EXPLOIT)
         if is_exploit_decoy:
-            target_host.events.network_connections.append(NetworkConnection(
+            target_host.events.add_network_connection(NetworkConnection(
                 local_address=self.ip_address,
                 local_port=local_port,
                 remote_address=exploit_data['from_ip'],
@@ -188,7 +188,7 @@ class ExploitAction(RemoteAction):
                     if conn.local_port == self.PORT:
                         vuln_proc = proc
                         if (not vuln_proc.decoy_type == DecoyType.NONE):
-                            target_host.events.network_connections.append(NetworkConnection(
+                            target_host.events.add_network_connection(NetworkConnection(
                                 local_address=self.ip_address,
                                 local_port=conn.local_port,
                                 remote_address=from_ip,
@@ -272,7 +272,7 @@ class ExploitAction(RemoteAction):
                 'remote_port': 4444
             }]
         }
-        target_host.events.process_creation.append(event)
+        target_host.events.add_process_creation(event)
 
     def _get_session_info(self, new_session):
         session_info = {
@@ -39,11 +39,11 @@ class SSHBruteForce(ExploitAction):
                 remote_port=self.PORT
             )
             if other_hostname == self.blocked:
-                host.events.network_connections.append(event)
+                host.events.add_network_connection(event)
                 return obs
             if 1 - self.detection_rate < state.np_random.random():
                 # add even to hosts along the path if detection occurs
-                host.events.network_connections.append(event)
+                host.events.add_network_connection(event)
 
         exploit_data = self._get_exploit_data(state, self.process_type)
         vuln_proc = exploit_data.get('vuln_proc')
@@ -93,7 +93,7 @@ class SSHBruteForce(ExploitAction):
 
     def _create_brute_force_event(self, local_port, target_host: Host, from_ip, **kwargs):
         for i in range(self.wordlist_length):
-            target_host.events.network_connections.append(NetworkConnection(
+            target_host.events.add_network_connection(NetworkConnection(
                 local_address=self.ip_address,
                 local_port=self.PORT,
                 remote_address=from_ip,
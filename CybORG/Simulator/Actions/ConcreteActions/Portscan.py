@@ -56,7 +56,7 @@ class Portscan(RemoteAction):
                         local_address=self.ip_address
                     )
                     if fixed_random_value <= self.detection_rate or process.decoy_type.name == 'EXPLOIT':
-                        target_host.events.network_connections.append(NetworkConnection(
+                        target_host.events.add_network_connection(NetworkConnection(
                             local_address=self.ip_address,
                             local_port=conn.local_port,
                             remote_address=originating_ip_address,
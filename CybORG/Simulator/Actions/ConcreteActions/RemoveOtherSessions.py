@@ -36,6 +36,7 @@ class RemoveOtherSessions_Parent(LocalAction):
                 host.processes.remove(process)
                 host.sessions[agent].remove(session)
                 state.sessions[agent].pop(session)
+                state.mark_host_changed(hostname)
         return obs
 
     def __str__(self):
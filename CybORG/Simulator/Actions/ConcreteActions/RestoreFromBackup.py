@@ -13,6 +13,7 @@ class RestoreFromBackup(TargetedLocalAction):
             for session in sessions:
                 old_sessions[agent][session] = state.sessions[agent].pop(session)
         target_host.restore()
+        state.mark_host_changed(target_host.hostname)
         for agent, sessions in target_host.sessions.items():
             for session in sessions:
                 state.sessions[agent][session] = old_sessions[agent][session]
@@ -34,6 +34,7 @@ class StopProcess(TargetedLocalAction):
     def kill_process(self, state: State, host: Host, process: Process):
         agent, session_id = state.get_session_from_pid(host.hostname, pid=process.pid)
         host.processes.remove(process)
+        state.mark_host_changed(host.hostname)
         service = next((s for s in host.services.values() if s.process == process.pid), None)
         if service:
             pid = host.create_pid()
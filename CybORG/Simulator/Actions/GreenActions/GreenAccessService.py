@@ -200,7 +200,7 @@ class GreenAccessService(RemoteAction):
                 local_address=state.hostname_ip_map[from_host],
                 remote_address=state.hostname_ip_map[to_host],
                 remote_port=8800)
-            from_host_obj.events.network_connections.append(event)
+            from_host_obj.events.add_network_connection(event)
             return obs
 
         # (b) false positive detection by Blue
@@ -211,7 +211,7 @@ class GreenAccessService(RemoteAction):
                 remote_address=self.dest_ip,
                 remote_port=self.dest_port
             )
-            from_host_obj.events.network_connections.append(event)
+            from_host_obj.events.add_network_connection(event)
 
         obs.set_success(True)
         return obs
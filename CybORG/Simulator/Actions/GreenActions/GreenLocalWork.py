@@ -112,7 +112,7 @@ class GreenLocalWork(LocalAction):
         if state.np_random.random() < self.fp_detection_rate:
             host_port = host.get_ephemeral_port()
             pc = {'local_address': self.ip_address, 'local_port': host_port}
-            host.events.process_creation.append(pc)
+            host.events.add_process_creation(pc)
 
         # 3.USER ERROR
         if state.np_random.random() < self.phishing_error_rate:
@@ -1,11 +1,14 @@
 from ipaddress import IPv4Address
-from typing import List
+from typing import List, Optional, Set
 
 from CybORG.Shared.Enums import TransportProtocol
 
 
 class HostEvents():
     """Object that holds 'events'/alerts that have happened on a specific host. 
+
+    Events must be added with `add_network_connection` and `add_process_creation`, and moved to the past events with
+    `archive`, so that the alert counters and the state's index of alerted hosts stay up to date.
     
     Attributes
     ----------
@@ -17,6 +20,14 @@ class HostEvents():
         current process creation alerts
     old_process_creation : list
         past process creation alerts
+    connection_alerts : int
+        number of current and past network connection alerts
+    process_alerts : int
+        number of current and past process creation alerts
+    hostname : str
+        name of the host, once watched by a state
+    alerted_hosts : Set[str]
+        the state's index of hosts with alerts, which this host is in whenever it has any
 
     """
     def __init__(self):
@@ -24,6 +35,72 @@ class HostEvents():
         self.old_network_connections: List[NetworkConnection] = []
         self.process_creation = []
         self.old_process_creation = []
+        self.connection_alerts = 0
+        self.process_alerts = 0
+        self.hostname: Optional[str] = None
+        self.alerted_hosts: Optional[Set[str]] = None
+
+    def watch(self, hostname: str, alerted_hosts: Set[str]):
+        """Keeps an index of alerted hosts up to date with the alerts of this host.
+
+        Parameters
+        ----------
+        hostname : str
+            name of the host the events belong to
+        alerted_hosts : Set[str]
+            index of the hostnames that have alerts
+        """
+        self.hostname = hostname
+        self.alerted_hosts = alerted_hosts
+        self._update_index()
+
+    def add_network_connection(self, event: 'NetworkConnection'):
+        """Raises a network connection alert."""
+        self.network_connections.append(event)
+        self.connection_alerts += 1
+        self._update_index()
+
+    def add_process_creation(self, event: dict):
+        """Raises a process creation alert."""
+        self.process_creation.append(event)
+        self.process_alerts += 1
+        self._update_index()
+
+    def has_alerts(self) -> bool:
+        """Whether the host has any current or past alerts."""
+        return self.connection_alerts > 0 or self.process_alerts > 0
+
+    def archive(self):
+        """Replaces the past alerts with the current ones, once they have been reported.
+
+        The lists are swapped rather than copied: the current alerts become the past ones, and the list of past
+        alerts is emptied and reused for new alerts. Events are never modified once raised, so they can be shared.
+        """
+        self.old_network_connections, self.network_connections = self.network_connections, self.old_network_connections
+        self.network_connections.clear()
+        self.old_process_creation, self.process_creation = self.process_creation, self.old_process_creation
+        self.process_creation.clear()
+        self.connection_alerts = len(self.old_network_connections)
+        self.process_alerts = len(self.old_process_creation)
+        self._update_index()
+
+    def clear(self):
+        """Discards all current and past alerts."""
+        self.network_connections = []
+        self.old_network_connections = []
+        self.process_creation = []
+        self.old_process_creation = []
+        self.connection_alerts = 0
+        self.process_alerts = 0
+        self._update_index()
+
+    def _update_index(self):
+        if self.alerted_hosts is None:
+            return
+        if self.has_alerts():
+            self.alerted_hosts.add(self.hostname)
+        else:
+            self.alerted_hosts.discard(self.hostname)
 
 class NetworkConnection():
     """Object that holds a network connection event/alert.
@@ -53,15 +53,17 @@ class Process(Entity):
         if open_ports is not None:
             for port_dict in open_ports:
                 local_address = port_dict['local_address']
-                if local_address == 'broadcast':
-                    local_address = '0.0.0.0'
-                elif local_address == 'local':
-                    local_address = '127.0.0.1'
+                if not isinstance(local_address, IPv4Address):
+                    if local_address == 'broadcast':
+                        local_address = '0.0.0.0'
+                    elif local_address == 'local':
+                        local_address = '127.0.0.1'
+                    local_address = IPv4Address(local_address)
                 transport_protocol = port_dict.get("transport_protocol", TransportProtocol.UNKNOWN)
                 if not isinstance(transport_protocol, TransportProtocol):
                     transport_protocol = TransportProtocol.parse_string(transport_protocol)
                 self.connections.append(NetworkConnection(
-                    local_address=IPv4Address(local_address),
+                    local_address=local_address,
                     local_port=port_dict['local_port'],
                     transport_protocol=transport_protocol
                 ))
@@ -109,6 +111,40 @@ class Process(Entity):
             observations.append(obs)
         return observations
 
+    def clone(self) -> 'Process':
+        """Creates a fresh copy of the process, as kept by host backups.
+
+        The copy is the process that recreating this one from `get_state` would give: connections only keep their
+        local address, local port and transport protocol, and the decoy type is not carried over.
+
+        Returns
+        -------
+        process : Process
+        """
+        open_ports = []
+        for connection in self.connections:
+            open_port = {'local_port': connection.local_port}
+            if connection.remote_port:
+                open_port['remote_port'] = connection.remote_port
+            open_port['local_address'] = connection.local_address
+            if connection.remote_address:
+                open_port['remote_address'] = connection.remote_address
+            if connection.transport_protocol:
+                open_port['transport_protocol'] = connection.transport_protocol
+            open_ports.append(open_port)
+        return Process(
+            process_name=self.name,
+            pid=self.pid,
+            username=self.user,
+            parent_pid=self.ppid,
+            program_name=self.program,
+            path=self.path,
+            open_ports=open_ports,
+            process_type=self.process_type,
+            process_version=self.version,
+            properties=self.properties
+        )
+
     def is_using_port(self, port: int) -> bool:
         return any(conn.local_port == port for conn in self.connections)
     
@@ -0,0 +1,244 @@
+import copy
+from typing import Dict, List, Optional, Set
+
+from CybORG.Simulator.Actions import Action
+
+
+def _copy_action(action: Action) -> Action:
+    """Copies an action, so that executing the copy leaves the recorded action untouched."""
+    action = copy.copy(action)
+    action.logs = list(action.logs)
+    return action
+
+
+class ReplayStep:
+    """What is needed to repeat one step of an episode.
+
+    Attributes
+    ----------
+    actions : Dict[str, Action]
+        action chosen by each agent, after validation
+    external : Set[str]
+        agents whose action was passed to the step rather than chosen by their policy
+    rng_state : dict
+        state of the bit generator after the agents chose their actions
+    messages : dict, optional
+        messages sent after the step, if `SimulationController.send_messages` was called
+    sent_messages : bool
+        whether `SimulationController.send_messages` was called after the step
+    """
+
+    def __init__(self, actions: Dict[str, Action], external: Set[str], rng_state: dict):
+        self.actions = actions
+        self.external = external
+        self.rng_state = rng_state
+        self.messages = None
+        self.sent_messages = False
+
+
+class ReplayLog:
+    """A recorded episode, created by ReplayRecorder and replayed by Replayer.
+
+    Attributes
+    ----------
+    reset_rng_state : dict
+        state of the bit generator when the episode was reset, from which the scenario was generated
+    scenario_from_rng : bool
+        whether the scenario was generated from `reset_rng_state`, which is not the case when scenarios are prefetched
+    steps : List[ReplayStep]
+        the recorded steps in order
+    checkpoints : Dict[int, SimulationSnapshot]
+        snapshots of the simulation after some numbers of steps
+    """
+
+    def __init__(self, reset_rng_state: dict, scenario_from_rng: bool):
+        self.reset_rng_state = reset_rng_state
+        self.scenario_from_rng = scenario_from_rng
+        self.steps: List[ReplayStep] = []
+        self.checkpoints = {}
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+
+class ReplayRecorder:
+    """Records the episodes of a SimulationController so that they can be replayed without the agent policies.
+
+    Each step records the action of every agent, and the state of the random number generator once the policies
+    have chosen them, so replaying a step skips the random draws of the policies. The controller calls
+    `start_episode` when it resets, `start_step` and `record_actions` during each step, and `record_messages` when
+    messages are sent.
+
+    Attributes
+    ----------
+    checkpoint_interval : int, optional
+        number of steps between snapshots of the simulation, by default no snapshots are taken. A snapshot of step 0
+        is always taken when the scenario does not come from the random number generator.
+    log : ReplayLog
+        the log of the current episode, None before the first reset
+    """
+
+    def __init__(self, checkpoint_interval: Optional[int] = None):
+        if checkpoint_interval is not None and checkpoint_interval < 1:
+            raise ValueError(f'checkpoint_interval must be positive, got {checkpoint_interval}')
+        self.checkpoint_interval = checkpoint_interval
+        self.log: Optional[ReplayLog] = None
+
+    def start_episode(self, controller):
+        """Starts a new log, before the controller generates the scenario of the episode."""
+        self.log = ReplayLog(controller.np_random.bit_generator.state, controller.scenario_prefetcher is None)
+
+    def start_step(self, controller):
+        """Takes a checkpoint of the simulation before a step, if one is due."""
+        if self.log is None:
+            return
+        step = controller.step_count
+        interval = self.checkpoint_interval
+        if (interval is not None and step % interval == 0) or (step == 0 and not self.log.scenario_from_rng):
+            self.log.checkpoints[step] = controller.snapshot()
+
+    def record_actions(self, controller, actions: Dict[str, Action], external: Set[str]):
+        """Records the actions of a step, once the agents have chosen them.
+
+        Parameters
+        ----------
+        controller : SimulationController
+        actions : Dict[str, Action]
+            action of each agent after validation
+        external : Set[str]
+            agents whose action was passed to the step
+        """
+        if self.log is None:
+            return
+        self.log.steps.append(ReplayStep(
+            {agent: _copy_action(action) for agent, action in actions.items()},
+            external,
+            controller.np_random.bit_generator.state
+        ))
+
+    def record_messages(self, messages: Optional[dict]):
+        """Records the messages sent after the last step."""
+        if self.log is None or not self.log.steps:
+            return
+        step = self.log.steps[-1]
+        step.messages = None if messages is None else {agent: copy.copy(m) for agent, m in messages.items()}
+        step.sent_messages = True
+
+
+class _RecordedPolicy:
+    """Stands in for the policy of an agent while a step is replayed, returning the recorded action."""
+
+    def __init__(self, action: Action):
+        self.action = action
+
+    def get_action(self, observation, action_space):
+        return _copy_action(self.action)
+
+
+class Replayer:
+    """Reconstructs the steps of a recorded episode.
+
+    Steps are repeated by passing the recorded actions to `SimulationController.step` with the valid action check
+    skipped, and by restoring the random number generator to its recorded state in place of the draws of the agent
+    policies, which are never called. The simulation, observations and rewards follow the recorded episode exactly,
+    but the internal state of the agents, such as the host states of FiniteStateRedAgent, only does when restored
+    from a checkpoint.
+
+    `seek` starts from the latest checkpoint before the requested step, or from the start of the episode if there is
+    none, and moves forward from the current step when it can.
+
+    Attributes
+    ----------
+    log : ReplayLog
+        the episode being replayed
+    controller : SimulationController
+        the controller that replays the episode, which must use the same scenario generator as the recording
+    checkpoint_interval : int, optional
+        number of steps between checkpoints added to the log while replaying, by default none are added
+    step_count : int
+        number of steps of the episode the controller holds, None before the first seek
+    """
+
+    def __init__(self, env, log: ReplayLog, checkpoint_interval: Optional[int] = None):
+        """
+        Parameters
+        ----------
+        env : CybORG or SimulationController
+            environment to replay the episode in, which may be the one that recorded it
+        log : ReplayLog
+            the episode to replay
+        checkpoint_interval : int, optional
+            number of steps between checkpoints added to the log while replaying
+        """
+        self.controller = getattr(env, 'environment_controller', env)
+        self.log = log
+        self.checkpoint_interval = checkpoint_interval
+        self.step_count: Optional[int] = None
+
+    def seek(self, step: int):
+        """Brings the simulation to the point after a number of steps of the episode.
+
+        Parameters
+        ----------
+        step : int
+            number of steps, from 0 for the start of the episode up to the length of the log
+        """
+        if not 0 <= step <= len(self.log):
+            raise ValueError(f'Step {step} is outside the recorded episode of {len(self.log)} steps')
+        checkpoint = max((s for s in self.log.checkpoints if s <= step), default=None)
+        rewind = self.step_count is None or self.step_count > step
+        if rewind or (checkpoint is not None and checkpoint > self.step_count):
+            self._start(checkpoint)
+        while self.step_count < step:
+            self.replay_step()
+
+    def _start(self, checkpoint: Optional[int]):
+        """Restores a checkpoint, or resets the controller to the start of the episode."""
+        controller = self.controller
+        if checkpoint is not None:
+            controller.restore(self.log.checkpoints[checkpoint])
+            self.step_count = checkpoint
+            return
+        if not self.log.scenario_from_rng or controller.scenario_prefetcher is not None:
+            raise ValueError('The scenario of the episode cannot be regenerated, replay needs a checkpoint of step 0')
+        recorder, controller.replay_recorder = controller.replay_recorder, None
+        try:
+            controller.np_random.bit_generator.state = self.log.reset_rng_state
+            controller.reset()
+        finally:
+            controller.replay_recorder = recorder
+        self.step_count = 0
+
+    def replay_step(self):
+        """Repeats the next step of the episode."""
+        if self.step_count is None:
+            self._start(0 if 0 in self.log.checkpoints else None)
+        if self.step_count >= len(self.log):
+            raise ValueError('The end of the recorded episode has been reached')
+        controller = self.controller
+        record = self.log.steps[self.step_count]
+
+        interfaces = controller.agent_interfaces
+        policies = {}
+        for agent_name, interface in interfaces.items():
+            if agent_name not in record.external:
+                policies[agent_name] = interface.agent
+                interface.agent = _RecordedPolicy(record.actions[agent_name])
+        recorder, controller.replay_recorder = controller.replay_recorder, None
+        try:
+            controller.np_random.bit_generator.state = record.rng_state
+            controller.step(
+                {agent: _copy_action(record.actions[agent]) for agent in record.external},
+                skip_valid_action_check=True
+            )
+            if record.sent_messages:
+                controller.send_messages(record.messages)
+        finally:
+            controller.replay_recorder = recorder
+            for agent_name, agent in policies.items():
+                interfaces[agent_name].agent = agent
+        self.step_count += 1
+
+        interval = self.checkpoint_interval
+        if interval is not None and self.step_count % interval == 0 and self.step_count not in self.log.checkpoints:
+            self.log.checkpoints[self.step_count] = controller.snapshot()
@@ -0,0 +1,321 @@
+import hashlib
+import io
+import mmap
+import pickle
+import struct
+import zlib
+from typing import Iterable, List, Optional, Tuple, Union
+
+from gym.utils import seeding
+from gym.utils.seeding import RandomNumberGenerator
+
+from CybORG.Shared import Scenario
+from CybORG.Simulator.Scenarios.EnterpriseScenarioGenerator import EnterpriseScenarioGenerator
+
+# File signature and format version of scenario pool files.
+POOL_MAGIC = b'CYBORGSP'
+POOL_VERSION = 1
+# Signature, version and header length.
+_PREAMBLE = struct.Struct('<8sIQ')
+
+# Generator attributes that determine the scenarios it creates.
+GENERATOR_PARAMETERS = ('blue_agent_class', 'red_agent_class', 'green_agent_class', 'steps')
+
+
+def _rng_state_key(np_random: RandomNumberGenerator) -> bytes:
+    """Returns a digest identifying the current state of a random number generator.
+
+    Parameters
+    ----------
+    np_random : RandomNumberGenerator
+
+    Returns
+    -------
+    key : bytes
+    """
+    return hashlib.sha256(repr(np_random.bit_generator.state).encode()).digest()
+
+
+class ScenarioPool:
+    """A file of pre-generated CC4 scenarios, created by `ScenarioPool.build`.
+
+    Each entry holds the scenario that `EnterpriseScenarioGenerator.create_scenario` generates from a freshly seeded
+    random number generator, together with the state the generator is left in. Loading an entry is therefore
+    indistinguishable from generating the scenario live.
+
+    The file starts with a small header indexing the entries, which are stored as compressed pickles. It is memory
+    mapped, so processes sharing a pool also share its pages. Pool files are pickles and must only be loaded from
+    trusted sources.
+
+    Attributes
+    ----------
+    path : str
+        path of the pool file
+    seeds : List[int]
+        seed of each entry
+    generator_parameters : dict
+        keyword arguments of the EnterpriseScenarioGenerator the pool was built with
+    """
+
+    def __init__(self, path: str):
+        """
+        Parameters
+        ----------
+        path : str
+            path of a file created by `ScenarioPool.build`
+
+        Raises
+        ------
+        ValueError
+            the file is not a scenario pool of a supported version
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, header_length = _PREAMBLE.unpack_from(self._map)
+        except struct.error:
+            magic = version = None
+        if magic != POOL_MAGIC or version != POOL_VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a version {POOL_VERSION} scenario pool')
+        header = pickle.loads(self._map[_PREAMBLE.size:_PREAMBLE.size + header_length])
+        self._data_offset = _PREAMBLE.size + header_length
+        self.seeds: List[int] = header['seeds']
+        self.generator_parameters: dict = header['generator_parameters']
+        self._offsets: List[int] = header['offsets']
+        self._lengths: List[int] = header['lengths']
+        self._indices = {}
+        for index, key in enumerate(header['keys']):
+            self._indices.setdefault(key, index)
+
+    @classmethod
+    def build(cls, path: str, scenario_generator: EnterpriseScenarioGenerator, seeds: Iterable[int]) -> 'ScenarioPool':
+        """Generates a scenario for each seed and writes them to a pool file.
+
+        Parameters
+        ----------
+        path : str
+            path of the pool file to write
+        scenario_generator : EnterpriseScenarioGenerator
+            generator creating the scenarios
+        seeds : Iterable[int]
+            seeds of the random number generators the scenarios are generated with
+
+        Returns
+        -------
+        pool : ScenarioPool
+            the opened pool
+
+        Raises
+        ------
+        ValueError
+            the generator is not an EnterpriseScenarioGenerator, which the pool could not reproduce
+        """
+        if type(scenario_generator) is not EnterpriseScenarioGenerator:
+            raise ValueError(f'Scenario pools can only be built from an EnterpriseScenarioGenerator, not {type(scenario_generator)}')
+        seeds = list(seeds)
+        keys, offsets, lengths = [], [], []
+        entries = io.BytesIO()
+        for seed in seeds:
+            np_random, _ = seeding.np_random(seed)
+            keys.append(_rng_state_key(np_random))
+            scenario = scenario_generator.create_scenario(np_random)
+            state = (scenario, list(scenario_generator.used_pids), np_random.bit_generator.state)
+            entry = zlib.compress(dump_scenario(state, np_random))
+            offsets.append(entries.tell())
+            lengths.append(len(entry))
+            entries.write(entry)
+
+        header = pickle.dumps({
+            'seeds': seeds,
+            'generator_parameters': {name: getattr(scenario_generator, name) for name in GENERATOR_PARAMETERS},
+            'keys': keys,
+            'offsets': offsets,
+            'lengths': lengths,
+        }, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(path, 'wb') as f:
+            f.write(_PREAMBLE.pack(POOL_MAGIC, POOL_VERSION, len(header)))
+            f.write(header)
+            f.write(entries.getbuffer())
+        return cls(path)
+
+    def __len__(self) -> int:
+        return len(self.seeds)
+
+    def index(self, np_random: RandomNumberGenerator) -> Optional[int]:
+        """Returns the entry generated from the current state of a random number generator.
+
+        Parameters
+        ----------
+        np_random : RandomNumberGenerator
+
+        Returns
+        -------
+        index : Optional[int]
+            index of the entry, or None if the pool has no scenario for this state
+        """
+        return self._indices.get(_rng_state_key(np_random))
+
+    def load(self, index: int, np_random: RandomNumberGenerator) -> Tuple[Scenario, List[int]]:
+        """Loads a new copy of a scenario and leaves the random number generator as generating it would have.
+
+        Parameters
+        ----------
+        index : int
+            index of the entry
+        np_random : RandomNumberGenerator
+            generator given to the scenario's hosts and agents; its state is overwritten
+
+        Returns
+        -------
+        scenario : Scenario
+        used_pids : List[int]
+            process ids the generator allocated while creating the scenario
+        """
+        start = self._data_offset + self._offsets[index]
+        data = zlib.decompress(self._map[start:start + self._lengths[index]])
+        scenario, used_pids, rng_state = load_scenario(data, np_random)
+        np_random.bit_generator.state = rng_state
+        return scenario, used_pids
+
+    def close(self):
+        """Releases the pool file."""
+        self._map.close()
+        self._file.close()
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def __deepcopy__(self, memo):
+        # the pool is read only, so copies can share it
+        return self
+
+
+class PooledScenarioGenerator(EnterpriseScenarioGenerator):
+    """An EnterpriseScenarioGenerator that takes its scenarios from a ScenarioPool where it can.
+
+    By default a scenario is loaded from the pool whenever the random number generator is in the state the entry was
+    generated from, which is the case after seeding CybORG or `CybORG.reset` with one of the pool's seeds. Any other
+    state falls back to generating the scenario live, so the generator behaves exactly like the
+    EnterpriseScenarioGenerator the pool was built with.
+
+    In sequential mode each scenario is the next entry of the pool instead, cycling back to the first one. The random
+    number generator is moved to the state the entry left it in, so every episode matches an episode reset with that
+    entry's seed.
+
+    Attributes
+    ----------
+    pool : ScenarioPool
+        the pool scenarios are taken from
+    sequential : bool
+        whether the pool's entries are handed out in order
+    next_index : int
+        entry handed out next in sequential mode
+    """
+
+    def __init__(self, pool: Union[str, ScenarioPool], sequential: bool = False):
+        """
+        Parameters
+        ----------
+        pool : Union[str, ScenarioPool]
+            the pool, or the path of its file
+        sequential : bool, optional
+            hand out the pool's entries in order instead of matching seeds, by default False
+        """
+        if not isinstance(pool, ScenarioPool):
+            pool = ScenarioPool(pool)
+        super().__init__(**pool.generator_parameters)
+        self.pool = pool
+        self.sequential = sequential
+        self.next_index = 0
+
+    def create_scenario(self, np_random: RandomNumberGenerator) -> Scenario:
+        """Loads the matching scenario from the pool, or generates it if there is none.
+
+        Parameters
+        ----------
+        np_random : RandomNumberGenerator
+            The RNG that will be used to make "random" decisions when creating scenarios.
+
+        Returns
+        -------
+        scenario : Scenario
+            The new enterprise scenario object
+        """
+        if self.sequential:
+            index = self.next_index
+            self.next_index = (index + 1) % len(self.pool)
+        else:
+            index = self.pool.index(np_random)
+            if index is None:
+                return super().create_scenario(np_random)
+        self.np_random = np_random
+        scenario, used_pids = self.pool.load(index, np_random)
+        self.used_pids[:] = used_pids
+        return scenario
+
+
+def dump_scenario(obj, np_random: RandomNumberGenerator) -> bytes:
+    """Pickles scenario objects, referring to their random number generator instead of copying it.
+
+    Used by ScenarioPool and ScenarioPrefetcher to move scenarios between processes and files.
+
+    Parameters
+    ----------
+    obj : Any
+        a scenario, or any object holding one
+    np_random : RandomNumberGenerator
+        the generator the scenario uses, which is not copied
+
+    Returns
+    -------
+    data : bytes
+        the pickled objects, to be loaded with `load_scenario`
+    """
+    buffer = io.BytesIO()
+    _PoolPickler(buffer, np_random).dump(obj)
+    return buffer.getvalue()
+
+
+def load_scenario(data: bytes, np_random: RandomNumberGenerator):
+    """Unpickles scenario objects pickled by `dump_scenario`.
+
+    Parameters
+    ----------
+    data : bytes
+        data returned by `dump_scenario`
+    np_random : RandomNumberGenerator
+        the generator given to the loaded objects in place of the one they were pickled with
+
+    Returns
+    -------
+    : Any
+        the loaded objects
+    """
+    return _PoolUnpickler(io.BytesIO(data), np_random).load()
+
+
+class _PoolPickler(pickle.Pickler):
+    """Pickles the scenario's random number generator by reference."""
+
+    def __init__(self, file, np_random: RandomNumberGenerator):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.np_random = np_random
+
+    def persistent_id(self, obj):
+        return 'np_random' if obj is self.np_random else None
+
+
+class _PoolUnpickler(pickle.Unpickler):
+    """Gives a loaded scenario the random number generator of the simulation."""
+
+    def __init__(self, file, np_random: RandomNumberGenerator):
+        super().__init__(file)
+        self.np_random = np_random
+
+    def persistent_load(self, pid):
+        return self.np_random
@@ -0,0 +1,136 @@
+import copy
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+from gym.utils import seeding
+from gym.utils.seeding import RandomNumberGenerator
+
+from CybORG.Shared import Scenario
+from CybORG.Shared.Scenarios.ScenarioGenerator import ScenarioGenerator
+from CybORG.Simulator.Scenarios.ScenarioPool import dump_scenario, load_scenario
+
+# Exclusive upper bound of the seeds that start a scenario stream.
+MAX_STREAM_SEED = 2 ** 63
+
+
+def _generate_scenario(scenario_generator: ScenarioGenerator, rng_state: dict) -> Tuple[bytes, dict]:
+    """Generates a scenario from a random number generator state.
+
+    Runs on the prefetch worker, which may be another process, so the scenario is returned pickled.
+
+    Parameters
+    ----------
+    scenario_generator : ScenarioGenerator
+    rng_state : dict
+        bit generator state the scenario is generated from
+
+    Returns
+    -------
+    data : bytes
+        the pickled scenario
+    rng_state : dict
+        bit generator state after generating the scenario
+    """
+    np_random = np.random.Generator(np.random.PCG64())
+    np_random.bit_generator.state = rng_state
+    scenario = scenario_generator.create_scenario(np_random)
+    return dump_scenario(scenario, np_random), np_random.bit_generator.state
+
+
+class ScenarioPrefetcher:
+    """Generates the scenario of the next episode while the current episode runs.
+
+    The scenario of an episode cannot depend on the simulation's random number generator, whose state at the next
+    reset is only known once the current episode has finished. The prefetcher therefore generates scenarios from a
+    stream of their own, seeded by a draw from the simulation's generator. Every scenario continues that stream where
+    the previous one left it, and is given the simulation's generator when it is handed out.
+
+    Scenarios are generated the same way whether or not it happens in the background, so a prefetched scenario is
+    bit-identical to one generated synchronously from the same stream. Generation of the next scenario only starts
+    when `prefetch` is called, which the simulation does once a reset has finished so that the two do not compete.
+    A background thread still shares the interpreter with the simulation; a process pool executor runs generation
+    fully in parallel.
+
+    Attributes
+    ----------
+    scenario_generator : ScenarioGenerator
+        private copy of the generator creating the scenarios
+    background : bool
+        whether scenarios are generated on the executor ahead of time
+    executor : Executor
+        worker generating the scenarios, by default a single background thread
+    """
+
+    def __init__(self, scenario_generator: ScenarioGenerator, np_random: RandomNumberGenerator,
+                 background: bool = True, executor: Executor = None):
+        """
+        Parameters
+        ----------
+        scenario_generator : ScenarioGenerator
+            generator creating the scenarios, which is copied so that it can run alongside the simulation
+        np_random : RandomNumberGenerator
+            generator the scenario stream is seeded from
+        background : bool, optional
+            generate scenarios ahead of time, by default True
+        executor : Executor, optional
+            worker to generate scenarios on, by default a background thread owned by the prefetcher
+        """
+        self.scenario_generator = copy.deepcopy(scenario_generator)
+        self.background = background
+        self._owns_executor = background and executor is None
+        if self._owns_executor:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ScenarioPrefetcher')
+        self.executor = executor
+        self._rng_state: dict = None
+        self._pending: Optional[Future] = None
+        self.reseed(np_random)
+
+    def reseed(self, np_random: RandomNumberGenerator):
+        """Starts a new scenario stream, discarding any prefetched scenario.
+
+        Parameters
+        ----------
+        np_random : RandomNumberGenerator
+            generator the stream is seeded from
+        """
+        self._discard()
+        stream, _ = seeding.np_random(int(np_random.integers(MAX_STREAM_SEED)))
+        self._rng_state = stream.bit_generator.state
+
+    def prefetch(self):
+        """Starts generating the next scenario in the background, unless it already is."""
+        if self.background and self._pending is None:
+            self._pending = self.executor.submit(_generate_scenario, self.scenario_generator, self._rng_state)
+
+    def next_scenario(self, np_random: RandomNumberGenerator) -> Scenario:
+        """Hands out the next scenario of the stream, generating it now if it has not been prefetched.
+
+        Parameters
+        ----------
+        np_random : RandomNumberGenerator
+            the simulation's generator, given to the scenario's hosts and agents
+
+        Returns
+        -------
+        scenario : Scenario
+        """
+        if self._pending is not None:
+            data, self._rng_state = self._pending.result()
+            self._pending = None
+        else:
+            data, self._rng_state = _generate_scenario(self.scenario_generator, self._rng_state)
+        return load_scenario(data, np_random)
+
+    def close(self):
+        """Stops the background worker if the prefetcher owns it."""
+        self._discard()
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+
+    def _discard(self):
+        if self._pending is not None:
+            if not self._pending.cancel():
+                # a running generation still uses the generator copy
+                self._pending.result()
+            self._pending = None
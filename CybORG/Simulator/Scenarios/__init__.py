@@ -1 +1,3 @@
 from .EnterpriseScenarioGenerator import EnterpriseScenarioGenerator
+from .ScenarioPool import ScenarioPool, PooledScenarioGenerator
+from .ScenarioPrefetcher import ScenarioPrefetcher
@@ -1,10 +1,13 @@
 # Copyright DST Group. Licensed under the MIT license.
 import gym
+import numpy as np
 from gym.utils.seeding import RandomNumberGenerator
 
-from typing import Dict, List, Tuple
+from concurrent.futures import Executor
+from typing import Dict, List, Tuple, Union
 from CybORG.Shared import Scenario
 from CybORG.Shared import Enums
+from CybORG.Shared.ActionSpace import ObservationValues, create_parameter_tables
 from CybORG.Shared.AgentInterface import AgentInterface
 from CybORG.Shared.Enums import DecoyType, TernaryEnum
 from CybORG.Shared.Logger import CybORGLogger
@@ -14,11 +17,16 @@ from CybORG.Shared.Session import RedAbstractSession
 from CybORG.Simulator.Actions import BlockTraffic, DiscoverNetworkServices, DiscoverRemoteSystems, ExploitRemoteService, PrivilegeEscalate, Analyse, Remove, Restore, RemoveOtherSessions, Impact
 from CybORG.Simulator.Actions.Action import Action, RemoteAction, Sleep, InvalidAction
 from CybORG.Simulator.Actions.ConcreteActions.ControlTraffic import AllowTraffic
-from CybORG.Shared.Observation import Observation
+from CybORG.Shared.Observation import AddressFilter, Observation
 from CybORG.Shared.RewardCalculator import RewardCalculator
 from CybORG.Shared.Scenarios.ScenarioGenerator import ScenarioGenerator
+from CybORG.Simulator.SimulationSnapshot import SimulationSnapshot
 from CybORG.Simulator.State import State
-from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator 
+from CybORG.Simulator.StepTimer import (
+    StepTimer, MISSION_PHASE, AGENT_ACTIONS, ACTION_VALIDATION, ACTION_ORDERING, OBSERVATION_FILTERING,
+    AGENT_REASSIGNMENT, END_TURN_ACTIONS, INTERFACE_UPDATES, REWARD_CALCULATION, HOST_UPDATES, DATA_LINKS, OTHER
+)
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator, ScenarioPrefetcher
 
 
 
@@ -41,6 +49,8 @@ class SimulationController(CybORGLogger):
         dictionary of hostnames and their bandwidth usage
     blocked_actions : list
         list of blocked actions
+    connectivity : Tuple[List[str], np.ndarray]
+        agent names and matrix of which agents can message each other, computed at most once per step
     done: bool
         flag for when the episode is complete
     dropped_actions : list
@@ -63,6 +73,10 @@ class SimulationController(CybORGLogger):
         seeded numpy random number generator
     observation: Dict[str, ObservationSet]
         observations of all agents
+    observation_filters : Dict[Tuple[str, int], AddressFilter]
+        address filters applied to observations, indexed by agent name (None for the true state) and mission phase
+    replay_recorder : ReplayRecorder
+        records the episodes so that they can be replayed without the agent policies, None when not recording
     reward : Dict[str, Dict[str, int]]
         current reward for each team
     routeless_actions : list
@@ -71,10 +85,14 @@ class SimulationController(CybORGLogger):
         scenario object that the simulation is based off of
     scenario_generator : ScenarioGenerator
         the scenario generator that created the scenario
+    scenario_prefetcher : ScenarioPrefetcher
+        generates the scenario of the next episode in the background, if enabled
     state : State
         the current state of the environment
     step_count : int
         the current step count
+    step_timer : StepTimer
+        times the phases of each step when enabled, across episodes
     subnet_cidr_map : Dict[SUBNET, IPv4Network]
         map of subnets to their network ip address
     team_reward_calculators : Dict[str, Dict[str, RewardCalculator]]
@@ -85,25 +103,37 @@ class SimulationController(CybORGLogger):
         mapping of teams to agent names (duplicate)
 
     """
-    def __init__(self, scenario_generator: ScenarioGenerator, agents, np_random: RandomNumberGenerator):
+    def __init__(self, scenario_generator: ScenarioGenerator, agents, np_random: RandomNumberGenerator,
+                 prefetch_scenarios: Union[bool, Executor] = False):
         """
         Parameters
         ----------
         scenario_generator : ScenarioGenerator
         agents : dict
         np_random: RandomNumberGenerator
+        prefetch_scenarios : Union[bool, Executor]
+            generate the scenario of the next episode in the background, see ScenarioPrefetcher.
+            An executor to generate the scenarios on may be given instead of True.
         """
         self.state = None
         self.bandwidth_usage = {}
         self.dropped_actions = []
         self.routeless_actions = []
         self.blocked_actions = []
+        self.connectivity = None
         self.end_turn_actions = {}
         self.hostname_ip_map = None
         self.subnet_cidr_map = None
+        self.observation_filters = {}
+        self.step_timer = StepTimer()
+        self.replay_recorder = None
         self.scenario_generator = scenario_generator
         self.np_random = np_random
-        scenario = scenario_generator.create_scenario(np_random)
+        self.scenario_prefetcher = None
+        if prefetch_scenarios:
+            executor = prefetch_scenarios if isinstance(prefetch_scenarios, Executor) else None
+            self.scenario_prefetcher = ScenarioPrefetcher(scenario_generator, np_random, executor=executor)
+        scenario = self._create_scenario()
         self._create_environment(scenario)
         self.max_bandwidth = scenario.max_bandwidth
         self.step_count = 0
@@ -133,12 +163,6 @@ class SimulationController(CybORGLogger):
             self.INFO_DICT[agent] = scenario.get_agent_info(agent).osint.get('Hosts', {})
             for host in self.INFO_DICT[agent].keys():
                 self.INFO_DICT[agent][host]['Sessions'] = agent
-
-        # populate initial observations with OSINT
-        for agent_name, agent in self.agent_interfaces.items():
-            obs = self.get_true_state(self.INFO_DICT[agent_name])
-            self.observation[agent_name] = self._filter_obs(obs, agent_name)
-            agent.set_init_obs(self.observation[agent_name].data, self.init_state)
         self.actions_queues = {agent_name: [] for agent_name in self.agent_interfaces.keys()}
         self.reset_observation()
         self.message_length = self.scenario_generator.MESSAGE_LENGTH
@@ -148,6 +172,8 @@ class SimulationController(CybORGLogger):
             self.reward[team_name] = {}
             for reward_name, r_calc in team_calcs.items():
                 self.reward[team_name][reward_name] = self.calculate_reward(r_calc)
+        if self.scenario_prefetcher is not None:
+            self.scenario_prefetcher.prefetch()
         self._log_debug(f"Finished init()")
 
     def reset(self, np_random=None) -> Results:
@@ -167,10 +193,15 @@ class SimulationController(CybORGLogger):
         self.observation = {}
         self.step_count = 0
         self.actions_in_progress = {}
+        self.connectivity = None
         if np_random is not None:
+            if np_random is not self.np_random and self.scenario_prefetcher is not None:
+                self.scenario_prefetcher.reseed(np_random)
             self.np_random = np_random
+        if self.replay_recorder is not None:
+            self.replay_recorder.start_episode(self)
 
-        scenario = self.scenario_generator.create_scenario(self.np_random)
+        scenario = self._create_scenario()
         self._create_environment(scenario)
 
         self.agent_interfaces = self._create_agents(scenario, self.agents)
@@ -190,9 +221,6 @@ class SimulationController(CybORGLogger):
             for host in self.INFO_DICT[agent].keys():
                 self.INFO_DICT[agent][host]['Sessions'] = agent
         self.actions_queues = {agent_name: [] for agent_name in self.agent_interfaces.keys()}
-        for agent_name, agent_object in self.agent_interfaces.items():
-            self.observation[agent_name] = self._filter_obs(self.get_true_state(self.INFO_DICT[agent_name]), agent_name)
-            agent_object.set_init_obs(self.observation[agent_name].data, self.init_state)
         self.reset_observation()
         self.done = self.determine_done()
 
@@ -207,6 +235,8 @@ class SimulationController(CybORGLogger):
             self.state.mission_phase = 0
             # update allowed subnets in all agent interfaces and agent spaces
             self._update_agents_allowed_subnets()
+        if self.scenario_prefetcher is not None:
+            self.scenario_prefetcher.prefetch()
     
     def step(self, actions: dict = None, skip_valid_action_check=False):
         """Updates the simulation environment based on the joint actions of all agents
@@ -220,6 +250,14 @@ class SimulationController(CybORGLogger):
             if not valid then the action is replaced with an InvalidAction object
         
         """
+        recorder = self.replay_recorder
+        if recorder is not None:
+            recorder.start_step(self)
+            chosen_actions = {}
+        timer = self.step_timer if self.step_timer.enabled else None
+        if timer is not None:
+            timer.start()
+
         # changes to step and mission phase will only effect CC4
         if isinstance(self.scenario_generator, EnterpriseScenarioGenerator):
             # update step in state and calc current mission phase
@@ -227,10 +265,15 @@ class SimulationController(CybORGLogger):
             if self.state.check_next_phase_on_update_step(self.step_count):
                 # update allowed subnets in all agent interfaces and agent spaces
                 self._update_agents_allowed_subnets()
+        if timer is not None:
+            timer.lap(MISSION_PHASE)
         
         if actions is None:
             actions = {}
 
+        # sessions and links change during the step
+        self.connectivity = None
+
         # Adds new actions to the action sets.
         # Any agent that doesn't have an action supplied has a default action added for it.
         for agent_name, agent_object in self.agent_interfaces.items():
@@ -238,14 +281,22 @@ class SimulationController(CybORGLogger):
             if action is None:
                 last_obs = self.get_last_observation(agent_name)
                 action = agent_object.get_action(last_obs)
+                if timer is not None:
+                    timer.lap(AGENT_ACTIONS)
             if not skip_valid_action_check:
                 action = self.replace_action_if_invalid(action, agent_object)
+                if timer is not None:
+                    timer.lap(ACTION_VALIDATION)
+            if recorder is not None:
+                chosen_actions[agent_name] = action
             # Adds a new item to a particular action set. Action sets are indexed by agent_name
             # This function will create any necessary empty dicts/lists as it goes.
             # The remaining_ticks is assumed to start at the duration of the action unless specified otherwise.
             set_item = {"action": action, "remaining_ticks": action.duration}
             if self.actions_in_progress.get(agent_name, None) is None:
                 self.actions_in_progress[agent_name] = set_item
+        if recorder is not None:
+            recorder.record_actions(self, chosen_actions, {a for a in chosen_actions if actions.get(a) is not None})
 
         # clear old observations
         self.observation = {a: ObservationSet([]) for a in self.agent_interfaces}
@@ -265,17 +316,27 @@ class SimulationController(CybORGLogger):
                 actions_to_execute[agent_name].append(Sleep())
 
         self.action = actions_to_execute
+        if timer is not None:
+            timer.lap(OTHER)
         actions_to_execute = self.sort_action_order(actions_to_execute)
+        if timer is not None:
+            timer.lap(ACTION_ORDERING)
 
         # execute actions in order of priority
         for (agent_name, action) in actions_to_execute:
             obs = self.execute_action(action)
+            if timer is not None:
+                timer.lap_action(action)
             filtered_obs = self._filter_obs(obs, agent_name)
             filtered_obs.data['action'] = action
             self.observation[agent_name].append(filtered_obs)
+            if timer is not None:
+                timer.lap(OBSERVATION_FILTERING)
 
         # check for sessions that need to be reassigned to a different agent, due to subnet traversal
         self.different_subnet_agent_reassignment()
+        if timer is not None:
+            timer.lap(AGENT_REASSIGNMENT)
         
         # execute additional default end turn actions
         for agent_name, agent_action in self.end_turn_actions.items():
@@ -285,6 +346,8 @@ class SimulationController(CybORGLogger):
                 filtered_obs.data['action'] = agent_action[0](**agent_action[1])
                 self.observation[agent_name].observations.append(filtered_obs)
                 # self._session_check()
+        if timer is not None:
+            timer.lap(END_TURN_ACTIONS)
 
         # update agent interfaces and action spaces
         for agent_name, observation_sets in self.observation.items():
@@ -292,6 +355,8 @@ class SimulationController(CybORGLogger):
                 session_length = len(self.get_action_space(agent_name)['session'])
                 if self.scenario_generator.update_each_step or session_length == 0:
                     self.agent_interfaces[agent_name].update(observation)
+        if timer is not None:
+            timer.lap(INTERFACE_UPDATES)
 
         # Increment step counter
         self.step_count += 1
@@ -301,6 +366,8 @@ class SimulationController(CybORGLogger):
 
         # reset previous reward
         self.reward = {}
+        if timer is not None:
+            timer.lap(OTHER)
 
         # calculate reward for each team
         for team_name, team_calcs in self.team_reward_calculators.items():
@@ -309,16 +376,60 @@ class SimulationController(CybORGLogger):
                 self.reward[team_name][reward_name] = self.calculate_reward(r_calc)
             action_cost = sum(actions.get(agent, Action()).cost for agent in self.team[team_name])
             self.reward[team_name]['action_cost'] = action_cost
+        if timer is not None:
+            timer.lap(REWARD_CALCULATION)
 
         for host in self.state.hosts.values():
             host.update(self.state)
+        if timer is not None:
+            timer.lap(HOST_UPDATES)
         self.state.update_data_links()
+        if timer is not None:
+            timer.lap(DATA_LINKS)
+            timer.stop()
+
+    def snapshot(self) -> SimulationSnapshot:
+        """Captures the complete simulation so that it can be returned to later with `restore`.
+
+        This includes the State (hosts, sessions, blocks, events and mission phase), agent interfaces and agent
+        internal state, actions in progress, observations, rewards and the random number generator state.
+
+        Returns
+        -------
+        : SimulationSnapshot
+            token that can be passed to `restore` any number of times
+        """
+        return SimulationSnapshot(self)
+
+    def restore(self, snapshot: SimulationSnapshot):
+        """Returns the simulation to the point captured by `snapshot`.
+
+        Parameters
+        ----------
+        snapshot : SimulationSnapshot
+            token returned by `snapshot`
+        """
+        snapshot.restore(self)
 
     def set_np_random(self, np_random):
         """Sets the random number generator"""
+        if self.scenario_prefetcher is not None:
+            self.scenario_prefetcher.reseed(np_random)
+            self.scenario_prefetcher.prefetch()
         self.np_random = np_random
         self.state.set_np_random(np_random)
 
+    def close(self):
+        """Stops the background scenario generation, if enabled"""
+        if self.scenario_prefetcher is not None:
+            self.scenario_prefetcher.close()
+
+    def _create_scenario(self) -> Scenario:
+        """Creates the scenario of a new episode"""
+        if self.scenario_prefetcher is not None:
+            return self.scenario_prefetcher.next_scenario(self.np_random)
+        return self.scenario_generator.create_scenario(self.np_random)
+
     def execute_action(self, action: Action) -> Observation:
         """Executes the given action 
         
@@ -353,6 +464,7 @@ class SimulationController(CybORGLogger):
         self.state = State(scenario, self.np_random)
         self.hostname_ip_map = {h: ip for ip, h in self.state.ip_addresses.items()}
         self.subnet_cidr_map = self.state.subnet_name_to_cidr
+        self.observation_filters = {}
         self.end_turn_actions = scenario.get_end_turn_actions()
 
     def calculate_reward(self, reward_calculator: RewardCalculator) -> float:
@@ -513,6 +625,44 @@ class SimulationController(CybORGLogger):
                     break
         return connected_agents
 
+    def get_connectivity_matrix(self) -> Tuple[List[str], np.ndarray]:
+        """Gets which agents can send messages to each other.
+
+        Equivalent to calling `get_connected_agents` for every agent, but computed from the host component index in a
+        single pass over the sessions and cached until the next step.
+
+        Returns
+        -------
+        agents : List[str]
+            sorted agent names indexing both axes of the matrix
+        matrix : np.ndarray
+            boolean array of shape (len(agents), len(agents)) where matrix[i, j] is True if messages sent by agents[i]
+            are delivered to agents[j]
+        """
+        if self.connectivity is None:
+            agents = sorted(self.agent_interfaces)
+            component_index = self.state.component_index
+            num_components = len(self.state.connected_components)
+            # membership[j, c] is True if agents[j] has a root session on a host in component c
+            membership = np.zeros((len(agents), num_components + 1), dtype=bool)
+            # the component of the host each agent sends from, num_components if it cannot reach any host
+            source_components = np.full(len(agents), num_components)
+            has_source = np.zeros(len(agents), dtype=bool)
+            for i, agent in enumerate(agents):
+                for session in self.state.sessions[agent].values():
+                    if session.parent is None:
+                        component = component_index.get(session.hostname, num_components)
+                        membership[i, component] = True
+                        source_components[i] = component
+                        has_source[i] = True
+            membership[:, num_components] = False
+            matrix = membership[:, source_components].T
+            # agents only receive their own messages if they have no root session
+            np.fill_diagonal(matrix, ~has_source)
+            matrix.flags.writeable = False
+            self.connectivity = (agents, matrix)
+        return self.connectivity
+
     def get_render_data(self):
         """ Build render data for CC3 - not used for CC4 """
         pass
@@ -764,12 +914,21 @@ class SimulationController(CybORGLogger):
 
                 agent.update_allowed_subnets(green_mphase)
 
+        # allowed subnets may have changed, so rebuild the observation filters for this mission phase
+        for agent_name in self.agent_interfaces:
+            self.observation_filters.pop((agent_name, curr_mp), None)
+            self._get_observation_filter(agent_name)
+
     def reset_observation(self):
-        """Populate initial observations with OSINT"""
+        """Populate initial observations with OSINT
+
+        The initial true state is parsed once and shared by the action spaces of all agents.
+        """
+        true_values = ObservationValues(self.init_state)
         for agent_name, agent in self.agent_interfaces.items():
             true_state = self.get_true_state(self.INFO_DICT[agent_name])
             initial_obs = self._filter_obs(true_state, agent_name)
-            agent.set_init_obs(initial_obs.data, self.init_state)
+            agent.set_init_obs(initial_obs.data, true_values)
             self.observation[agent_name] = ObservationSet([initial_obs])
 
     def _session_check(self):
@@ -785,6 +944,8 @@ class SimulationController(CybORGLogger):
         ----------
         messages : dict
         """
+        if self.replay_recorder is not None:
+            self.replay_recorder.record_messages(messages)
         if messages is None:
             messages = {}
 
@@ -792,11 +953,20 @@ class SimulationController(CybORGLogger):
         for agent, agent_interface in self.agent_interfaces.items():
             agent_interface.messages = []
 
+        if len(messages) == 0:
+            return
+
         # send message to other agents
-        for agent, message in sorted(messages.items()):
+        senders = sorted(messages)
+        for agent in senders:
+            message = messages[agent]
             assert self.get_message_space(agent).contains(message), f'{agent} attempting to send message {message} that is not in the message space {self.get_message_space(agent)}'
-            for other_agent in self.get_connected_agents(agent):
-                self.agent_interfaces[other_agent].messages.append(message)
+        # each receiver gets the messages of its connected senders in sorted sender order
+        agents, matrix = self.get_connectivity_matrix()
+        agent_index = {agent: i for i, agent in enumerate(agents)}
+        delivered = matrix[[agent_index[agent] for agent in senders]]
+        for receiver in np.flatnonzero(delivered.any(axis=0)):
+            self.agent_interfaces[agents[receiver]].messages = [messages[senders[i]] for i in np.flatnonzero(delivered[:, receiver])]
 
         # add messages to observations
         for agent, observation in self.observation.items():
@@ -1031,6 +1201,8 @@ class SimulationController(CybORGLogger):
 
     def _create_agents(self, scenario: Scenario, agent_classes: dict = None) -> Dict[str, AgentInterface]:
         agents = {}
+        # the agents of an episode index their action spaces against the same parameter values
+        parameter_tables = create_parameter_tables()
 
         for agent_name in scenario.agents:
             agent_info = scenario.get_agent_info(agent_name)
@@ -1047,23 +1219,43 @@ class SimulationController(CybORGLogger):
                 allowed_subnets=agent_info.allowed_subnets,
                 scenario=scenario,
                 active = agent_info.active,
-                internal_only = agent_info.internal_only
+                internal_only = agent_info.internal_only,
+                parameter_tables=parameter_tables
             )
         return agents
 
     def _filter_obs(self, obs: Observation, agent_name=None):
         """Filter obs to contain only hosts/subnets in scenario network """
         if self.scenario_generator.update_each_step:
+            obs.filter_addresses_with(self._get_observation_filter(agent_name))
+        return obs
+
+    def _get_observation_filter(self, agent_name=None) -> AddressFilter:
+        """Gets the address filter for an agent's observations in the current mission phase.
+
+        Filters are created the first time they are needed and reused until the next reset.
+
+        Parameters
+        ----------
+        agent_name : str
+            name of the agent, or None for the true state
+
+        Returns
+        -------
+        : AddressFilter
+            all host ip addresses and the subnets the agent is allowed to observe
+        """
+        key = (agent_name, self.state.mission_phase)
+        address_filter = self.observation_filters.get(key)
+        if address_filter is None:
             if agent_name is not None:
                 allowed_subnets = self.agent_interfaces[agent_name].allowed_subnets
                 subnets = [self.subnet_cidr_map[subnet] for subnet in allowed_subnets]
             else:
                 subnets = list(self.subnet_cidr_map.values())
-
-            obs.filter_addresses(
-                ips=self.hostname_ip_map.values(), cidrs=subnets, include_localhost=False
-            )
-        return obs
+            address_filter = AddressFilter(ips=self.hostname_ip_map.values(), cidrs=subnets, include_localhost=False)
+            self.observation_filters[key] = address_filter
+        return address_filter
 
     def replace_action_if_invalid(self, action: Action, agent: AgentInterface):
         """Returns action if the parameters in the action are in and true in the action set else return InvalidAction imbued with bug report.
@@ -1080,36 +1272,7 @@ class SimulationController(CybORGLogger):
         action : Action
             Action parameter if valid, otherwise InvalidAction
         """
-        action_space = agent.action_space.get_action_space()
-
-        if type(action) not in action_space['action']:
-            message = f'Action {action} not in action space for agent {agent.agent_name}.'
-            return InvalidAction(action=action, error=message)
-
-        if not action_space['action'][type(action)]:
-            message = f'Action {action} is not valid for agent {agent.agent_name} at the moment. This usually means it is trying to access a host it has not discovered yet.'
-            return InvalidAction(action=action, error=message)
-
-        # next for each parameter in the action
-        for parameter_name, parameter_value in action.get_params().items():
-            if parameter_name not in action_space:
-                continue
-            
-            if isinstance(parameter_value, list):
-                for value in parameter_value:
-                    if value not in action_space[parameter_name]:
-                        message = f'Action {action} has parameter {parameter_name} that contains {value}. However, {value} is not in the action space for agent {agent.agent_name}.'
-                        return InvalidAction(action=action, error=message)
-            else:
-                if parameter_value not in action_space[parameter_name]:
-                    message = f'Action {action} has parameter {parameter_name} valued at {parameter_value}. However, {parameter_value} is not in the action space for agent {agent.agent_name}.'
-                    return InvalidAction(action=action, error=message)
-
-                if not action_space[parameter_name][parameter_value]:
-                    message = f'Action {action} has parameter {parameter_name} valued at the invalid value of {parameter_value}. This usually means an agent is trying to utilise information it has not discovered yet such as an ip_address or port number.'
-                    return InvalidAction(action=action, error=message)
-
-        return action
+        return agent.action_space.get_validator().validate(action, agent.agent_name)
 
     def get_reward_breakdown(self, agent:str):
         """Returns host scores from reward calculator """
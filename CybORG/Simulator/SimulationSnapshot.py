@@ -0,0 +1,155 @@
+import copy
+import io
+import pickle
+from typing import Any, List
+
+
+# Positions of the random number generator and the scenario in the list of shared objects.
+NP_RANDOM_INDEX = 0
+SCENARIO_INDEX = 2
+
+# SimulationController attributes that are never part of a snapshot.
+# They are owned by the caller and persist across episodes.
+EXCLUDED_CONTROLLER_ATTRIBUTES = ('scenario_generator', 'scenario_prefetcher', 'np_random', 'agents', 'step_timer',
+                                 'replay_recorder')
+
+# State attributes that are fixed for the lifetime of an episode.
+STATIC_STATE_ATTRIBUTES = (
+    'subnet_name_to_cidr', 'ip_addresses', 'hostname_ip_map', 'hostname_subnet_map',
+    'subnets', 'subnets_cidr_to_name', 'connected_components', 'component_index',
+    'original_time'
+)
+
+# SimulationController attributes that are fixed for the lifetime of an episode, or only cache values that are.
+STATIC_CONTROLLER_ATTRIBUTES = (
+    'INFO_DICT', 'init_state', 'team', 'team_assignments', 'end_turn_actions',
+    'hostname_ip_map', 'subnet_cidr_map', 'observation_filters'
+)
+
+# Host attributes that are only read after the host backup is created at reset.
+STATIC_HOST_ATTRIBUTES = (
+    'original_files', 'original_sessions', 'original_processes', 'original_services',
+    'default_processes', 'info', 'patches'
+)
+
+# Host attributes that only change when wireless data links are recalculated.
+WIRED_HOST_ATTRIBUTES = ('interfaces', 'position')
+
+
+class SimulationSnapshot:
+    """A restorable copy of the complete simulation at one point in time.
+
+    Created by `SimulationController.snapshot` and consumed by `SimulationController.restore`.
+
+    Only the parts of the simulation that can change during an episode are copied. Objects that are fixed
+    for the episode, such as the scenario, address maps, host backups, the link diagram of an all-wired
+    network and the signatures cached by action spaces, are shared between the live simulation, the
+    snapshot and every restored copy. The random number generator is captured by value, so restoring a
+    snapshot replays the same random events.
+
+    The copied attributes are pickled once when the snapshot is taken; restoring unpickles them, which is
+    considerably faster than deep copying the live objects. A snapshot can be restored any number of times.
+
+    Attributes
+    ----------
+    step_count : int
+        The step count at the time of the snapshot.
+    data : bytes
+        Pickled SimulationController attributes.
+    rng_state : dict
+        State of the bit generator used by the simulation.
+    shared : List[Any]
+        Objects shared between the snapshot and the simulation instead of being copied.
+    scenario : Scenario
+        The scenario of the snapshotted episode.
+    """
+
+    def __init__(self, controller):
+        """
+        Parameters
+        ----------
+        controller : SimulationController
+            The controller to capture.
+        """
+        self.step_count = controller.step_count
+        self.scenario = controller.state.scenario
+        self.shared = self._shared_objects(controller)
+        attributes = {
+            name: value for name, value in vars(controller).items()
+            if name not in EXCLUDED_CONTROLLER_ATTRIBUTES
+        }
+        buffer = io.BytesIO()
+        _SnapshotPickler(buffer, self.shared).dump(attributes)
+        self.data = buffer.getvalue()
+        self.rng_state = copy.deepcopy(controller.np_random.bit_generator.state)
+
+    def restore(self, controller):
+        """Overwrites the controller's simulation with a fresh copy of this snapshot.
+
+        Parameters
+        ----------
+        controller : SimulationController
+            The controller to restore into.
+        """
+        # The restored hosts are new objects, so give the restored episode its own view of the scenario.
+        shared = list(self.shared)
+        scenario = copy.copy(self.scenario)
+        shared[SCENARIO_INDEX] = scenario
+        # The snapshot may come from another controller, whose generator the restored objects must not share.
+        shared[NP_RANDOM_INDEX] = controller.np_random
+
+        attributes = _SnapshotUnpickler(io.BytesIO(self.data), shared).load()
+        for name, value in attributes.items():
+            setattr(controller, name, value)
+        scenario.hosts = controller.state.hosts
+
+        controller.np_random.bit_generator.state = copy.deepcopy(self.rng_state)
+
+    @staticmethod
+    def _shared_objects(controller) -> List[Any]:
+        state = controller.state
+        shared = [controller.np_random, controller.scenario_generator, state.scenario]
+
+        shared.extend(getattr(controller, name) for name in STATIC_CONTROLLER_ATTRIBUTES)
+        shared.extend(getattr(state, name) for name in STATIC_STATE_ATTRIBUTES)
+        # IP addresses and networks are immutable and appear throughout observations and processes
+        shared.extend(state.ip_addresses.keys())
+        shared.extend(state.subnet_name_to_cidr.values())
+
+        wired = not state.wireless
+        if wired:
+            shared.append(state.link_diagram)
+        for host in state.hosts.values():
+            shared.extend(getattr(host, name) for name in STATIC_HOST_ATTRIBUTES)
+            if wired:
+                shared.extend(getattr(host, name) for name in WIRED_HOST_ATTRIBUTES)
+
+        for interface in controller.agent_interfaces.values():
+            # inspect signatures cannot be copied and never change
+            shared.append(interface.action_space.action_params)
+            agent_params = getattr(interface.agent, 'action_params', None)
+            if agent_params is not None:
+                shared.append(agent_params)
+        return shared
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """Pickles references to shared objects by their index in the shared list."""
+
+    def __init__(self, file, shared: List[Any]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.shared_ids = {id(obj): i for i, obj in enumerate(shared)}
+
+    def persistent_id(self, obj):
+        return self.shared_ids.get(id(obj))
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """Resolves shared object references written by _SnapshotPickler."""
+
+    def __init__(self, file, shared: List[Any]):
+        super().__init__(file)
+        self.shared = shared
+
+    def persistent_load(self, pid):
+        return self.shared[pid]
@@ -5,7 +5,7 @@ from datetime import datetime
 from gym.utils.seeding import RandomNumberGenerator
 from ipaddress import IPv4Address, IPv4Network
 from math import sqrt
-from typing import Dict, List
+from typing import Dict, List, Set, Tuple
 
 
 import networkx as nx
@@ -16,6 +16,7 @@ from CybORG.Shared.Enums import SessionType
 from CybORG.Shared.Observation import Observation
 from CybORG.Simulator.File import File
 from CybORG.Simulator.Host import Host
+from CybORG.Simulator.StateView import StateView
 from CybORG.Shared.Session import Session
 from CybORG.Simulator.Subnet import Subnet
 
@@ -50,6 +51,14 @@ class State(CybORGLogger):
         NetworkX graph representing which hosts can directly communicate with each other. Used for routing actions between hosts.
     connected_components: List[Set[str]]
         List of sets of hostnames representing hosts that are all connected together. Used to identify which hosts have no route between them.
+    component_index: Dict[str, int]
+        Dictionary mapping hostname to the index of its set in connected_components.
+    wireless: bool
+        Boolean representing whether any host has a wireless interface, meaning the link diagram can change between steps.
+    route_cache: Dict[Tuple[str, str, bool], List[str]]
+        Dictionary mapping (source, target, routing) to the route found by RemoteAction.get_route for the current network version.
+    network_version: int
+        Counter incremented whenever the link diagram or blocks change, invalidating cached routes.
     sessions_count: Dict[str, int]
         Dictionary mapping agent name to the number of sessions it controls across the network.
     mission_phase: int
@@ -62,6 +71,12 @@ class State(CybORGLogger):
         Boolean represeting whether the Operational Server in Scenario 2 has a firewall protecting it. Unused in later scenarios.
     blocks: Dict[str:List[str]]
         Dictionary mapping hostames to a list of hostnames they will block actions from.
+    view: StateView
+        Array view of the state, kept up to date by get_view.
+    changed_hosts: Set[str]
+        Set of hostnames changed since the view was last synchronised.
+    alerted_hosts: Set[str]
+        Set of hostnames with current or past events, maintained by the hosts' HostEvents.
     """
     def __init__(self, scenario: Scenario, np_random: RandomNumberGenerator):
         """Instantiates State class.
@@ -88,6 +103,12 @@ class State(CybORGLogger):
 
         self.link_diagram = None
         self.connected_components = None
+        self.component_index: Dict[str, int] = {}
+        self.wireless = False
+        self.route_cache: Dict[Tuple[str, str, bool], List[str]] = {}
+        self.network_version = 0
+        self.changed_hosts: Set[str] = set()
+        self.alerted_hosts: Set[str] = set()
 
         self.sessions_count = {}  # contains a mapping of agent name to number of sessions
         for subnet_name, subnet in scenario.subnets.items():
@@ -105,6 +126,7 @@ class State(CybORGLogger):
         for hostname in self.hosts:
             for agent in scenario.agents:
                 self.hosts[hostname].sessions[agent] = []
+            self.hosts[hostname].events.watch(hostname, self.alerted_hosts)
 
         for agent, agent_info in scenario.agents.items():
             self.sessions[agent] = {}
@@ -146,6 +168,7 @@ class State(CybORGLogger):
         # hacky fix to enable operational firewall for Scenario1b and Scenario2
         self.operational_firewall = scenario.operational_firewall
         self.blocks: Dict[str, List[str]] = {}
+        self.view = StateView(self)
 
     def get_true_state(self, info: dict) -> Observation:
         """Create's a dictionary containing the requested information from the state.
@@ -236,6 +259,9 @@ class State(CybORGLogger):
                 if interface.interface_type == 'wired':
                     for data_link in interface.data_links:
                         self.link_diagram.add_edge(hostname, data_link)
+        self.wireless = any(interface.interface_type == 'wireless' for host in self.hosts.values() for interface in host.interfaces)
+        self.invalidate_routes()
+        self._update_connected_components()
         self.update_data_links()
 
     def set_np_random(self, np_random):
@@ -273,8 +299,10 @@ class State(CybORGLogger):
         """Updates the links between drones.
 
         Intended for use with DroneSwarmScenarioGenerator. Drones which are too far apart will have their data links dropped. Drones that come into range will establish datalinks.
+        The connected components are only recalculated if a link was added or removed.
         """
-        if any([any([j.interface_type == 'wireless' for j in i.interfaces]) for i in self.hosts.values()]):
+        if self.wireless:
+            version = self.network_version
             distances = {hostname: {hostname: 0.} for hostname in self.hosts.keys()}
             for hostname, host_info in self.hosts.items():
                 for hostname2, host_info2 in self.hosts.items():
@@ -294,13 +322,56 @@ class State(CybORGLogger):
                         for dl in old_data_links:
                             if dl not in interface.data_links:
                                 self.link_diagram.remove_edge(hostname, dl)
+                                self.invalidate_routes()
                             for interface2 in self.hosts[dl].interfaces:
                                 if hostname in interface2.data_links:
                                     interface2.data_links.remove(hostname)
                         for dl in interface.data_links:
                             if dl not in old_data_links:
                                 self.link_diagram.add_edge(hostname, dl)
+                                self.invalidate_routes()
+            if self.network_version != version:
+                self._update_connected_components()
+
+    def _update_connected_components(self):
+        """Recalculates the connected components of the link diagram and the index of each host's component."""
         self.connected_components = list(connected_components(self.link_diagram))
+        self.component_index = {
+            hostname: index for index, component in enumerate(self.connected_components) for hostname in component
+        }
+
+    def invalidate_routes(self):
+        """Discards all cached routes.
+
+        Must be called whenever the link diagram or the blocks are modified, so that RemoteAction.get_route recomputes routes
+        against the new network configuration.
+        """
+        self.network_version += 1
+        self.route_cache.clear()
+
+    def mark_host_changed(self, hostname: str):
+        """Records that the sessions, processes or services of a host changed.
+
+        Must be called by anything modifying them other than the methods of this class, so that get_view updates the
+        host's row of the view.
+
+        Parameters
+        ----------
+        hostname: str
+            The name of the changed host.
+        """
+        self.changed_hosts.add(hostname)
+
+    def get_view(self) -> StateView:
+        """Returns the array view of the state, bringing it up to date first.
+
+        Returns
+        -------
+        view: StateView
+            The synchronised view.
+        """
+        self.view.sync(self, self.changed_hosts)
+        return self.view
 
     def add_session(self, session: Session):
         """Adds a session to the specified host.
@@ -320,6 +391,7 @@ class State(CybORGLogger):
         self.sessions[session.agent][session.ident] = session
         host = self.hosts[session.hostname]
         host.add_session(session)
+        self.changed_hosts.add(session.hostname)
         if session.parent is not None:
             self.sessions[session.agent][session.parent].children[session.ident] = session
         
@@ -403,6 +475,7 @@ class State(CybORGLogger):
             return
         agent, session = self.get_session_from_pid(hostname=hostname, pid=pid)
         host.processes.remove(process)
+        self.changed_hosts.add(hostname)
         pids = [service.process for service in host.services.values() if service.active]
         if process.pid in pids:
             process.pid = None
@@ -445,6 +518,7 @@ class State(CybORGLogger):
     def reboot_host(self, hostname):
         """Unused. Used by deprecated action."""
         host = self.hosts[hostname]
+        self.changed_hosts.add(hostname)
         for agent, sessions in host.sessions.items():
             for session in sessions:
                 self.sessions[agent].pop(session)
@@ -476,6 +550,7 @@ class State(CybORGLogger):
         """
         # stops a service, its process, and associated sessions
         process = self.hosts[hostname].stop_service(service_name)
+        self.changed_hosts.add(hostname)
         self.remove_process(hostname, process)
 
     def start_service(self, hostname: str, service_name: str):
@@ -490,6 +565,7 @@ class State(CybORGLogger):
         """
         # stops a service, its process, and associated sessions
         process, session = self.hosts[hostname].start_service(service_name)
+        self.changed_hosts.add(hostname)
         if session is not None:
             self.add_session(session)
 
@@ -0,0 +1,183 @@
+from typing import Dict, List, Set
+
+import numpy as np
+
+from CybORG.Shared.Enums import DecoyType, ProcessName
+
+# Values of StateView.compromised
+NO_ACCESS = 0
+USER_ACCESS = 1
+PRIVILEGED_ACCESS = 2
+
+
+def _subnet_key(subnet_name) -> str:
+    """Returns the plain string name of a subnet, which may be given as a SUBNET enum."""
+    return getattr(subnet_name, 'value', subnet_name)
+
+
+class StateView:
+    """Struct-of-arrays view of the parts of the State that are read every step.
+
+    Hosts, subnets, teams and services are given fixed indices when the view is created, and each property of the
+    network is held in a numpy array indexed by them. Consumers can then read a handful of arrays instead of walking
+    the hosts, sessions and processes of the State.
+
+    The view is maintained incrementally. Actions that change the sessions, processes or services of a host report it
+    with `State.mark_host_changed`, and `sync` only recomputes the rows of those hosts. The blocked subnet matrix is
+    rebuilt when the State's network version changes, which every change to the blocks must already signal with
+    `State.invalidate_routes`, and event counts are only read for the hosts in `State.alerted_hosts`. Use
+    `State.get_view` to obtain a synchronised view.
+
+    Attributes
+    ----------
+    hostnames : List[str]
+        hostname of each host index, in sorted order
+    host_index : Dict[str, int]
+        index of each hostname
+    subnet_names : List[str]
+        name of each subnet index, in sorted order
+    subnet_index : Dict[str, int]
+        index of each subnet name
+    host_subnet : np.ndarray
+        subnet index of each host, shape (hosts,)
+    teams : List[str]
+        name of each team index
+    agent_team : Dict[str, int]
+        team index of each agent that belongs to a team
+    services : List[ProcessName]
+        service name of each service index
+    service_index : Dict[ProcessName, int]
+        index of each service name
+    compromised : np.ndarray
+        highest access each team has to each host, one of NO_ACCESS, USER_ACCESS and PRIVILEGED_ACCESS,
+        shape (hosts, teams)
+    service_present : np.ndarray
+        whether each host runs each service, shape (hosts, services)
+    service_active : np.ndarray
+        whether each service of each host is active, shape (hosts, services)
+    service_reliability : np.ndarray
+        reliability in percent of each service of each host, 0 where the host has no such service, shape (hosts, services)
+    decoys : np.ndarray
+        number of decoy processes deployed on each host, shape (hosts,)
+    blocked : np.ndarray
+        `blocked[to, from]` is True when traffic from subnet `from` to subnet `to` is blocked, shape (subnets, subnets)
+    process_events : np.ndarray
+        number of pending process creation events on each host, shape (hosts,)
+    connection_events : np.ndarray
+        number of pending network connection events on each host, shape (hosts,)
+    mission_phase : int
+        current mission phase
+    network_version : int
+        network version of the State the blocked matrix was built from
+    """
+
+    def __init__(self, state):
+        """
+        Parameters
+        ----------
+        state : State
+            the state to view, whose hosts, subnets and agents fix the indices of the view
+        """
+        self.hostnames: List[str] = sorted(state.hosts)
+        self.host_index: Dict[str, int] = {hostname: index for index, hostname in enumerate(self.hostnames)}
+        self.subnet_names: List[str] = sorted(_subnet_key(name) for name in state.subnet_name_to_cidr)
+        self.subnet_index: Dict[str, int] = {name: index for index, name in enumerate(self.subnet_names)}
+        self.host_subnet = np.array(
+            [self.subnet_index[_subnet_key(state.hostname_subnet_map[hostname])] for hostname in self.hostnames],
+            dtype=np.int64
+        )
+        self.teams: List[str] = list(state.scenario.team_agents)
+        self.agent_team: Dict[str, int] = {
+            agent: index for index, team in enumerate(self.teams) for agent in state.scenario.team_agents[team]
+        }
+        self.services: List[ProcessName] = list(ProcessName)
+        self.service_index: Dict[ProcessName, int] = {name: index for index, name in enumerate(self.services)}
+
+        num_hosts, num_services = len(self.hostnames), len(self.services)
+        self.compromised = np.zeros((num_hosts, len(self.teams)), dtype=np.int8)
+        self.service_present = np.zeros((num_hosts, num_services), dtype=bool)
+        self.service_active = np.zeros((num_hosts, num_services), dtype=bool)
+        self.service_reliability = np.zeros((num_hosts, num_services), dtype=np.int16)
+        self.decoys = np.zeros(num_hosts, dtype=np.int16)
+        self.blocked = np.zeros((len(self.subnet_names), len(self.subnet_names)), dtype=bool)
+        self.process_events = np.zeros(num_hosts, dtype=np.int32)
+        self.connection_events = np.zeros(num_hosts, dtype=np.int32)
+        self.mission_phase = state.mission_phase
+        self.network_version = state.network_version
+
+        for hostname in self.hostnames:
+            self._update_host(state, hostname)
+        self._update_blocked(state)
+        self._update_events(state)
+
+    def sync(self, state, changed_hosts: Set[str]):
+        """Brings the view up to date with the state.
+
+        Parameters
+        ----------
+        state : State
+            the state the view was created from
+        changed_hosts : Set[str]
+            hosts changed since the last sync, which is emptied
+        """
+        for hostname in changed_hosts:
+            self._update_host(state, hostname)
+        changed_hosts.clear()
+        if self.network_version != state.network_version:
+            self._update_blocked(state)
+        self._update_events(state)
+        self.mission_phase = state.mission_phase
+
+    def _update_host(self, state, hostname: str):
+        """Recomputes the row of a host."""
+        index = self.host_index[hostname]
+        host = state.hosts[hostname]
+
+        self.compromised[index] = NO_ACCESS
+        for agent, session_ids in host.sessions.items():
+            team = self.agent_team.get(agent)
+            if team is None:
+                continue
+            for session_id in session_ids:
+                session = state.sessions[agent].get(session_id)
+                if session is None:
+                    continue
+                level = PRIVILEGED_ACCESS if session.has_privileged_access() else USER_ACCESS
+                if level > self.compromised[index, team]:
+                    self.compromised[index, team] = level
+
+        self.service_present[index] = False
+        self.service_active[index] = False
+        self.service_reliability[index] = 0
+        for name, service in host.services.items():
+            column = self.service_index.get(name)
+            if column is None:
+                continue
+            self.service_present[index, column] = True
+            self.service_active[index, column] = service.active
+            self.service_reliability[index, column] = service.get_service_reliability()
+
+        self.decoys[index] = sum(1 for process in host.processes if process.decoy_type != DecoyType.NONE)
+
+    def _update_blocked(self, state):
+        """Rebuilds the blocked subnet matrix."""
+        self.blocked[:] = False
+        for to_subnet, from_subnets in state.blocks.items():
+            to_index = self.subnet_index.get(_subnet_key(to_subnet))
+            if to_index is None:
+                continue
+            for from_subnet in from_subnets:
+                from_index = self.subnet_index.get(_subnet_key(from_subnet))
+                if from_index is not None:
+                    self.blocked[to_index, from_index] = True
+        self.network_version = state.network_version
+
+    def _update_events(self, state):
+        """Recounts the pending events of the hosts with alerts."""
+        self.process_events[:] = 0
+        self.connection_events[:] = 0
+        for hostname in state.alerted_hosts:
+            index = self.host_index[hostname]
+            events = state.hosts[hostname].events
+            self.process_events[index] = len(events.process_creation)
+            self.connection_events[index] = len(events.network_connections)
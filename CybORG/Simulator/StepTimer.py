@@ -0,0 +1,151 @@
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, List
+
+import numpy as np
+
+# Phases of SimulationController.step that are timed, in the order they run
+PHASES = (
+    'mission_phase',
+    'agent_actions',
+    'action_validation',
+    'action_ordering',
+    'action_execution',
+    'observation_filtering',
+    'agent_reassignment',
+    'end_turn_actions',
+    'interface_updates',
+    'reward_calculation',
+    'host_updates',
+    'data_links',
+    'other',
+)
+(MISSION_PHASE, AGENT_ACTIONS, ACTION_VALIDATION, ACTION_ORDERING, ACTION_EXECUTION, OBSERVATION_FILTERING,
+ AGENT_REASSIGNMENT, END_TURN_ACTIONS, INTERFACE_UPDATES, REWARD_CALCULATION, HOST_UPDATES, DATA_LINKS,
+ OTHER) = range(len(PHASES))
+
+# Upper edges in seconds of the histogram bins, doubling from 1 microsecond to about 17 seconds. Durations beyond the
+# last edge fall in an extra final bin.
+BIN_EDGES = 1e-6 * 2.0 ** np.arange(25)
+_BIN_EDGES = BIN_EDGES.tolist()
+
+
+class StepTimer:
+    """Times the phases of each simulation step.
+
+    The controller marks the end of each phase with `lap`, which adds the time since the previous mark to the phase, so
+    timing costs one clock read per phase. Executed actions are also timed by class with `lap_action`. Phase times are
+    summed over each step and gathered in log-spaced histograms of per-step durations, while action times are gathered
+    per execution.
+
+    Attributes
+    ----------
+    enabled : bool
+        whether steps are timed, by default False
+    steps : int
+        number of steps timed
+    totals : np.ndarray
+        total time in seconds spent in each phase, shape (phases,)
+    histograms : np.ndarray
+        number of steps whose time in each phase fell in each bin of BIN_EDGES, shape (phases, bins + 1)
+    action_totals : Dict[str, float]
+        total time in seconds spent executing each action class
+    action_counts : Dict[str, int]
+        number of executions of each action class
+    action_histograms : Dict[str, List[int]]
+        number of executions of each action class whose duration fell in each bin of BIN_EDGES
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        """Discards the gathered timings."""
+        self.steps = 0
+        self.totals = np.zeros(len(PHASES))
+        self.histograms = np.zeros((len(PHASES), len(BIN_EDGES) + 1), dtype=np.int64)
+        self.action_totals: Dict[str, float] = {}
+        self.action_counts: Dict[str, int] = {}
+        self.action_histograms: Dict[str, List[int]] = {}
+        # plain lists keep the per-lap cost to a few bytecodes
+        self._step = [0.0] * len(PHASES)
+        self._last = None
+
+    def start(self):
+        """Starts timing a step."""
+        self._step = [0.0] * len(PHASES)
+        self._last = perf_counter()
+
+    def lap(self, phase: int):
+        """Adds the time since the previous mark to a phase.
+
+        Parameters
+        ----------
+        phase : int
+            index of the phase in PHASES
+        """
+        now = perf_counter()
+        self._step[phase] += now - self._last
+        self._last = now
+
+    def lap_action(self, action):
+        """Adds the time since the previous mark to the execution of an action.
+
+        Parameters
+        ----------
+        action : Action
+            the action that was executed
+        """
+        now = perf_counter()
+        duration = now - self._last
+        self._last = now
+        self._step[ACTION_EXECUTION] += duration
+
+        name = type(action).__name__
+        bins = self.action_histograms.get(name)
+        if bins is None:
+            bins = self.action_histograms[name] = [0] * (len(BIN_EDGES) + 1)
+            self.action_totals[name] = 0.0
+            self.action_counts[name] = 0
+        bins[bisect_left(_BIN_EDGES, duration)] += 1
+        self.action_totals[name] += duration
+        self.action_counts[name] += 1
+
+    def stop(self):
+        """Finishes timing a step, attributing the time since the last mark to the other phase."""
+        self.lap(OTHER)
+        self.steps += 1
+        step = np.array(self._step)
+        self.totals += step
+        self.histograms[np.arange(len(PHASES)), np.searchsorted(BIN_EDGES, step)] += 1
+
+    def get_stats(self) -> dict:
+        """Gets the gathered timings.
+
+        Returns
+        -------
+        stats : dict
+            'steps' timed, 'bin_edges' of the histograms in seconds, and for each of the 'phases' and executed 'actions'
+            its 'total' and 'mean' time in seconds and its 'histogram' of counts. Phase means and histograms are per
+            step and action means and histograms are per execution, which 'actions' also 'count'.
+        """
+        steps = max(self.steps, 1)
+        phases = {
+            phase: {
+                'total': float(self.totals[index]),
+                'mean': float(self.totals[index]) / steps,
+                'histogram': self.histograms[index].tolist(),
+            }
+            for index, phase in enumerate(PHASES)
+        }
+        actions = {
+            name: {
+                'total': self.action_totals[name],
+                'count': self.action_counts[name],
+                'mean': self.action_totals[name] / self.action_counts[name],
+                'histogram': list(self.action_histograms[name]),
+            }
+            for name in sorted(self.action_totals)
+        }
+        return {'steps': self.steps, 'bin_edges': BIN_EDGES.tolist(), 'phases': phases, 'actions': actions}
@@ -0,0 +1,157 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from CybORG import CybORG
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
+from CybORG.Agents import SleepAgent, EnterpriseGreenAgent, FiniteStateRedAgent, cc4BlueRandomAgent
+from CybORG.Shared.ActionSpace import ActionSpace, ObservationValues, INDEXED_PARAMETERS, MAX_PENDING_UPDATES
+from CybORG.Simulator.Actions import Analyse
+from CybORG.Simulator.Actions.Action import InvalidAction
+from CybORG.Simulator.Actions.GreenActions import GreenAccessService
+from CybORG.Simulator.Actions.ConcreteActions.ControlTraffic import BlockTrafficZone
+
+
+@pytest.fixture(scope="module")
+def cyborg():
+    sg = EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=SleepAgent, red_agent_class=SleepAgent, steps=10)
+    cyborg = CybORG(scenario_generator=sg, seed=100)
+    cyborg.reset()
+    return cyborg
+
+
+@pytest.mark.parametrize("agent", ["blue_agent_0", "red_agent_0", "green_agent_0"])
+def test_update_with_observation_values(cyborg, agent):
+    controller = cyborg.environment_controller
+    interface = controller.agent_interfaces[agent]
+    initial_obs = controller.get_last_observation(agent).data
+
+    expected = ActionSpace(interface.actions, agent, interface.allowed_subnets)
+    expected.update(controller.init_state, known=False)
+    expected.update(initial_obs, known=True)
+
+    action_space = ActionSpace(interface.actions, agent, interface.allowed_subnets)
+    action_space.update(ObservationValues(controller.init_state), known=False)
+    action_space.update(ObservationValues(initial_obs), known=True)
+
+    assert repr(action_space.get_action_space()) == repr(expected.get_action_space())
+    assert repr(interface.action_space.get_action_space()) == repr(expected.get_action_space())
+
+
+def test_validator_follows_action_space():
+    sg = EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=SleepAgent, red_agent_class=SleepAgent, steps=10)
+    cyborg = CybORG(scenario_generator=sg, seed=100)
+    controller = cyborg.environment_controller
+    interface = controller.agent_interfaces['blue_agent_0']
+    action_space = interface.action_space
+    validator = action_space.get_validator()
+    hostname = 'restricted_zone_a_subnet_server_host_0'
+
+    action = Analyse(session=0, agent='blue_agent_0', hostname=hostname)
+    assert controller.replace_action_if_invalid(action, interface) is action
+
+    action = GreenAccessService('blue_agent_0', 0, None, [], 0.0)
+    invalid = controller.replace_action_if_invalid(action, interface)
+    assert isinstance(invalid, InvalidAction)
+    assert invalid.error == f'Action {action} not in action space for agent blue_agent_0.'
+
+    # values added by update are seen without rebuilding the validator
+    action = Analyse(session=0, agent='blue_agent_0', hostname='unknown_host')
+    invalid = controller.replace_action_if_invalid(action, interface)
+    assert invalid.error == (f'Action {action} has parameter hostname valued at unknown_host. However, unknown_host is '
+                             'not in the action space for agent blue_agent_0.')
+    action_space.update({'unknown_host': {'System info': {'Hostname': 'unknown_host'}}}, known=False)
+    assert action_space.get_validator() is validator
+    invalid = controller.replace_action_if_invalid(action, interface)
+    assert 'invalid value of unknown_host' in invalid.error
+    action_space.hostname['unknown_host'] = True
+    assert controller.replace_action_if_invalid(action, interface) is action
+
+    # replacing the mappings rebuilds the validator
+    interface.update_allowed_subnets(['restricted_zone_a_subnet'])
+    assert action_space.get_validator() is not validator
+    validator = action_space.get_validator()
+    action_space.reset('blue_agent_0')
+    assert action_space.get_validator() is not validator
+    assert isinstance(controller.replace_action_if_invalid(action, interface), InvalidAction)
+
+    action_space.actions[Analyse] = False
+    assert 'not valid for agent blue_agent_0 at the moment' in controller.replace_action_if_invalid(action, interface).error
+
+
+def assert_index_matches_mappings(action_space):
+    space = action_space.get_action_space()
+    for param, table_name in INDEXED_PARAMETERS.items():
+        values = action_space.get_parameter_values(param)
+        # queued updates are applied when the index is first read
+        table = action_space.parameter_tables[table_name]
+        valid = [value for value in table.values if space[param].get(value)]
+        assert values == valid, param
+        mask = action_space.get_parameter_mask(param)
+        assert mask.shape == (len(table),)
+        assert [table.values[i] for i in np.flatnonzero(mask)] == valid
+        assert set(space[param]) <= set(table.values)
+
+
+def test_index_follows_updates():
+    sg = EnterpriseScenarioGenerator(blue_agent_class=cc4BlueRandomAgent, green_agent_class=EnterpriseGreenAgent,
+                                     red_agent_class=FiniteStateRedAgent, steps=60)
+    cyborg = CybORG(scenario_generator=sg, seed=21)
+    controller = cyborg.environment_controller
+    interfaces = controller.agent_interfaces
+    tables = interfaces['blue_agent_0'].action_space.parameter_tables
+    assert all(interface.action_space.parameter_tables is tables for interface in interfaces.values())
+
+    for step in range(60):
+        cyborg.step()
+        if step % 20 == 19:
+            for interface in interfaces.values():
+                assert_index_matches_mappings(interface.action_space)
+
+    red_space = interfaces['red_agent_0'].action_space
+    hostnames = red_space.get_parameter_values('hostname')
+    red_space.reset('red_agent_0')
+    # reset keeps the hostnames, like the mappings
+    assert red_space.get_parameter_values('hostname') == hostnames
+    assert_index_matches_mappings(red_space)
+    assert red_space.get_parameter_values('agent') == ['red_agent_0']
+
+    cyborg.reset()
+    assert controller.agent_interfaces['blue_agent_0'].action_space.parameter_tables is not tables
+
+
+def test_pending_updates_stay_bounded():
+    # none of these agents reads masks, so only the bound keeps the queues short
+    sg = EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=EnterpriseGreenAgent,
+                                     red_agent_class=FiniteStateRedAgent, steps=300)
+    cyborg = CybORG(scenario_generator=sg, seed=5)
+    cyborg.reset()
+    interfaces = cyborg.environment_controller.agent_interfaces
+    sizes = []
+    for step in range(300):
+        cyborg.step()
+        assert max(len(interface.action_space._pending) for interface in interfaces.values()) <= MAX_PENDING_UPDATES
+        if step % 100 == 99:
+            sizes.append(len(cyborg.snapshot().data))
+            assert all(not interface.action_space._pending for interface in interfaces.values())
+    assert sizes[-1] < 1.5 * sizes[0]
+
+
+def test_action_masks_and_combinations(cyborg):
+    action_space = cyborg.environment_controller.agent_interfaces['blue_agent_0'].action_space
+    space = action_space.get_action_space()
+
+    assert action_space.get_action_mask().tolist() == list(action_space.actions.values())
+    assert action_space.get_max_actions(Analyse) == len(space['session']) * len(space['agent']) * len(space['hostname'])
+
+    combinations = action_space.get_valid_parameters(Analyse)
+    params = list(action_space.action_params[Analyse])
+    assert combinations.shape[1] == len(params)
+    tables = [action_space.parameter_tables[INDEXED_PARAMETERS[param]].values for param in params]
+    decoded = {tuple(table[i] for table, i in zip(tables, row)) for row in combinations}
+    expected = set(itertools.product(*(action_space.get_parameter_values(param) for param in params)))
+    assert decoded == expected
+    assert len(decoded) > 0
+    with pytest.raises(NotImplementedError):
+        action_space.get_valid_parameters(BlockTrafficZone)
@@ -157,6 +157,17 @@ def test_BlueEnterpriseWrapper_step_obs_type(step_obs):
 def test_BlueEnterpriseWrapper_step_obs_length(step_obs, blue_agent):
     assert len(step_obs) == LONG_ENDPOINT if blue_agent==HQ_AGENT else MESSAGE_SLICE.stop
 
+def test_BlueEnterpriseWrapper_step_obs_in_space(step_obs, cyborg, blue_agent):
+    assert step_obs.dtype == np.int8
+    assert cyborg.observation_space(blue_agent).contains(step_obs)
+
+def test_BlueEnterpriseWrapper_obs_not_reused(cyborg, blue_agent):
+    first = cyborg.step()[0][blue_agent]
+    expected = first.copy()
+    second = cyborg.step()[0][blue_agent]
+    assert second is not first
+    assert (first == expected).all()
+
 @pytest.fixture
 def reward(step_results, blue_agent):
     return step_results[1][blue_agent]
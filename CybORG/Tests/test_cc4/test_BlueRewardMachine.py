@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 
 from CybORG.Simulator.Actions.Action import InvalidAction
@@ -9,7 +10,10 @@ from CybORG.Simulator.Actions.GreenActions.GreenLocalWork import GreenLocalWork
 from CybORG.Simulator.Actions.GreenActions.GreenAccessService import GreenAccessService
 from CybORG import CybORG
 from CybORG.Simulator.Actions.ConcreteActions.ControlTraffic import BlockTrafficZone
-from CybORG.Shared.BlueRewardMachine import BlueRewardMachine
+from CybORG.Shared.BlueRewardMachine import (
+    BlueRewardMachine, PHASE_REWARDS, SUBNETS, EVENT_TYPES, NO_EVENT, team_reward
+)
+from CybORG.Agents import EnterpriseGreenAgent, FiniteStateRedAgent, cc4BlueRandomAgent
 from CybORG.Simulator.Service import Service
 
 ALL_SUBNETS = [
@@ -156,4 +160,65 @@ def test_Score_GreenAccessService(green_subnet, mission_phase):
     intended_reward = brm.get_phase_rewards(env.state.mission_phase)[green_subnet]['ASF']
 
     # Check the reward was correct
-    assert intended_reward == reward['blue_agent_0']['BlueRewardMachine']
\ No newline at end of file
+    assert intended_reward == reward['blue_agent_0']['BlueRewardMachine']
+
+
+def test_team_reward_matches_phase_rewards():
+    for phase, rewards in PHASE_REWARDS.items():
+        for subnet_index, subnet in enumerate(SUBNETS):
+            for event_index, event in enumerate(EVENT_TYPES):
+                assert team_reward(phase, [subnet_index], [event_index]) == rewards[subnet][event]
+            assert team_reward(phase, [subnet_index], [NO_EVENT]) == 0
+
+    # a batch of three environments, padded to two events each
+    phases = np.array([0, 1, 2])
+    subnets = np.array([[0, 3], [5, 5], [7, 0]])
+    events = np.array([[2, 1], [0, 2], [0, NO_EVENT]])
+    expected = [
+        sum(PHASE_REWARDS[phase][SUBNETS[s]][EVENT_TYPES[e]] for s, e in zip(row_s, row_e) if e != NO_EVENT)
+        for phase, row_s, row_e in zip(phases, subnets, events)
+    ]
+    assert team_reward(phases, subnets, events).tolist() == expected == [-8, -20, -10]
+
+
+def test_overridden_phase_rewards_are_scored(monkeypatch):
+    class DoubleRewards(BlueRewardMachine):
+        def get_phase_rewards(self, cur_mission_phase):
+            rewards = super().get_phase_rewards(cur_mission_phase)
+            return {subnet: {event: 2 * r for event, r in values.items()} for subnet, values in rewards.items()}
+
+    brm = DoubleRewards('blue_agent_0')
+    subnet = SUBNETS.index('operational_zone_a_subnet')
+    events = ([subnet, subnet], [EVENT_TYPES.index('LWF'), EVENT_TYPES.index('RIA')])
+    monkeypatch.setattr(brm, 'get_events', lambda *args: events)
+
+    class PhaseOne:
+        mission_phase = 1
+    assert brm.calculate_reward(None, {}, {}, False, PhaseOne()) == -40
+    assert team_reward(1, *events) == -20
+
+
+def test_phase_rewards_are_copies():
+    brm = BlueRewardMachine('blue_agent_0')
+    rewards = brm.get_phase_rewards(0)
+    rewards['admin_network_subnet']['RIA'] = 100
+    assert PHASE_REWARDS[0]['admin_network_subnet']['RIA'] == -3
+    assert brm.get_phase_rewards(0)['admin_network_subnet']['RIA'] == -3
+
+
+def test_active_flag_matches_sessions():
+    esg = EnterpriseScenarioGenerator(
+        blue_agent_class=cc4BlueRandomAgent, green_agent_class=EnterpriseGreenAgent, red_agent_class=FiniteStateRedAgent,
+        steps=100
+    )
+    cyborg = CybORG(scenario_generator=esg, seed=7)
+    env = cyborg.environment_controller
+    brm = BlueRewardMachine('Blue')
+    total = 0
+    for _ in range(100):
+        cyborg.step()
+        reward = env.reward['Blue']['BlueRewardMachine']
+        assert reward == brm.calculate_reward(None, env.action, env.observation, env.done, env.state)
+        total += reward
+    assert total < 0
+
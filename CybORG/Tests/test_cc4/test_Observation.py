@@ -6,7 +6,7 @@ import numpy as np
 from CybORG.Shared.Enums import TernaryEnum, ProcessName, ProcessType, ProcessVersion, AppProtocol, OperatingSystemType, \
     OperatingSystemVersion, OperatingSystemDistribution, Architecture, SessionType, Path, ProcessState, \
     FileType, Vulnerability, Vendor, FileExt, BuiltInGroups, PasswordHashType
-from CybORG.Shared.Observation import Observation
+from CybORG.Shared.Observation import AddressFilter, Observation
 
 import pytest
 
@@ -504,3 +504,29 @@ def test_repeat_adding_interface_info(create_observation):
     observation.add_interface_info(hostid="test", ip_address="127.0.0.1")
     observation.add_interface_info(hostid="test", ip_address="127.0.0.1")
     assert len(observation.get_dict()["test"]["Interface"]) == 1
+
+
+def test_filter_addresses_with_address_filter():
+    allowed_ip = IPv4Address('10.0.0.1')
+    other_ip = IPv4Address('10.0.1.1')
+    allowed_subnet = IPv4Network('10.0.0.0/24')
+    other_subnet = IPv4Network('10.0.1.0/24')
+
+    def make_observation() -> Observation:
+        observation = Observation()
+        observation.add_interface_info(hostid="kept", ip_address=allowed_ip, subnet=allowed_subnet)
+        observation.add_process(hostid="kept", pid=1, local_address=allowed_ip, remote_address=allowed_ip, local_port=22)
+        observation.add_process(hostid="kept", pid=2, local_address=allowed_ip, remote_address=other_ip, local_port=22)
+        observation.add_interface_info(hostid="removed", ip_address=other_ip, subnet=other_subnet)
+        return observation
+
+    address_filter = AddressFilter(ips=[allowed_ip], cidrs=[allowed_subnet], include_localhost=False)
+    observation = make_observation()
+    observation.filter_addresses_with(address_filter)
+    expected = make_observation()
+    expected.filter_addresses(ips=[allowed_ip], cidrs=[allowed_subnet], include_localhost=False)
+
+    assert str(observation) == str(expected)
+    assert "removed" not in observation.data
+    assert [proc["PID"] for proc in observation.data["kept"]["Processes"]] == [1]
+    assert len(observation.data["kept"]["Interface"]) == 1
@@ -0,0 +1,32 @@
+from CybORG import CybORG
+from CybORG.Agents import EnterpriseGreenAgent, FiniteStateRedAgent, cc4BlueRandomAgent
+from CybORG.Shared.RewardCalculator import EmptyRewardCalculator, RewardCalculator
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
+
+
+def run_episode(seed, steps=60):
+    sg = EnterpriseScenarioGenerator(blue_agent_class=cc4BlueRandomAgent, green_agent_class=EnterpriseGreenAgent,
+                                     red_agent_class=FiniteStateRedAgent, steps=steps)
+    cyborg = CybORG(scenario_generator=sg, seed=seed)
+    cyborg.reset()
+    history = []
+    for _ in range(steps):
+        cyborg.step()
+        history.append((
+            {team: dict(rewards) for team, rewards in cyborg.get_rewards().items()},
+            {agent: str(cyborg.get_last_action(agent)) for agent in cyborg.agents},
+        ))
+    return cyborg, history
+
+
+def test_empty_rewards_skip_true_state(monkeypatch):
+    cyborg, history = run_episode(4)
+    calculators = cyborg.environment_controller.team_reward_calculators
+    empty = [name for name, team in calculators.items() if all(isinstance(c, EmptyRewardCalculator) for c in team.values())]
+    assert empty
+    assert all(rewards[team][name] == 0. for rewards, _ in history for team in empty for name in calculators[team])
+
+    # the base method builds and filters the true state before scoring it
+    monkeypatch.setattr(EmptyRewardCalculator, 'calculate_simulation_reward', RewardCalculator.calculate_simulation_reward)
+    _, expected = run_episode(4)
+    assert history == expected
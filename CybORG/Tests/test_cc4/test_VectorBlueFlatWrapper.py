@@ -0,0 +1,86 @@
+import pytest
+
+import numpy as np
+
+from CybORG import CybORG
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
+from CybORG.Agents import SleepAgent
+from CybORG.Agents.Wrappers import BlueFlatWrapper, VectorBlueFlatWrapper, SubprocVectorBlueFlatWrapper
+
+NUM_ENVS = 2
+NUM_AGENTS = 5
+EPISODE_LENGTH = 3
+
+
+def make_env(index: int):
+    sg = EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=SleepAgent, red_agent_class=SleepAgent, steps=EPISODE_LENGTH)
+    cyborg = CybORG(scenario_generator=sg, seed=100 + index)
+    return BlueFlatWrapper(cyborg, pad_spaces=True)
+
+
+@pytest.fixture
+def vector_env():
+    env = VectorBlueFlatWrapper(NUM_ENVS, env_fn=make_env)
+    env.reset(seed=100)
+    return env
+
+
+def test_vector_reset_shapes(vector_env):
+    obs, info = vector_env.reset(seed=100)
+    assert obs.shape == (NUM_ENVS, NUM_AGENTS, vector_env.obs_dim)
+    assert info["action_mask"].shape == (NUM_ENVS, NUM_AGENTS, vector_env.num_actions)
+    assert info["action_mask"].dtype == bool
+
+
+def test_vector_matches_single_env(vector_env):
+    single = make_env(0)
+    single_obs, _ = single.reset(seed=100)
+    obs, _ = vector_env.reset(seed=100)
+    for j, agent in enumerate(vector_env.possible_agents):
+        assert np.array_equal(obs[0, j], single_obs[agent])
+
+    actions = np.zeros((NUM_ENVS, NUM_AGENTS), dtype=np.int64)
+    obs, rew, term, trunc, info = vector_env.step(actions)
+    single_obs, single_rew, _, _, _ = single.step({a: 0 for a in single.agents})
+    for j, agent in enumerate(vector_env.possible_agents):
+        assert np.array_equal(obs[0, j], single_obs[agent])
+        assert rew[0, j] == single_rew[agent]
+
+
+def test_vector_autoreset(vector_env):
+    actions = np.zeros((NUM_ENVS, NUM_AGENTS), dtype=np.int64)
+    for _ in range(EPISODE_LENGTH - 2):
+        _, _, _, trunc, info = vector_env.step(actions)
+        assert not info["episode_ended"].any()
+    _, _, _, trunc, info = vector_env.step(actions)
+    assert info["episode_ended"].all()
+    assert trunc.all()
+    for env in vector_env.envs:
+        assert env.env.environment_controller.step_count == 0
+
+
+def test_vector_rejects_bad_action_shape(vector_env):
+    with pytest.raises(ValueError):
+        vector_env.step(np.zeros((NUM_ENVS + 1, NUM_AGENTS), dtype=np.int64))
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_subproc_matches_vector(vector_env, num_workers):
+    subproc_env = SubprocVectorBlueFlatWrapper(NUM_ENVS, env_fn=make_env, num_workers=num_workers)
+    try:
+        obs, info = vector_env.reset(seed=100)
+        sub_obs, sub_info = subproc_env.reset(seed=100)
+        assert np.array_equal(obs, sub_obs)
+        assert np.array_equal(info["action_mask"], sub_info["action_mask"])
+
+        actions = np.zeros((NUM_ENVS, NUM_AGENTS), dtype=np.int64)
+        for _ in range(EPISODE_LENGTH):
+            expected = vector_env.step(actions)
+            subproc_env.step_async(actions)
+            result = subproc_env.step_wait()
+            for e, r in zip(expected[:4], result[:4]):
+                assert np.array_equal(e, r)
+            for key in ("action_mask", "episode_ended", "final_observation"):
+                assert np.array_equal(expected[4][key], result[4][key])
+    finally:
+        subproc_env.close()
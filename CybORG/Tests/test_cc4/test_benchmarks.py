@@ -0,0 +1,55 @@
+import copy
+
+import pytest
+
+from CybORG.Benchmarks import SCENARIOS, run_benchmarks, compare_reports, load_report, save_report
+
+
+@pytest.fixture(scope="module")
+def report():
+    return run_benchmarks(episodes=1, steps=10, resets=2, envs=1)
+
+
+def test_report_covers_scenarios(report, tmp_path):
+    assert list(report["scenarios"]) == list(SCENARIOS)
+    for name in ("sleep_blue", "blue_flat_wrapper", "enterprise_mae"):
+        results = report["scenarios"][name]
+        assert results["steps"] == 9
+        assert results["steps_per_sec"] > 0
+        assert 0 < results["p50_ms"] <= results["p99_ms"]
+    assert report["scenarios"]["resets"]["resets_per_sec"] > 0
+    assert report["scenarios"]["memory"]["bytes_per_env"] > 0
+
+    path = str(tmp_path / "report.json")
+    save_report(report, path)
+    assert load_report(path) == report
+
+
+def test_compare_flags_regressions(report):
+    baseline = copy.deepcopy(report)
+    assert not any(comparison["regressed"] for comparison in compare_reports(report, baseline))
+
+    baseline["scenarios"]["sleep_blue"]["steps_per_sec"] *= 2
+    baseline["scenarios"]["resets"]["resets_per_sec"] *= 1.05
+    del baseline["scenarios"]["enterprise_mae"]
+    comparisons = compare_reports(report, baseline, threshold=0.1)
+    assert {(c["scenario"], c["metric"]) for c in comparisons} == {
+        ("sleep_blue", "steps_per_sec"), ("blue_flat_wrapper", "steps_per_sec"), ("resets", "resets_per_sec")
+    }
+    assert [c["scenario"] for c in comparisons if c["regressed"]] == ["sleep_blue"]
+
+
+def test_compare_zero_or_missing_baseline(report):
+    baseline = copy.deepcopy(report)
+    baseline["scenarios"]["sleep_blue"]["steps_per_sec"] = 0
+    del baseline["scenarios"]["resets"]["resets_per_sec"]
+    comparisons = {(c["scenario"], c["metric"]): c for c in compare_reports(report, baseline)}
+    assert ("resets", "resets_per_sec") not in comparisons
+    zero = comparisons[("sleep_blue", "steps_per_sec")]
+    assert zero["ratio"] is None and not zero["regressed"]
+    assert comparisons[("blue_flat_wrapper", "steps_per_sec")]["ratio"] == 1
+
+
+def test_unknown_scenario():
+    with pytest.raises(ValueError):
+        run_benchmarks(["fastest"])
@@ -158,6 +158,24 @@ def test_Restore(cyborg_with_root_shell_on_cns0):
     assert red_agent_name[1] not in obs.keys()
     assert red_agent_name[1] not in cyborg.active_agents
 
+def test_Restore_resets_processes(cyborg_with_root_shell_on_cns0):
+    cyborg = cyborg_with_root_shell_on_cns0
+    host = cyborg.environment_controller.state.hosts[target_host]
+    original_processes = [process.get_state() for process in host.original_processes]
+
+    action = DeployDecoy(session=0, agent=blue_agent_name, hostname=target_host)
+    action.duration = 1
+    cyborg.parallel_step(actions={blue_agent_name: action})
+    assert len(host.processes) == len(original_processes) + 1
+
+    action = Restore(session=0, agent=blue_agent_name, hostname=target_host)
+    action.duration = 1
+    cyborg.parallel_step(actions={blue_agent_name: action})
+
+    assert [process.get_state() for process in host.processes] == original_processes
+    assert not set(map(id, host.processes)) & set(map(id, host.original_processes))
+    assert [process.get_state() for process in host.original_processes] == original_processes
+
 def test_Remove(cyborg_with_root_shell_on_cns0):
     cyborg = get_shell_on_rzas0(cyborg=cyborg_with_root_shell_on_cns0, shell_type='user')
     env = cyborg.environment_controller
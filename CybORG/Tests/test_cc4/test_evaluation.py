@@ -0,0 +1,96 @@
+import json
+
+import numpy as np
+import pytest
+
+from CybORG.Agents import BaseAgent
+from CybORG.Agents.Wrappers import EnterpriseMAE
+from CybORG.Evaluation import evaluation
+from CybORG.Evaluation.episode_log import EpisodeLogWriter, encode_episode, read_episode_log
+from CybORG.Evaluation.evaluation import episode_seeds, run_evaluation
+from CybORG.Simulator.Actions import Sleep
+
+
+class RandomBlueAgent(BaseAgent):
+    """Sleeps on the first step of each episode, so its results depend on end_episode being called."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.steps = 0
+
+    def get_action(self, observation, action_space):
+        self.steps += 1
+        if self.steps == 1:
+            return 0
+        return int(self.np_random.integers(action_space.n))
+
+    def end_episode(self):
+        self.steps = 0
+
+
+class RandomSubmission:
+    NAME = "random"
+    TEAM = "test"
+    TECHNIQUE = "random actions"
+    AGENTS = {f"blue_agent_{agent}": RandomBlueAgent(f"blue_agent_{agent}") for agent in range(5)}
+
+    def wrap(env):
+        return EnterpriseMAE(env)
+
+
+def read_results(path):
+    with open(path / "summary.json") as f:
+        summary = json.load(f)
+    # only the wall-clock times may differ
+    del summary["time"]
+    logs = {name: (path / name).read_bytes() for name in ("scores.txt", "summary.txt", "episodes.jsonl.gz")}
+    return summary, logs
+
+
+def test_episode_seeds():
+    seeds = episode_seeds(5, 4)
+    assert len(set(seeds)) == 4
+    assert episode_seeds(5, 4) == seeds
+    assert episode_seeds(5, 6)[:4] == seeds
+    assert episode_seeds(6, 4) != seeds
+
+
+def test_results_do_not_depend_on_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(evaluation, "EPISODE_LENGTH", 15)
+    results = []
+    for workers in (1, 2, 3):
+        path = tmp_path / str(workers)
+        path.mkdir()
+        run_evaluation(RandomSubmission, str(path), max_eps=4, seed=7, workers=workers)
+        results.append(read_results(path))
+
+    assert results[0] == results[1] == results[2]
+    assert results[0][0]["parameters"]["max_episodes"] == 4
+
+    episodes = list(read_episode_log(str(tmp_path / "1" / "episodes.jsonl.gz")))
+    assert [episode["episode"] for episode in episodes] == [0, 1, 2, 3]
+    assert [episode["seeds"] for episode in episodes] == [list(seeds) for seeds in episode_seeds(7, 4)]
+    assert results[0][0]["reward"]["mean"] == pytest.approx(sum(e["total_reward"] for e in episodes) / 4)
+    step = episodes[0]["steps"][0]
+    assert step["actions"]["blue_agent_0"][0]["__action__"]
+    assert step["observations"]["blue_agent_0"].dtype == np.int8
+
+
+def test_episode_log_round_trip(tmp_path):
+    observations = [{"blue_agent_0": np.arange(6, dtype=np.int8).reshape(2, 3), "phase": np.int64(2)}]
+    actions = [{"blue_agent_0": [Sleep()]}]
+    path = str(tmp_path / "episodes.jsonl.gz")
+    with EpisodeLogWriter(path) as log:
+        log.write(encode_episode(0, (1, 2), -3.5, actions, observations))
+        log.write(encode_episode(1, (3, 4), 0, [], []))
+
+    first, second = read_episode_log(path)
+    assert first["total_reward"] == -3.5 and first["seeds"] == [1, 2]
+    observation = first["steps"][0]["observations"]["blue_agent_0"]
+    assert observation.dtype == np.int8
+    assert np.array_equal(observation, observations[0]["blue_agent_0"])
+    assert first["steps"][0]["observations"]["phase"] == 2
+    assert first["steps"][0]["actions"]["blue_agent_0"] == [
+        {"__action__": "Sleep", "params": {"name": "Sleep", "priority": 99, "duration": 1, "logs": []}}
+    ]
+    assert second == {"episode": 1, "seeds": [3, 4], "total_reward": 0, "steps": []}
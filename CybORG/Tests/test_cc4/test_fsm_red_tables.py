@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from CybORG import CybORG
+from CybORG.Agents import EnterpriseGreenAgent, FiniteStateRedAgent, cc4BlueRandomAgent
+from CybORG.Agents.SimpleAgents.FSMRedVariants import DiscoveryFSRed
+from CybORG.Agents.SimpleAgents.FiniteStateRedAgent import HOST_STATES, NO_TRANSITION, STATE_INDEX
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
+
+
+@pytest.mark.parametrize('agent_class', [FiniteStateRedAgent, DiscoveryFSRed])
+def test_tables_match_matrices(agent_class):
+    agent = agent_class(name='red_agent_0')
+    matrices = (
+        (agent.success_table, agent.state_transitions_success),
+        (agent.failure_table, agent.state_transitions_failure),
+    )
+    for table, matrix in matrices:
+        for state, row in matrix.items():
+            expected = [NO_TRANSITION if s is None else STATE_INDEX[s] for s in row]
+            assert table[STATE_INDEX[state]].tolist() == expected
+
+    for state, row in agent.state_transitions_probability.items():
+        expected = [np.nan if p is None else p for p in row]
+        np.testing.assert_array_equal(agent.probability_table[STATE_INDEX[state]], expected)
+    assert np.isnan(agent.probability_table[STATE_INDEX['F']]).all()
+
+    if agent.host_states_priority_list is None:
+        assert agent.state_priorities is None
+    else:
+        assert agent.state_priorities.tolist() == [agent.host_states_priority_list.get(s, 0) for s in HOST_STATES]
+
+
+def test_unknown_state_rejected():
+    class UnknownState(FiniteStateRedAgent):
+        def state_transitions_probability(self):
+            return {'KS': [1.0] + [None] * 8}
+
+    with pytest.raises(ValueError):
+        UnknownState(name='red_agent_0')
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_sample_matches_generator_choice(seed):
+    agent = FiniteStateRedAgent(name='red_agent_0', np_random=np.random.default_rng(seed))
+    probabilities = np.array([0.25, 0.0, 0.25, 0.5])
+    expected = np.random.default_rng(seed)
+    for _ in range(10):
+        assert agent._sample_index(probabilities) == expected.choice(len(probabilities), p=probabilities)
+    assert agent.np_random.random() == expected.random()
+
+
+@pytest.mark.parametrize('agent_class', [FiniteStateRedAgent, DiscoveryFSRed])
+def test_host_states_view(agent_class):
+    sg = EnterpriseScenarioGenerator(blue_agent_class=cc4BlueRandomAgent, green_agent_class=EnterpriseGreenAgent,
+                                     red_agent_class=agent_class, steps=100)
+    cyborg = CybORG(scenario_generator=sg, seed=3)
+    cyborg.reset()
+    for _ in range(100):
+        cyborg.step()
+
+    for name, interface in cyborg.environment_controller.agent_interfaces.items():
+        if not name.startswith('red'):
+            continue
+        agent = interface.agent
+        host_states = agent.host_states
+        assert list(host_states) == agent.host_ips
+        assert [h['state'] for h in host_states.values()] == [HOST_STATES[c] for c in agent.host_state_codes]
+        assert [h['hostname'] for h in host_states.values()] == agent.host_hostnames
@@ -0,0 +1,79 @@
+from CybORG import CybORG
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
+from CybORG.Simulator.HostEvents import NetworkConnection
+from CybORG.Simulator.Actions import Restore
+from CybORG.Agents import EnterpriseGreenAgent, FiniteStateRedAgent, cc4BlueRandomAgent, SleepAgent
+
+
+def assert_alerts_match_events(state):
+    for hostname, host in state.hosts.items():
+        events = host.events
+        assert events.connection_alerts == len(events.network_connections) + len(events.old_network_connections)
+        assert events.process_alerts == len(events.process_creation) + len(events.old_process_creation)
+        assert (hostname in state.alerted_hosts) == events.has_alerts()
+
+
+def test_alert_counters_match_events():
+    sg = EnterpriseScenarioGenerator(blue_agent_class=cc4BlueRandomAgent, green_agent_class=EnterpriseGreenAgent,
+                                     red_agent_class=FiniteStateRedAgent, steps=80)
+    cyborg = CybORG(scenario_generator=sg, seed=11)
+    state = cyborg.environment_controller.state
+    assert not state.alerted_hosts
+    alerted = 0
+    for _ in range(80):
+        cyborg.step()
+        assert_alerts_match_events(state)
+        alerted += len(state.alerted_hosts)
+    assert alerted > 0
+
+
+def test_alerts_are_archived_and_cleared():
+    sg = EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=SleepAgent,
+                                     red_agent_class=SleepAgent, steps=20)
+    cyborg = CybORG(scenario_generator=sg, seed=3)
+    state = cyborg.environment_controller.state
+    hostname = 'restricted_zone_a_subnet_server_host_0'
+    events = state.hosts[hostname].events
+
+    events.add_network_connection(NetworkConnection(local_address=state.hostname_ip_map[hostname], remote_port=80))
+    events.add_process_creation({'local_address': state.hostname_ip_map[hostname], 'local_port': 999})
+    assert state.alerted_hosts == {hostname}
+    assert events.connection_alerts == events.process_alerts == 1
+
+    # Monitor moves the alerts to the past events, then drops them a step later
+    cyborg.step()
+    assert not events.network_connections and len(events.old_network_connections) == 1
+    assert state.alerted_hosts == {hostname}
+    cyborg.step()
+    assert not events.has_alerts()
+    assert not state.alerted_hosts
+
+    events.add_process_creation({'local_address': state.hostname_ip_map[hostname], 'local_port': 999})
+    action = Restore(session=0, agent='blue_agent_0', hostname=hostname)
+    action.duration = 1
+    cyborg.parallel_step(actions={'blue_agent_0': action})
+    assert state.hosts[hostname].events is events
+    assert not events.has_alerts()
+    assert not state.alerted_hosts
+
+
+def test_archive_hands_over_events_without_copying():
+    sg = EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=SleepAgent,
+                                     red_agent_class=SleepAgent, steps=20)
+    cyborg = CybORG(scenario_generator=sg, seed=3)
+    state = cyborg.environment_controller.state
+    hostname = 'restricted_zone_a_subnet_server_host_0'
+    events = state.hosts[hostname].events
+    buffers = {id(events.network_connections), id(events.old_network_connections)}
+
+    event = NetworkConnection(local_address=state.hostname_ip_map[hostname], remote_port=80)
+    events.add_network_connection(event)
+    events.archive()
+    assert events.old_network_connections == [event]
+    assert events.old_network_connections[0] is event
+    assert events.network_connections == []
+    assert {id(events.network_connections), id(events.old_network_connections)} == buffers
+
+    events.archive()
+    assert events.old_network_connections == [] and events.network_connections == []
+    assert {id(events.network_connections), id(events.old_network_connections)} == buffers
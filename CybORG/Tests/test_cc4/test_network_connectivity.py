@@ -0,0 +1,82 @@
+import pytest
+
+import numpy as np
+
+from CybORG import CybORG
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
+from CybORG.Agents import SleepAgent
+from CybORG.Simulator.Actions.Action import RemoteAction
+from CybORG.Simulator.Actions.ConcreteActions.ControlTraffic import BlockTrafficZone, AllowTrafficZone
+
+BLUE_AGENT_NAME = 'blue_agent_0'
+SOURCE = 'contractor_network_subnet_server_host_0'
+TARGET = 'restricted_zone_a_subnet_server_host_0'
+
+
+@pytest.fixture()
+def cyborg():
+    sg = EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=SleepAgent, red_agent_class=SleepAgent, steps=10)
+    cyborg = CybORG(scenario_generator=sg, seed=100)
+    cyborg.reset()
+    return cyborg
+
+
+def test_route_cache_matches_uncached_route(cyborg):
+    state = cyborg.environment_controller.state
+    for routing in (False, True):
+        route = RemoteAction.get_route(state, TARGET, SOURCE, routing)
+        assert state.route_cache[(SOURCE, TARGET, routing)] is route
+        assert RemoteAction.get_route(state, TARGET, SOURCE, routing) is route
+        assert route == RemoteAction._find_route(state, TARGET, SOURCE, routing)
+
+
+@pytest.mark.parametrize('action_class', [BlockTrafficZone, AllowTrafficZone])
+def test_control_traffic_invalidates_route_cache(cyborg, action_class):
+    state = cyborg.environment_controller.state
+    block = BlockTrafficZone(session=0, agent=BLUE_AGENT_NAME, from_subnet='contractor_network_subnet', to_subnet='restricted_zone_a_subnet')
+    if action_class is AllowTrafficZone:
+        assert block.execute(state).data['success'] == True
+    RemoteAction.get_route(state, TARGET, SOURCE, routing=True)
+    version = state.network_version
+
+    action = action_class(session=0, agent=BLUE_AGENT_NAME, from_subnet='contractor_network_subnet', to_subnet='restricted_zone_a_subnet')
+    assert action.execute(state).data['success'] == True
+
+    assert state.network_version > version
+    assert state.route_cache == {}
+    assert RemoteAction.get_route(state, TARGET, SOURCE, routing=True) == RemoteAction._find_route(state, TARGET, SOURCE, True)
+
+
+def test_component_index_matches_connected_components(cyborg):
+    state = cyborg.environment_controller.state
+    assert state.wireless == False
+    for hostname in state.hosts:
+        component = state.connected_components[state.component_index[hostname]]
+        assert hostname in component
+        for other_hostname in state.hosts:
+            assert RemoteAction.check_routable(state, other_hostname, hostname) == (other_hostname in component)
+
+
+def test_wired_network_components_not_recalculated(cyborg):
+    state = cyborg.environment_controller.state
+    components = state.connected_components
+    cyborg.step()
+    assert state.connected_components is components
+
+
+def test_connectivity_matrix_matches_connected_agents(cyborg):
+    controller = cyborg.environment_controller
+    agents, matrix = controller.get_connectivity_matrix()
+    assert agents == sorted(controller.agent_interfaces)
+    for i, agent in enumerate(agents):
+        assert {agents[j] for j in np.flatnonzero(matrix[i])} == set(controller.get_connected_agents(agent))
+
+
+def test_messages_delivered_to_connected_agents(cyborg):
+    controller = cyborg.environment_controller
+    message = np.ones(controller.message_length, dtype=bool)
+    cyborg.step(messages={BLUE_AGENT_NAME: message})
+    agents, matrix = controller.get_connectivity_matrix()
+    receivers = matrix[agents.index(BLUE_AGENT_NAME)]
+    for agent, delivered in zip(agents, receivers):
+        assert (controller.agent_interfaces[agent].messages == [message]) == delivered
@@ -0,0 +1,77 @@
+import time
+
+from CybORG import CybORG
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
+from CybORG.Simulator.StepTimer import PHASES, BIN_EDGES
+from CybORG.Agents import EnterpriseGreenAgent, FiniteStateRedAgent, cc4BlueRandomAgent
+
+
+def create_cyborg(seed=5):
+    sg = EnterpriseScenarioGenerator(blue_agent_class=cc4BlueRandomAgent, green_agent_class=EnterpriseGreenAgent,
+                                     red_agent_class=FiniteStateRedAgent, steps=50)
+    return CybORG(scenario_generator=sg, seed=seed)
+
+
+def run(cyborg, steps):
+    history = []
+    for _ in range(steps):
+        cyborg.step()
+        history.append((cyborg.get_rewards(), {a: str(cyborg.get_last_action(a)) for a in cyborg.agents}))
+    return history
+
+
+def test_perf_stats_off_by_default():
+    cyborg = create_cyborg()
+    run(cyborg, 3)
+    stats = cyborg.get_perf_stats()
+    assert stats['steps'] == 0
+    assert all(phase['total'] == 0 for phase in stats['phases'].values())
+    assert stats['actions'] == {}
+
+
+def test_perf_stats_time_each_phase():
+    cyborg = create_cyborg()
+    cyborg.set_perf_stats()
+    start = time.perf_counter()
+    timed = run(cyborg, 20)
+    elapsed = time.perf_counter() - start
+
+    stats = cyborg.get_perf_stats()
+    assert stats['steps'] == 20
+    assert list(stats['phases']) == list(PHASES)
+    assert len(stats['bin_edges']) == len(BIN_EDGES)
+    for phase in stats['phases'].values():
+        assert sum(phase['histogram']) == 20
+        assert phase['total'] >= 0
+    assert 0 < sum(phase['total'] for phase in stats['phases'].values()) <= elapsed
+    assert stats['phases']['agent_actions']['total'] > 0
+    assert stats['phases']['reward_calculation']['total'] > 0
+
+    executed = sum(action['count'] for action in stats['actions'].values())
+    assert executed == 20 * len(cyborg.environment_controller.agent_interfaces)
+    for action in stats['actions'].values():
+        assert sum(action['histogram']) == action['count']
+    assert abs(sum(action['total'] for action in stats['actions'].values())
+               - stats['phases']['action_execution']['total']) < 1e-9
+
+    # timing does not change the simulation
+    assert timed == run(create_cyborg(), 20)
+
+
+def test_perf_stats_switch_and_reset():
+    cyborg = create_cyborg()
+    cyborg.set_perf_stats()
+    run(cyborg, 2)
+    snapshot = cyborg.snapshot()
+    cyborg.set_perf_stats(False)
+    run(cyborg, 2)
+    assert cyborg.get_perf_stats()['steps'] == 2
+
+    # the timings are not part of the simulation, so restoring or resetting keeps them
+    cyborg.restore(snapshot)
+    cyborg.reset()
+    assert cyborg.get_perf_stats()['steps'] == 2
+
+    cyborg.set_perf_stats(reset=True)
+    run(cyborg, 1)
+    assert cyborg.get_perf_stats()['steps'] == 1
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from CybORG import CybORG
+from CybORG.Agents import EnterpriseGreenAgent, FiniteStateRedAgent, SleepAgent
+from CybORG.Agents.Wrappers import BlueFlatWrapper
+from CybORG.Simulator.Replay import Replayer
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
+
+STEPS = 40
+
+
+def make_cyborg(seed):
+    sg = EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=EnterpriseGreenAgent,
+                                     red_agent_class=FiniteStateRedAgent, steps=STEPS + 10)
+    return CybORG(scenario_generator=sg, seed=seed)
+
+
+def fingerprint(cyborg):
+    controller = cyborg.environment_controller
+    # combining the observations of a step modifies the first of them, so only the later ones are compared
+    return (
+        str(cyborg.get_agent_state("True")),
+        {agent: [str(o.data) for o in observations.observations[1:]]
+         for agent, observations in controller.observation.items()},
+        {agent: str(cyborg.get_last_action(agent)) for agent in controller.agent_interfaces},
+        str(controller.reward),
+    )
+
+
+@pytest.fixture(scope="module")
+def recording():
+    cyborg = make_cyborg(5)
+    cyborg.set_replay_recording(checkpoint_interval=10)
+    env = BlueFlatWrapper(cyborg)
+    rng = np.random.default_rng(0)
+    _, info = env.reset()
+    history = [fingerprint(cyborg)]
+    for _ in range(STEPS):
+        actions = {a: int(rng.choice(np.flatnonzero(info[a]["action_mask"]))) for a in env.agents}
+        messages = {a: rng.integers(2, size=8).astype(bool) for a in env.agents}
+        _, _, _, _, info = env.step(actions, messages=messages)
+        history.append(fingerprint(cyborg))
+    return cyborg, cyborg.get_replay_log(), history
+
+
+def test_replay_matches_recording(recording, monkeypatch):
+    _, log, history = recording
+    assert len(log) == STEPS
+    assert sorted(log.checkpoints) == [0, 10, 20, 30]
+
+    def no_policy(*args):
+        raise AssertionError("policies are not called during replay")
+    monkeypatch.setattr(FiniteStateRedAgent, "get_action", no_policy)
+    monkeypatch.setattr(EnterpriseGreenAgent, "get_action", no_policy)
+
+    cyborg = make_cyborg(99)
+    replayer = Replayer(cyborg, log)
+    for step in (0, 7, 37, 12, 40):
+        replayer.seek(step)
+        assert cyborg.environment_controller.step_count == step
+        assert fingerprint(cyborg) == history[step]
+
+
+def test_replay_from_seed_state(recording, monkeypatch):
+    recorded, log, history = recording
+    log_without_checkpoints = type(log)(log.reset_rng_state, log.scenario_from_rng)
+    log_without_checkpoints.steps = log.steps
+
+    replayer = Replayer(recorded, log_without_checkpoints, checkpoint_interval=15)
+    replayer.seek(23)
+    assert fingerprint(recorded) == history[23]
+    assert sorted(log_without_checkpoints.checkpoints) == [15]
+
+    # seeking forward continues from the current step, and backwards from the checkpoint
+    monkeypatch.setattr(recorded.environment_controller, "reset", None)
+    replayer.seek(31)
+    assert fingerprint(recorded) == history[31]
+    replayer.seek(16)
+    assert fingerprint(recorded) == history[16]
+    with pytest.raises(ValueError):
+        replayer.seek(STEPS + 1)
@@ -0,0 +1,67 @@
+import copy
+
+import pytest
+
+from CybORG import CybORG
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator, ScenarioPool, PooledScenarioGenerator
+from CybORG.Agents import EnterpriseGreenAgent, FiniteStateRedAgent, SleepAgent
+
+SEEDS = [3, 8, 21]
+
+
+def generator():
+    return EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=EnterpriseGreenAgent, red_agent_class=FiniteStateRedAgent, steps=30)
+
+
+@pytest.fixture(scope="module")
+def pool(tmp_path_factory):
+    return ScenarioPool.build(str(tmp_path_factory.mktemp("pool") / "scenarios.pool"), generator(), SEEDS)
+
+
+def run(scenario_generator, seed, reset_seeds, steps=10):
+    cyborg = CybORG(scenario_generator=scenario_generator, seed=seed)
+    history = []
+    for reset_seed in reset_seeds:
+        cyborg.reset(seed=reset_seed)
+        for _ in range(steps):
+            cyborg.step()
+            history.append((
+                {a: str(cyborg.get_last_action(a)) for a in cyborg.agents},
+                cyborg.get_rewards(),
+                {a: str(cyborg.get_observation(a)) for a in cyborg.agents},
+            ))
+    return history
+
+
+def test_pool_contents(pool):
+    assert len(pool) == len(SEEDS)
+    assert pool.seeds == SEEDS
+    assert pool.generator_parameters['steps'] == 30
+    assert pool.generator_parameters['red_agent_class'] is FiniteStateRedAgent
+
+
+@pytest.mark.parametrize("reset_seeds", [[8, None], [21, 3], [5]])
+def test_pooled_generator_matches_live_generation(pool, reset_seeds):
+    assert run(PooledScenarioGenerator(pool), 3, reset_seeds) == run(generator(), 3, reset_seeds)
+
+
+def test_sequential_pooled_generator_matches_seeded_resets(pool):
+    live = run(generator(), SEEDS[0], SEEDS[1:] + SEEDS[:1])
+    assert run(PooledScenarioGenerator(pool, sequential=True), 0, [None] * len(SEEDS)) == live
+
+
+def test_loaded_scenarios_are_independent(pool):
+    sg = PooledScenarioGenerator(pool)
+    cyborg = CybORG(scenario_generator=sg, seed=SEEDS[0])
+    hosts = cyborg.environment_controller.state.hosts
+    cyborg.reset(seed=SEEDS[0])
+    assert cyborg.environment_controller.state.hosts is not hosts
+    assert cyborg.environment_controller.state.np_random is cyborg.np_random
+    assert copy.deepcopy(sg).pool is pool
+
+
+def test_invalid_pool_file(tmp_path):
+    path = tmp_path / "scenarios.pool"
+    path.write_bytes(b"not a scenario pool")
+    with pytest.raises(ValueError):
+        ScenarioPool(str(path))
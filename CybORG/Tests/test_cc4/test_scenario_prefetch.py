@@ -0,0 +1,81 @@
+from gym.utils import seeding
+
+from CybORG import CybORG
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator, ScenarioPrefetcher
+from CybORG.Agents import EnterpriseGreenAgent, FiniteStateRedAgent, SleepAgent
+
+
+def generator():
+    return EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=EnterpriseGreenAgent, red_agent_class=FiniteStateRedAgent, steps=30)
+
+
+def describe(scenario):
+    hosts = {
+        name: ([str(i.ip_address) for i in host.interfaces], [p.get_state() for p in host.processes], [str(s) for s in host.services])
+        for name, host in scenario.hosts.items()
+    }
+    agents = {name: [s.hostname for s in info.starting_sessions] for name, info in scenario.agents.items()}
+    return repr((hosts, agents, scenario.mission_phases))
+
+
+def run(cyborg, reset_seeds, steps=8):
+    history = []
+    for reset_seed in reset_seeds:
+        cyborg.reset(seed=reset_seed)
+        for _ in range(steps):
+            cyborg.step()
+            history.append((
+                {a: str(cyborg.get_last_action(a)) for a in cyborg.agents},
+                cyborg.get_rewards(),
+                {a: str(cyborg.get_observation(a)) for a in cyborg.agents},
+            ))
+    return history
+
+
+def test_prefetched_scenarios_match_synchronous_generation():
+    scenarios = []
+    for background in (True, False):
+        np_random, _ = seeding.np_random(12)
+        prefetcher = ScenarioPrefetcher(generator(), np_random, background=background)
+        stream = []
+        for _ in range(3):
+            prefetcher.prefetch()
+            scenario = prefetcher.next_scenario(np_random)
+            assert all(host.np_random is np_random for host in scenario.hosts.values())
+            stream.append(describe(scenario))
+        prefetcher.close()
+        scenarios.append(stream)
+    assert scenarios[0] == scenarios[1]
+    assert len(set(scenarios[0])) == 3
+
+
+def test_prefetching_cyborg_matches_synchronous_resets(monkeypatch):
+    reset_seeds = [None, None, 7, None]
+    cyborg = CybORG(scenario_generator=generator(), seed=5, prefetch_scenarios=True)
+    prefetched = run(cyborg, reset_seeds)
+    cyborg.close()
+    monkeypatch.setattr(ScenarioPrefetcher, 'prefetch', lambda self: None)
+    cyborg = CybORG(scenario_generator=generator(), seed=5, prefetch_scenarios=True)
+    synchronous = run(cyborg, reset_seeds)
+    cyborg.close()
+    assert prefetched == synchronous
+
+
+def test_seeded_reset_restarts_scenario_stream():
+    first = CybORG(scenario_generator=generator(), seed=5, prefetch_scenarios=True)
+    second = CybORG(scenario_generator=generator(), seed=6, prefetch_scenarios=True)
+    run(second, [None], steps=3)
+    assert run(first, [9]) == run(second, [9])
+    first.close()
+    second.close()
+
+
+def test_snapshot_with_prefetching():
+    cyborg = CybORG(scenario_generator=generator(), seed=5, prefetch_scenarios=True)
+    cyborg.reset()
+    snapshot = cyborg.snapshot()
+    prefetcher = cyborg.environment_controller.scenario_prefetcher
+    cyborg.step()
+    cyborg.restore(snapshot)
+    assert cyborg.environment_controller.scenario_prefetcher is prefetcher
+    cyborg.close()
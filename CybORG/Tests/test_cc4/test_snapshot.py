@@ -0,0 +1,48 @@
+import pytest
+
+from CybORG import CybORG
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
+from CybORG.Agents import EnterpriseGreenAgent, FiniteStateRedAgent, SleepAgent
+
+
+@pytest.fixture
+def cc4():
+    sg = EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=EnterpriseGreenAgent, red_agent_class=FiniteStateRedAgent, steps=30)
+    cyborg = CybORG(scenario_generator=sg, seed=123)
+    cyborg.reset()
+    for _ in range(5):
+        cyborg.step()
+    return cyborg
+
+
+def run(cyborg, steps=8):
+    history = []
+    for _ in range(steps):
+        cyborg.step()
+        history.append((
+            {a: str(cyborg.get_last_action(a)) for a in cyborg.agents},
+            cyborg.get_rewards(),
+            {a: str(cyborg.get_observation(a)) for a in cyborg.agents},
+        ))
+    return history
+
+
+def test_restore_replays_same_trajectory(cc4):
+    snapshot = cc4.snapshot()
+    first = run(cc4)
+    cc4.restore(snapshot)
+    assert cc4.environment_controller.step_count == snapshot.step_count
+    second = run(cc4)
+    cc4.restore(snapshot)
+    third = run(cc4)
+    assert first == second == third
+
+
+def test_restore_does_not_modify_snapshot(cc4):
+    snapshot = cc4.snapshot()
+    hosts = cc4.environment_controller.state.hosts
+    cc4.restore(snapshot)
+    restored_hosts = cc4.environment_controller.state.hosts
+    assert restored_hosts is not hosts
+    assert restored_hosts.keys() == hosts.keys()
+    assert cc4.environment_controller.state.scenario.hosts is restored_hosts
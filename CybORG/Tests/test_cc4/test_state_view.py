@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from CybORG import CybORG
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
+from CybORG.Simulator.StateView import StateView, NO_ACCESS, USER_ACCESS, PRIVILEGED_ACCESS
+from CybORG.Simulator.Actions import DeployDecoy, Restore
+from CybORG.Simulator.Actions.ConcreteActions.ControlTraffic import BlockTrafficZone, AllowTrafficZone
+from CybORG.Agents import EnterpriseGreenAgent, FiniteStateRedAgent, cc4BlueRandomAgent, SleepAgent
+
+ARRAYS = ('compromised', 'service_present', 'service_active', 'service_reliability', 'decoys', 'blocked',
+          'process_events', 'connection_events')
+
+
+def assert_view_matches_state(state):
+    view = state.get_view()
+    expected = StateView(state)
+    for name in ARRAYS:
+        assert np.array_equal(getattr(view, name), getattr(expected, name)), name
+    assert view.mission_phase == expected.mission_phase
+
+
+@pytest.mark.parametrize("seed", [2, 13])
+def test_incremental_view_matches_rebuilt_view(seed):
+    sg = EnterpriseScenarioGenerator(blue_agent_class=cc4BlueRandomAgent, green_agent_class=EnterpriseGreenAgent,
+                                     red_agent_class=FiniteStateRedAgent, steps=100)
+    cyborg = CybORG(scenario_generator=sg, seed=seed)
+    state = cyborg.environment_controller.state
+    assert_view_matches_state(state)
+    compromised = set()
+    for _ in range(100):
+        cyborg.step()
+        assert_view_matches_state(state)
+        view = state.get_view()
+        red = view.teams.index('Red')
+        compromised.update(np.flatnonzero(view.compromised[:, red] == PRIVILEGED_ACCESS))
+    assert compromised
+
+
+def test_view_tracks_blue_actions():
+    sg = EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=SleepAgent,
+                                     red_agent_class=SleepAgent, steps=20)
+    cyborg = CybORG(scenario_generator=sg, seed=3)
+    state = cyborg.environment_controller.state
+    view = state.get_view()
+    hostname = 'restricted_zone_a_subnet_server_host_0'
+    host = view.host_index[hostname]
+    blue = view.teams.index('Blue')
+    assert view.compromised[host, blue] == USER_ACCESS
+    assert view.compromised[host, view.teams.index('Red')] == NO_ACCESS
+    assert view.hostnames[host] == hostname
+    assert view.subnet_names[view.host_subnet[host]] == 'restricted_zone_a_subnet'
+
+    action = DeployDecoy(session=0, agent='blue_agent_0', hostname=hostname)
+    action.duration = 1
+    cyborg.parallel_step(actions={'blue_agent_0': action})
+    assert state.get_view().decoys[host] == 1
+
+    action = Restore(session=0, agent='blue_agent_0', hostname=hostname)
+    action.duration = 1
+    cyborg.parallel_step(actions={'blue_agent_0': action})
+    assert state.get_view().decoys[host] == 0
+
+    to_subnet, from_subnet = 'restricted_zone_a_subnet', 'operational_zone_a_subnet'
+    to_index, from_index = view.subnet_index[to_subnet], view.subnet_index[from_subnet]
+    cyborg.parallel_step(actions={'blue_agent_0': BlockTrafficZone(0, 'blue_agent_0', from_subnet, to_subnet)})
+    assert state.get_view().blocked[to_index, from_index]
+    assert state.get_view().blocked.sum() == 1
+    cyborg.parallel_step(actions={'blue_agent_0': AllowTrafficZone(0, 'blue_agent_0', from_subnet, to_subnet)})
+    assert not state.get_view().blocked.any()
+    assert_view_matches_state(state)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from CybORG import CybORG
+from CybORG.Agents import SleepAgent, EnterpriseGreenAgent, FiniteStateRedAgent
+from CybORG.Agents.Wrappers import BlueFlatWrapper, EnterpriseMAE, TrajectoryRecorder, TrajectoryDataset
+from CybORG.Simulator.Scenarios import EnterpriseScenarioGenerator
+
+
+def make_env(wrapper, steps=12, **kwargs):
+    sg = EnterpriseScenarioGenerator(blue_agent_class=SleepAgent, green_agent_class=EnterpriseGreenAgent,
+                                     red_agent_class=FiniteStateRedAgent, steps=steps)
+    return wrapper(CybORG(scenario_generator=sg, seed=3), **kwargs)
+
+
+def record(env, episodes, rng):
+    transitions = []
+    for _ in range(episodes):
+        observations, info = env.reset()
+        done = False
+        while not done:
+            actions = {a: int(rng.choice(np.flatnonzero(info[a]["action_mask"]))) for a in env.agents}
+            next_observations, rewards, terminated, truncated, next_info = env.step(actions)
+            for agent in env.possible_agents:
+                transitions.append((agent, observations[agent], actions[agent], np.array(info[agent]["action_mask"]),
+                                    rewards[agent], next_observations[agent], truncated[agent]))
+            done = all(truncated[a] for a in env.agents)
+            observations, info = next_observations, next_info
+    return transitions
+
+
+@pytest.mark.parametrize("wrapper,kwargs", [(BlueFlatWrapper, {"pad_spaces": True}), (EnterpriseMAE, {})])
+def test_recorded_rows_match_transitions(tmp_path, wrapper, kwargs):
+    env = TrajectoryRecorder(make_env(wrapper, **kwargs), str(tmp_path), chunk_size=7)
+    transitions = record(env, 2, np.random.default_rng(0))
+    env.flush()
+
+    dataset = TrajectoryDataset(str(tmp_path))
+    assert len(dataset) == len(transitions) == 2 * 11 * 5
+    assert dataset.num_episodes == 2
+    batch = dataset.get(np.arange(len(dataset)))
+    assert np.array_equal(batch["episodes"], np.repeat([0, 1], 55))
+    for i, (agent, obs, action, mask, reward, next_obs, truncated) in enumerate(transitions):
+        assert dataset.agents[batch["agents"][i]] == agent
+        assert np.array_equal(batch["observations"][i, :len(obs)], obs)
+        assert not batch["observations"][i, len(obs):].any()
+        assert np.array_equal(batch["next_observations"][i, :len(next_obs)], next_obs)
+        assert batch["actions"][i] == action
+        assert np.array_equal(batch["action_masks"][i, :len(mask)], mask)
+        assert batch["rewards"][i] == reward
+        assert batch["truncated"][i] == truncated
+    assert batch["truncated"].sum() == 10
+
+    # random minibatches gather the same rows
+    indices = np.random.default_rng(1).integers(len(dataset), size=20)
+    minibatch = dataset.get(indices, ["observations", "actions"])
+    assert set(minibatch) == {"observations", "actions"}
+    assert np.array_equal(minibatch["observations"], batch["observations"][indices])
+    assert np.array_equal(minibatch["actions"], batch["actions"][indices])
+
+
+def test_minibatches_and_appending(tmp_path):
+    env = TrajectoryRecorder(make_env(BlueFlatWrapper, steps=6, pad_spaces=True), str(tmp_path), chunk_size=8)
+    record(env, 1, np.random.default_rng(0))
+    env.close()
+    env = TrajectoryRecorder(make_env(BlueFlatWrapper, steps=6, pad_spaces=True), str(tmp_path), chunk_size=8)
+    record(env, 1, np.random.default_rng(0))
+    env.flush()
+
+    dataset = TrajectoryDataset(str(tmp_path))
+    assert len(dataset) == 50
+    assert dataset.num_episodes == 2
+    episodes = np.concatenate([batch["episodes"] for batch in dataset.minibatches(16, shuffle=False)])
+    assert np.array_equal(episodes, np.repeat([0, 1], 25))
+
+    seen = []
+    for batch in dataset.minibatches(16, seed=4, drop_last=True, columns=["actions", "episodes"]):
+        assert len(batch["actions"]) == 16
+        seen.append(batch["episodes"])
+    assert len(seen) == 3
+    assert dataset.sample(5, np.random.default_rng(0))["observations"].shape == (5, 210)
+
+    with pytest.raises(IndexError):
+        dataset.get([50])
+    with pytest.raises(ValueError):
+        TrajectoryRecorder(make_env(BlueFlatWrapper), str(tmp_path / "unpadded"), chunk_size=0)
@@ -1,5 +1,6 @@
 # Copyright DST Group. Licensed under the MIT license.
 import queue
+from concurrent.futures import Executor
 from threading import Thread, Event
 import warnings
 from typing import Any, Tuple, Union
@@ -10,6 +11,7 @@ import pygame
 from gym.utils import seeding
 
 from CybORG.Simulator.SimulationController import SimulationController
+from CybORG.Simulator.Replay import ReplayRecorder, ReplayLog
 from CybORG.Shared import Observation, Results, CybORGLogger
 from CybORG.Shared.Enums import DecoyType
 from CybORG.Shared.Scenarios.ScenarioGenerator import ScenarioGenerator
@@ -53,7 +55,8 @@ class CybORG(CybORGLogger):
     def __init__(self,
                  scenario_generator: ScenarioGenerator,
                  agents: dict = None,
-                 seed: Union[int, CustomGenerator] = None):
+                 seed: Union[int, CustomGenerator] = None,
+                 prefetch_scenarios: Union[bool, Executor] = False):
         """Instantiates the CybORG class.
 
         Parameters
@@ -65,6 +68,11 @@ class CybORG(CybORGLogger):
             If None agents will be loaded from description in scenario file (default=None).
         seed : Union[int, CustomGenerator]
             optional seed for random number generator
+        prefetch_scenarios : Union[bool, Executor], optional
+            Generate the scenario of the next episode in the background while the current one runs, so that reset only
+            swaps it in (default=False). An executor to generate the scenarios on may be given instead of True.
+            Scenarios are then generated from their own random stream, seeded from the seed, so they differ from the
+            scenarios generated without prefetching.
         """
         assert issubclass(type(scenario_generator),
                           ScenarioGenerator), f'Scenario generator object of type {type(scenario_generator)} must be a subclass of ScenarioGenerator'
@@ -74,7 +82,8 @@ class CybORG(CybORGLogger):
             self.np_random, seed = seeding.np_random(seed)
         else:
             self.np_random = seed
-        self.environment_controller = SimulationController(self.scenario_generator, agents, self.np_random)
+        self.environment_controller = SimulationController(self.scenario_generator, agents, self.np_random,
+                                                           prefetch_scenarios=prefetch_scenarios)
 
         # # CC4: GUI not implemented for CC4, disable by default
         # self._disable_gui = True
@@ -242,6 +251,93 @@ class CybORG(CybORGLogger):
         action_space = self.environment_controller.agent_interfaces[agent].action_space.get_action_space()
         return Results(observation=obs, action_space=action_space)
 
+    def snapshot(self):
+        """Captures the complete simulation so that it can be returned to later with `restore`.
+
+        Intended for search-based agents that need to look ahead from the current step. Only the parts of the
+        simulation that change during an episode are copied, and restoring is much cheaper than a deepcopy of CybORG.
+
+        Returns
+        -------
+        SimulationSnapshot
+            Token that can be passed to `restore` any number of times.
+        """
+        return self.environment_controller.snapshot()
+
+    def restore(self, token):
+        """Returns the simulation to the point captured by `snapshot`, including the random number generator state.
+
+        Parameters
+        ----------
+        token: SimulationSnapshot
+            Token returned by `snapshot`.
+        """
+        self.environment_controller.restore(token)
+
+    def set_perf_stats(self, enabled: bool = True, reset: bool = False):
+        """Switches the timing of each phase of the simulation step on or off. Timing is off by default.
+
+        Parameters
+        ----------
+        enabled: bool
+            Whether to time the steps (default=True).
+        reset: bool
+            Discard the timings gathered so far (default=False).
+        """
+        timer = self.environment_controller.step_timer
+        timer.enabled = enabled
+        if reset:
+            timer.reset()
+
+    def get_perf_stats(self) -> dict:
+        """Gets the timings gathered while `set_perf_stats` was enabled.
+
+        Returns
+        -------
+        dict
+            Number of 'steps' timed and, for each phase of the step and each class of executed action, the total and
+            mean time in seconds and a histogram over the log-spaced 'bin_edges'. See StepTimer.get_stats.
+        """
+        return self.environment_controller.step_timer.get_stats()
+
+    def set_replay_recording(self, enabled: bool = True, checkpoint_interval: int = None):
+        """Switches the recording of episodes for replay on or off. Recording is off by default.
+
+        Recording starts with the next reset. Each step records the actions of all agents and the state of the random
+        number generator, so a Replayer can reconstruct any step of the episode without calling the agent policies.
+
+        Parameters
+        ----------
+        enabled: bool
+            Whether to record the episodes (default=True).
+        checkpoint_interval: int, optional
+            Number of steps between snapshots of the simulation that replays can start from (default=None, no snapshots).
+        """
+        self.environment_controller.replay_recorder = ReplayRecorder(checkpoint_interval) if enabled else None
+
+    def get_replay_log(self) -> ReplayLog:
+        """Gets the record of the current episode while replay recording is enabled.
+
+        Returns
+        -------
+        ReplayLog
+            The recorded episode, to pass to a Replayer, or None if no episode has been recorded.
+        """
+        recorder = self.environment_controller.replay_recorder
+        return None if recorder is None else recorder.log
+
+    def get_connectivity_matrix(self):
+        """Gets which agents can send messages to each other at the current step.
+
+        Returns
+        -------
+        agents : List[str]
+            Sorted agent names indexing both axes of the matrix.
+        matrix : np.ndarray
+            Read-only boolean array where matrix[i, j] is True if messages sent by agents[i] are delivered to agents[j].
+        """
+        return self.environment_controller.get_connectivity_matrix()
+
     def get_observation(self, agent: str) -> dict:
         """Get the last observation for an agent.
 
@@ -433,7 +529,8 @@ class CybORG(CybORGLogger):
         **kwargs
             Keyword Arguments to pass to the environment_controller.
         '''
-        if not self._disable_gui:
+        self.environment_controller.close()
+        if not getattr(self, '_disable_gui', True):
             self.gui_actions_queue.put('shutdown')
 
     @property
@@ -1,7 +1,7 @@
 #!/bin/bash
 
 # Define file name prefixes
-TEST_FILE="CybORG/Tests/test_sim/test_Acceptance/test_cc4/test_heuristic_agents.py"
+TEST_FILE="CybORG/Tests/test_cc4/test_heuristic_agents.py"
 PROFILE_PREFIX="test_profile"
 DOT_OUTPUT_PREFIX="dot_output"
 SVG_OUTPUT_PREFIX="profile_graph"